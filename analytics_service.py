@@ -0,0 +1,300 @@
+"""
+Analytics service - flow metrics from status history and task completions
+
+Durations are computed in the database with window functions: lead() over a
+job's status history gives how long each status lasted, and lag() over a
+job's stage finish times (ordered by stage_order) gives how long each stage
+took. Only the per-status / per-stage / per-week aggregates come back to
+Python.
+
+Results are cached per metric and period: for ANALYTICS_CACHE_TTL seconds
+when the period includes today, and for ANALYTICS_PAST_CACHE_TTL when it ended
+earlier. A past period can still change - statuses that are still open are
+measured up to today, and task completion times can be edited or cleared - so
+it expires too, just less often.
+"""
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import DateTime, and_, case, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from config import ANALYTICS_CACHE_TTL, ANALYTICS_CACHE_SIZE, ANALYTICS_DEFAULT_DAYS, ANALYTICS_PAST_CACHE_TTL
+from models.job import Job, JobStatus, JobStatusHistory
+from models.throughput import ThroughputStage, ThroughputTask
+
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+
+def clear_cache():
+    """Drop all cached metric results"""
+    _cache.clear()
+
+
+def _cached(key: tuple, period_end: date, compute: Callable):
+    """Return a cached result for `key`, computing and storing it on a miss"""
+    now = time.monotonic()
+    hit = _cache.get(key)
+    if hit is not None and hit[0] > now:
+        _cache.move_to_end(key)
+        return hit[1]
+
+    result = compute()
+    expires_at = now + (ANALYTICS_PAST_CACHE_TTL if period_end < date.today() else ANALYTICS_CACHE_TTL)
+    _cache[key] = (expires_at, result)
+    _cache.move_to_end(key)
+    while len(_cache) > ANALYTICS_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
+
+
+def default_period(from_date: Optional[date], to_date: Optional[date]) -> tuple:
+    """Fill in a missing period bound (default: the last ANALYTICS_DEFAULT_DAYS days)"""
+    to_date = to_date or date.today()
+    from_date = from_date or to_date - timedelta(days=ANALYTICS_DEFAULT_DAYS)
+    return from_date, to_date
+
+
+# ============================================================================
+# DIALECT HELPERS
+# ============================================================================
+
+def _is_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _days_between(db: Session, start, end):
+    """SQL expression for (end - start) in fractional days"""
+    if _is_sqlite(db):
+        return func.julianday(end) - func.julianday(start)
+    return func.extract("epoch", cast(end, DateTime) - cast(start, DateTime)) / 86400.0
+
+
+def _week_start(db: Session, column):
+    """SQL expression for the Monday of the week containing `column`"""
+    if _is_sqlite(db):
+        return func.date(column, "weekday 0", "-6 days")
+    return func.date(func.date_trunc("week", column))
+
+
+def _as_date(value) -> Optional[date]:
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def _round(value) -> Optional[float]:
+    return round(float(value), 2) if value is not None else None
+
+
+def _period_end(to_date: date):
+    """Exclusive upper bound for timestamp columns (midnight after to_date)"""
+    return datetime.combine(to_date + timedelta(days=1), datetime.min.time())
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+def status_times(db: Session, from_date: date, to_date: date) -> list:
+    """Time spent in each job status, for statuses entered during the period"""
+    def compute():
+        history = JobStatusHistory
+        spans = select(
+            history.job_status_id,
+            history.date.label("entered"),
+            func.lead(history.date).over(
+                partition_by=history.job_id,
+                order_by=(history.date, history.job_status_history_id)
+            ).label("left")
+        ).subquery()
+
+        days = _days_between(db, spans.c.entered, func.coalesce(spans.c.left, literal(date.today())))
+        rows = db.execute(
+            select(
+                spans.c.job_status_id,
+                JobStatus.job_status,
+                func.count().label("transitions"),
+                func.sum(case((spans.c.left.is_(None), 1), else_=0)).label("still_open"),
+                func.avg(days).label("avg_days"),
+                func.min(days).label("min_days"),
+                func.max(days).label("max_days")
+            )
+            .join(JobStatus, JobStatus.job_status_id == spans.c.job_status_id)
+            .where(spans.c.entered.between(from_date, to_date))
+            .group_by(spans.c.job_status_id, JobStatus.job_status)
+            .order_by(spans.c.job_status_id)
+        ).all()
+        return [
+            {
+                "job_status_id": row.job_status_id,
+                "job_status": row.job_status,
+                "transitions": row.transitions,
+                "still_open": int(row.still_open or 0),
+                "avg_days": _round(row.avg_days),
+                "min_days": _round(row.min_days),
+                "max_days": _round(row.max_days)
+            }
+            for row in rows
+        ]
+
+    return _cached(("status_times", from_date, to_date), to_date, compute)
+
+
+def _stage_finishes():
+    """Per (job, stage): when its last task was completed, for fully completed stages"""
+    return (
+        select(
+            ThroughputTask.job_number.label("job_id"),
+            ThroughputTask.stage_id,
+            func.max(ThroughputTask.time_completed).label("finished_at")
+        )
+        .group_by(ThroughputTask.job_number, ThroughputTask.stage_id)
+        .having(func.count() == func.count(ThroughputTask.time_completed))
+        .subquery()
+    )
+
+
+def stage_times(db: Session, from_date: date, to_date: date) -> list:
+    """
+    Time each stage took, for stages finished during the period
+
+    A stage's duration runs from the job finishing its previous stage to
+    finishing this one, so a job's first stage has no measured duration.
+    """
+    def compute():
+        finishes = _stage_finishes()
+        spans = (
+            select(
+                finishes.c.stage_id,
+                finishes.c.finished_at,
+                func.lag(finishes.c.finished_at).over(
+                    partition_by=finishes.c.job_id,
+                    order_by=ThroughputStage.stage_order
+                ).label("started_at")
+            )
+            .join(ThroughputStage, ThroughputStage.stage_id == finishes.c.stage_id)
+            .subquery()
+        )
+
+        days = _days_between(db, spans.c.started_at, spans.c.finished_at)
+        rows = db.execute(
+            select(
+                ThroughputStage.stage_id,
+                ThroughputStage.stage,
+                func.count().label("jobs"),
+                func.avg(days).label("avg_days"),
+                func.min(days).label("min_days"),
+                func.max(days).label("max_days")
+            )
+            .join(ThroughputStage, ThroughputStage.stage_id == spans.c.stage_id)
+            .where(
+                spans.c.started_at.isnot(None),
+                spans.c.finished_at >= from_date,
+                spans.c.finished_at < _period_end(to_date)
+            )
+            .group_by(ThroughputStage.stage_id, ThroughputStage.stage, ThroughputStage.stage_order)
+            .order_by(ThroughputStage.stage_order)
+        ).all()
+        return [
+            {
+                "stage_id": row.stage_id,
+                "stage": row.stage,
+                "jobs": row.jobs,
+                "avg_days": _round(row.avg_days),
+                "min_days": _round(row.min_days),
+                "max_days": _round(row.max_days)
+            }
+            for row in rows
+        ]
+
+    return _cached(("stage_times", from_date, to_date), to_date, compute)
+
+
+def weekly_throughput(db: Session, from_date: date, to_date: date) -> list:
+    """Tasks completed and jobs that finished their final stage, per week"""
+    def compute():
+        period = and_(
+            ThroughputTask.time_completed >= from_date,
+            ThroughputTask.time_completed < _period_end(to_date)
+        )
+        task_week = _week_start(db, ThroughputTask.time_completed)
+        weeks = {}
+        for week, count in db.execute(
+            select(task_week, func.count())
+            .where(ThroughputTask.time_completed.isnot(None), period)
+            .group_by(task_week)
+        ):
+            weeks.setdefault(_as_date(week), {"tasks_completed": 0, "jobs_completed": 0})[
+                "tasks_completed"] = count
+
+        final_stage = (
+            select(ThroughputStage.stage_id)
+            .order_by(ThroughputStage.stage_order.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        finishes = _stage_finishes()
+        job_week = _week_start(db, finishes.c.finished_at)
+        for week, count in db.execute(
+            select(job_week, func.count())
+            .where(
+                finishes.c.stage_id == final_stage,
+                finishes.c.finished_at >= from_date,
+                finishes.c.finished_at < _period_end(to_date)
+            )
+            .group_by(job_week)
+        ):
+            weeks.setdefault(_as_date(week), {"tasks_completed": 0, "jobs_completed": 0})[
+                "jobs_completed"] = count
+
+        return [{"week_start": week, **counts} for week, counts in sorted(weeks.items())]
+
+    return _cached(("throughput", from_date, to_date), to_date, compute)
+
+
+def work_in_progress(db: Session) -> list:
+    """Jobs currently in each stage and their outstanding tasks"""
+    def compute():
+        open_tasks = (
+            select(
+                ThroughputTask.job_number.label("job_id"),
+                ThroughputTask.stage_id,
+                func.count().label("open_tasks")
+            )
+            .where(ThroughputTask.time_completed.is_(None))
+            .group_by(ThroughputTask.job_number, ThroughputTask.stage_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(
+                ThroughputStage.stage_id,
+                ThroughputStage.stage,
+                func.count(Job.job_id).label("jobs"),
+                func.coalesce(func.sum(open_tasks.c.open_tasks), 0).label("open_tasks")
+            )
+            .select_from(ThroughputStage)
+            .outerjoin(Job, Job.stage_id == ThroughputStage.stage_id)
+            .outerjoin(
+                open_tasks,
+                and_(open_tasks.c.job_id == Job.job_id, open_tasks.c.stage_id == Job.stage_id)
+            )
+            .group_by(ThroughputStage.stage_id, ThroughputStage.stage, ThroughputStage.stage_order)
+            .order_by(ThroughputStage.stage_order)
+        ).all()
+        return [
+            {
+                "stage_id": row.stage_id,
+                "stage": row.stage,
+                "jobs": row.jobs,
+                "open_tasks": int(row.open_tasks or 0)
+            }
+            for row in rows
+        ]
+
+    # WIP is a point-in-time figure - cache it briefly under today's key
+    return _cached(("wip", date.today()), date.today(), compute)
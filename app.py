@@ -2,10 +2,16 @@ from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File,
 from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.templating import Jinja2Templates
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database import SessionLocal
+from ordering import next_order
+from throughput_service import sync_job_stage_due
+from events_service import publish
+import job_history_service  # registers the job event log flush listener
+import job_detail_service  # registers the job version flush listener
+from delivery_service import BOOKING_FIELDSET, find_or_create_address
+from routers.job import JOB_FIELDSET  # the served job list owns the job fieldset
 from models import (
     Product, ProductCategory, ProductVariable, ProductProductVariable, VariableOption,
     Quote, Client, Contact, Billing, Job, Project, JobStatus, JobStatusHistory,
@@ -52,9 +58,11 @@ from config import (
     APP_VERSION
 )
 
+from storage_service import get_storage_backend
+
 # Try to import dropbox_service, but make it optional
 try:
-    from dropbox_service import initialize_dropbox_service, get_dropbox_service
+    from dropbox_service import initialize_dropbox_service
 except ImportError:
     print("Warning: dropbox_service not available")
 
@@ -75,8 +83,16 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Templates
-templates = Jinja2Templates(directory="templates")
+# Templates - the Jinja2 stack is only loaded when a page is first rendered
+_templates = None
+
+
+def get_templates():
+    global _templates
+    if _templates is None:
+        from starlette.templating import Jinja2Templates
+        _templates = Jinja2Templates(directory="templates")
+    return _templates
 
 # Initialize Dropbox service (if available)
 if DROPBOX_AVAILABLE and DROPBOX_ACCESS_TOKEN:
@@ -106,7 +122,7 @@ app.include_router(upload_router)
 # Routes for serving HTML pages
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return templates.TemplateResponse("index.html", {"request": request})
+    return get_templates().TemplateResponse("index.html", {"request": request})
 
 @app.get("/api/google-maps-key")
 async def get_google_maps_key():
@@ -343,12 +359,10 @@ async def create_variable(variable: VariableCreate, db: Session = Depends(get_db
         
         assigned_products = []
         if variable.product_id:
-            max_order = (
-                db.query(func.coalesce(func.max(ProductProductVariable.display_order), 0))
-                .filter(ProductProductVariable.product_id == variable.product_id)
-                .scalar()
-            ) or 0
-            order_value = variable.display_order if variable.display_order is not None else (max_order + 1)
+            order_value = variable.display_order if variable.display_order is not None else next_order(
+                db, ProductProductVariable.display_order,
+                [ProductProductVariable.product_id == variable.product_id]
+            )
             assignment = ProductProductVariable(
                 product_id=variable.product_id,
                 product_variable_id=new_variable.product_variable_id,
@@ -762,7 +776,17 @@ def generate_quote_number(job_id: int, db: Session) -> str:
 
 # API Routes for Jobs
 @app.get("/api/jobs")
-async def get_jobs(db: Session = Depends(get_db)):
+async def get_jobs(fields: Optional[str] = None, include: Optional[str] = None, db: Session = Depends(get_db)):
+    # With fields= or include=, return just those columns and relations (loaded
+    # in one query per relation); without them, the full legacy payload
+    if fields is not None or include is not None:
+        try:
+            selection = JOB_FIELDSET.parse(fields, include)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        jobs = JOB_FIELDSET.query(db, selection).order_by(Job.job_id).all()
+        return [JOB_FIELDSET.payload(job, selection) for job in jobs]
+    
     jobs = db.query(Job).all()
     result = []
     for job in jobs:
@@ -892,9 +916,8 @@ async def create_job(
         db.flush()
         
         assets_info = []
-        if attachments and DROPBOX_AVAILABLE:
+        if attachments:
             try:
-                dropbox_service = get_dropbox_service()
                 files_to_upload = []
                 for file in attachments:
                     if file.filename:
@@ -904,7 +927,7 @@ async def create_job(
                             "filename": file.filename
                         })
                 if files_to_upload:
-                    upload_results = dropbox_service.upload_multiple_files(files_to_upload, new_job.job_id)
+                    upload_results = get_storage_backend().upload_multiple_files(files_to_upload, new_job.job_id, "job")
                     assets_info = [{
                         "dropbox_path": r["dropbox_path"],
                         "dropbox_shared_url": r["dropbox_shared_url"]
@@ -1397,16 +1420,13 @@ async def assign_variable_to_product(product_id: int, variable_id: int, db: Sess
         if existing:
             return {"message": "Variable already assigned to product"}
         
-        max_order = (
-            db.query(func.coalesce(func.max(ProductProductVariable.display_order), 0))
-            .filter(ProductProductVariable.product_id == product_id)
-            .scalar()
-        ) or 0
-        
         assignment = ProductProductVariable(
             product_id=product_id,
             product_variable_id=variable_id,
-            display_order=max_order + 1
+            display_order=next_order(
+                db, ProductProductVariable.display_order,
+                [ProductProductVariable.product_id == product_id]
+            )
         )
         db.add(assignment)
         db.commit()
@@ -1674,6 +1694,8 @@ async def approve_quote(job_id: int, request: ApproveQuoteRequest, db: Session =
         if request.approved_quote:
             job.job_status_id = 2
             job.stage_id = 1
+            sync_job_stage_due(db, [job_id])
+            publish(db, "job.stage_changed", job_id=job_id, job_status_id=2, stage_id=1)
         
         db.commit()
         return {"message": "Quote approval updated successfully"}
@@ -1711,6 +1733,8 @@ async def update_job_stage(job_id: int, stage_update: StageUpdate, db: Session =
                 raise HTTPException(status_code=400, detail="Stage not found")
         
         job.stage_id = stage_update.stage_id
+        sync_job_stage_due(db, [job_id])
+        publish(db, "job.stage_changed", job_id=job_id, job_status_id=job.job_status_id, stage_id=job.stage_id)
         db.commit()
         return {"message": "Job stage updated successfully"}
     except HTTPException:
@@ -1738,6 +1762,7 @@ async def update_stage_due_date(job_id: int, due_date_update: StageDueDateUpdate
             )
             db.add(new_stage_date)
         
+        sync_job_stage_due(db, [job_id])
         db.commit()
         return {"message": "Stage due date updated successfully"}
     except Exception as e:
@@ -1749,12 +1774,10 @@ async def create_task(task: TaskCreate, db: Session = Depends(get_db)):
     try:
         from models import ThroughputTask, ThroughputStatus
         
-        max_order = db.query(ThroughputTask.task_order).filter(
+        task_order = next_order(db, ThroughputTask.task_order, [
             ThroughputTask.job_number == task.job_id,
             ThroughputTask.stage_id == task.stage_id
-        ).order_by(ThroughputTask.task_order.desc()).first()
-        
-        next_order = (max_order[0] + 1) if max_order else 1
+        ])
         
         default_status = db.query(ThroughputStatus).first()
         if not default_status:
@@ -1766,7 +1789,7 @@ async def create_task(task: TaskCreate, db: Session = Depends(get_db)):
             item_id=task.item_id,
             stage_id=task.stage_id,
             status_id=default_status.status_id,
-            task_order=next_order
+            task_order=task_order
         )
         db.add(new_task)
         db.commit()
@@ -1825,6 +1848,11 @@ async def update_task_status(task_id: int, status_update: TaskStatusUpdate, db:
             task.status_id = 1
             task.time_completed = None
         
+        publish(
+            db, "task.updated",
+            task_id=task.task_id, job_id=task.job_number, stage_id=task.stage_id,
+            status_id=task.status_id, task_order=task.task_order, time_completed=task.time_completed
+        )
         db.commit()
         return {
             "message": "Task status updated successfully",
@@ -1842,7 +1870,7 @@ async def update_task_status(task_id: int, status_update: TaskStatusUpdate, db:
 @app.get("/api/bookings")
 async def get_bookings(db: Session = Depends(get_db)):
     try:
-        bookings = db.query(Booking).all()
+        bookings = BOOKING_FIELDSET.query(db, BOOKING_FIELDSET.parse(include="addresses")).all()
         result = []
         for booking in bookings:
             booking_data = {
@@ -1889,9 +1917,6 @@ async def upload_attachments(
         if not files or all(not file.filename for file in files):
             raise HTTPException(status_code=400, detail="No files selected")
         
-        if not DROPBOX_AVAILABLE:
-            raise HTTPException(status_code=500, detail="Dropbox service not available")
-        
         files_to_upload = []
         for file in files:
             if file.filename:
@@ -1904,8 +1929,7 @@ async def upload_attachments(
         if not files_to_upload:
             raise HTTPException(status_code=400, detail="No valid files to upload")
         
-        dropbox_service = get_dropbox_service()
-        upload_results = dropbox_service.upload_multiple_files(files_to_upload, booking_id)
+        upload_results = get_storage_backend().upload_multiple_files(files_to_upload, booking_id, "booking")
         
         attachments = []
         for result in upload_results:
@@ -1934,6 +1958,31 @@ async def upload_attachments(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to upload files: {str(e)}")
 
+
+def _booking_address(db: Session, address_text: str, details_json: Optional[str]) -> Address:
+    """Resolve a booking's pickup/drop-off to an existing Address, creating it if new"""
+    details = None
+    if details_json:
+        try:
+            details = json.loads(details_json)
+        except (json.JSONDecodeError, TypeError):
+            details = None
+    
+    if details:
+        details = {**details, "formatted_address": details.get("formatted_address", address_text)}
+    else:
+        address_parts = address_text.split(",")
+        details = {
+            "formatted_address": address_text,
+            "suburb": address_parts[-1].strip() if len(address_parts) > 1 else "",
+            "state": "NSW",
+            "postcode": "",
+            "country": "Australia"
+        }
+    address, _ = find_or_create_address(db, details)
+    return address
+
+
 @app.post("/api/bookings")
 async def create_booking(
     booking: BookingCreate,
@@ -1943,77 +1992,15 @@ async def create_booking(
     try:
         pickup_address_id = None
         if booking.pickupAddress:
-            pickup_address_details = None
-            if booking.pickup_address_details:
-                try:
-                    pickup_address_details = json.loads(booking.pickup_address_details)
-                except (json.JSONDecodeError, TypeError):
-                    pickup_address_details = None
-            
-            if pickup_address_details:
-                pickup_address = Address(
-                    name=None,
-                    google_place_id=pickup_address_details.get("google_place_id"),
-                    formatted_address=pickup_address_details.get("formatted_address", booking.pickupAddress),
-                    street_number=pickup_address_details.get("street_number"),
-                    street_name=pickup_address_details.get("street_name"),
-                    suburb=pickup_address_details.get("suburb"),
-                    state=pickup_address_details.get("state"),
-                    postcode=pickup_address_details.get("postcode"),
-                    country=pickup_address_details.get("country"),
-                    latitude=pickup_address_details.get("latitude"),
-                    longitude=pickup_address_details.get("longitude")
-                )
-            else:
-                pickup_address_parts = booking.pickupAddress.split(",")
-                pickup_suburb = pickup_address_parts[-1].strip() if len(pickup_address_parts) > 1 else ""
-                pickup_address = Address(
-                    formatted_address=booking.pickupAddress,
-                    suburb=pickup_suburb,
-                    state="NSW",
-                    postcode="",
-                    country="Australia"
-                )
-            db.add(pickup_address)
-            db.flush()
-            pickup_address_id = pickup_address.address_id
+            pickup_address_id = _booking_address(
+                db, booking.pickupAddress, booking.pickup_address_details
+            ).address_id
         
         dropoff_address_id = None
         if booking.dropoffAddress:
-            dropoff_address_details = None
-            if booking.dropoff_address_details:
-                try:
-                    dropoff_address_details = json.loads(booking.dropoff_address_details)
-                except (json.JSONDecodeError, TypeError):
-                    dropoff_address_details = None
-            
-            if dropoff_address_details:
-                dropoff_address = Address(
-                    name=None,
-                    google_place_id=dropoff_address_details.get("google_place_id"),
-                    formatted_address=dropoff_address_details.get("formatted_address", booking.dropoffAddress),
-                    street_number=dropoff_address_details.get("street_number"),
-                    street_name=dropoff_address_details.get("street_name"),
-                    suburb=dropoff_address_details.get("suburb"),
-                    state=dropoff_address_details.get("state"),
-                    postcode=dropoff_address_details.get("postcode"),
-                    country=dropoff_address_details.get("country"),
-                    latitude=dropoff_address_details.get("latitude"),
-                    longitude=dropoff_address_details.get("longitude")
-                )
-            else:
-                dropoff_address_parts = booking.dropoffAddress.split(",")
-                dropoff_suburb = dropoff_address_parts[-1].strip() if len(dropoff_address_parts) > 1 else ""
-                dropoff_address = Address(
-                    formatted_address=booking.dropoffAddress,
-                    suburb=dropoff_suburb,
-                    state="NSW",
-                    postcode="",
-                    country="Australia"
-                )
-            db.add(dropoff_address)
-            db.flush()
-            dropoff_address_id = dropoff_address.address_id
+            dropoff_address_id = _booking_address(
+                db, booking.dropoffAddress, booking.dropoff_address_details
+            ).address_id
         
         new_booking = Booking(
             pickup_address_id=pickup_address_id,
@@ -2031,9 +2018,8 @@ async def create_booking(
         db.flush()
         
         attachment_info = []
-        if attachments and DROPBOX_AVAILABLE:
+        if attachments:
             try:
-                dropbox_service = get_dropbox_service()
                 files_to_upload = []
                 for file in attachments:
                     if file.filename:
@@ -2044,7 +2030,9 @@ async def create_booking(
                         })
                 
                 if files_to_upload:
-                    upload_results = dropbox_service.upload_multiple_files(files_to_upload, new_booking.booking_id)
+                    upload_results = get_storage_backend().upload_multiple_files(
+                        files_to_upload, new_booking.booking_id, "booking"
+                    )
                     for result in upload_results:
                         attachment = Attachment(
                             booking_id=new_booking.booking_id,
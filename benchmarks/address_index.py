@@ -0,0 +1,72 @@
+"""
+Address grid benchmark
+Times geo.GridIndex radius queries against a brute-force haversine scan, without a database.
+
+Usage:
+    python benchmarks/address_index.py [--addresses 50000] [--radius 2] [--queries 1000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from geo import GridIndex, haversine_km
+
+CENTRE = (-33.87, 151.21)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure address radius search time")
+    parser.add_argument("--addresses", type=int, default=50000)
+    parser.add_argument("--radius", type=float, default=2.0, help="km")
+    parser.add_argument("--cell-km", type=float, default=1.0)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    points = [
+        (CENTRE[0] + rng.uniform(-0.5, 0.5), CENTRE[1] + rng.uniform(-0.5, 0.5))
+        for _ in range(args.addresses)
+    ]
+
+    started = time.perf_counter()
+    grid = GridIndex(args.cell_km)
+    for key, (lat, lng) in enumerate(points):
+        grid.add(key, lat, lng)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    queries = [points[rng.randrange(len(points))] for _ in range(args.queries)]
+    timings = []
+    matches = 0
+    for lat, lng in queries:
+        started = time.perf_counter()
+        matches += len(grid.within(lat, lng, args.radius))
+        timings.append((time.perf_counter() - started) * 1000)
+
+    lat, lng = queries[0]
+    started = time.perf_counter()
+    [p for p in points if haversine_km(lat, lng, p[0], p[1]) <= args.radius]
+    scan_ms = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({
+        "addresses": args.addresses,
+        "radius_km": args.radius,
+        "build_ms": round(build_ms, 2),
+        "avg_matches": round(matches / len(queries), 1),
+        "query_ms": {
+            "min": round(min(timings), 3),
+            "median": round(statistics.median(timings), 3),
+            "max": round(max(timings), 3)
+        },
+        "full_scan_ms": round(scan_ms, 2)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Flow analytics benchmark
+Seeds a scratch SQLite database with years of job status history and task
+completions, then times each flow metric cold and from the period cache.
+
+Usage:
+    python benchmarks/analytics.py [--jobs 20000] [--years 5]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def seed(engine, jobs: int, years: int, stages: int = 6):
+    """Insert jobs with 3-4 status transitions and a few tasks per stage each"""
+    from sqlalchemy import insert
+    from models import (
+        Base, Client, Contact, Project, Staff, Job, JobStatus, JobStatusHistory,
+        ThroughputStatus, ThroughputStage, ThroughputTask
+    )
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(1)
+    start = date.today() - timedelta(days=365 * years)
+    with engine.begin() as conn:
+        conn.execute(insert(Client), [{"client_id": 1, "name": "Client"}])
+        conn.execute(insert(Contact), [{"contact_id": 1, "client_id": 1, "first_name": "A", "surname": "B"}])
+        conn.execute(insert(Project), [{"project_id": 1, "name": "Project"}])
+        conn.execute(insert(Staff), [{"staff_id": 1, "first_name": "A", "surname": "B"}])
+        conn.execute(insert(JobStatus), [{"job_status_id": i, "job_status": f"S{i}"} for i in range(1, 5)])
+        conn.execute(insert(ThroughputStatus), [{"status_id": 1, "status": "open"}, {"status_id": 2, "status": "done"}])
+        conn.execute(insert(ThroughputStage), [
+            {"stage_id": i, "stage": f"Stage {i}", "stage_order": i} for i in range(1, stages + 1)
+        ])
+
+        job_rows, history_rows, task_rows = [], [], []
+        for job_id in range(1, jobs + 1):
+            created = start + timedelta(days=rng.randrange(365 * years))
+            job_rows.append({
+                "job_id": job_id, "reference": f"J{job_id}", "project_id": 1, "client_id": 1,
+                "contact_id": 1, "staff_id": 1, "date_created": created
+            })
+            day = created
+            for status_id in range(1, rng.randint(3, 4) + 1):
+                history_rows.append({"job_id": job_id, "job_status_id": status_id, "date": day})
+                day += timedelta(days=rng.randint(0, 10))
+            moment = datetime.combine(created, datetime.min.time())
+            for stage_id in range(1, stages + 1):
+                for order in range(rng.randint(1, 4)):
+                    moment += timedelta(hours=rng.randint(1, 30))
+                    task_rows.append({
+                        "task_name": "task", "job_number": job_id, "stage_id": stage_id,
+                        "status_id": 2, "task_order": order, "time_completed": moment
+                    })
+        conn.execute(insert(Job), job_rows)
+        conn.execute(insert(JobStatusHistory), history_rows)
+        conn.execute(insert(ThroughputTask), task_rows)
+    return len(history_rows), len(task_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure flow analytics query time")
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'analytics.db')}"
+        from database import engine, SessionLocal
+        import analytics_service
+
+        history_rows, task_rows = seed(engine, args.jobs, args.years)
+        from_date, to_date = date.today() - timedelta(days=365 * args.years), date.today() - timedelta(days=1)
+
+        report = {"jobs": args.jobs, "history_rows": history_rows, "task_rows": task_rows, "metrics": {}}
+        db = SessionLocal()
+        try:
+            for name in ("status_times", "stage_times", "weekly_throughput"):
+                metric = getattr(analytics_service, name)
+                timings = []
+                for _ in range(2):
+                    started = time.perf_counter()
+                    metric(db, from_date, to_date)
+                    timings.append(round((time.perf_counter() - started) * 1000, 2))
+                report["metrics"][name] = {"cold_ms": timings[0], "cached_ms": timings[1]}
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
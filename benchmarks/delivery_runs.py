@@ -0,0 +1,76 @@
+"""
+Delivery run benchmark
+Times geo.plan_route on synthetic pickup/drop-off pairs, without a database.
+
+Usage:
+    python benchmarks/delivery_runs.py [--bookings 50] [--runs 5]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from geo import haversine_km, plan_route
+
+DEPOT = (-33.87, 151.21)
+
+
+def make_stops(bookings: int, seed: int = 1) -> list:
+    """A pickup and a drop-off per booking, scattered ~30 km around the depot"""
+    rng = random.Random(seed)
+    stops = []
+    for _ in range(bookings):
+        for kind in ("pickup", "dropoff"):
+            stops.append({
+                "latitude": DEPOT[0] + rng.uniform(-0.3, 0.3),
+                "longitude": DEPOT[1] + rng.uniform(-0.3, 0.3),
+                "after": len(stops) - 1 if kind == "dropoff" else None
+            })
+    return stops
+
+
+def listed_order_km(stops: list) -> float:
+    """Length of the run when stops are visited in booking order"""
+    points = [DEPOT] + [(s["latitude"], s["longitude"]) for s in stops]
+    return sum(haversine_km(*points[k - 1], *points[k]) for k in range(1, len(points)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure delivery run planning time")
+    parser.add_argument("--bookings", type=int, default=50, help="pickup/drop-off pairs (stops = 2x)")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    stops = make_stops(args.bookings)
+
+    started = time.perf_counter()
+    import numpy  # noqa: F401 - first-use import cost, reported separately
+    import_ms = (time.perf_counter() - started) * 1000
+
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        route = plan_route(stops, DEPOT)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(json.dumps({
+        "stops": len(stops),
+        "numpy_import_ms": round(import_ms, 2),
+        "listed_order_km": round(listed_order_km(stops), 1),
+        "route_km": round(route["total_km"], 1),
+        "plan_ms": {
+            "min": round(min(timings), 2),
+            "median": round(statistics.median(timings), 2),
+            "max": round(max(timings), 2)
+        }
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
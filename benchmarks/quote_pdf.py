@@ -0,0 +1,113 @@
+"""
+Quote PDF benchmark
+Times pdf_writer rendering of synthetic quotes in-process, and a batch spread over a process pool, without a database.
+
+Usage:
+    python benchmarks/quote_pdf.py [--batch 40] [--workers 2]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from pdf_writer import precompile_templates, render_template_pdf
+
+TEMPLATE = "quote.j2"
+
+
+def quote_context(lines: int) -> dict:
+    """A quote shaped like quote_pdf_service's context, with `lines` items"""
+    items = [
+        {
+            "product": f"Signage panel type {n % 7}",
+            "reference": f"R{n}",
+            "notes": "Install after hours" if n % 5 == 0 else None,
+            "quantity": n % 9 + 1,
+            "length": 1.2 + n % 4,
+            "height": 0.6 if n % 2 else None,
+            "measure": "m²",
+            "cost_excl_gst": 100.0 + n,
+            "cost_incl_gst": 110.0 + n * 1.1,
+            "options": ["Colour: Red", "Finish: Matt"] if n % 3 == 0 else []
+        }
+        for n in range(lines)
+    ]
+    return {
+        "company": "Outcry",
+        "quote": {
+            "quote_number": "156-001",
+            "date_created": "01/07/2024",
+            "cost_excl_gst": 1000.0,
+            "cost_incl_gst": 1100.0,
+            "gst": 100.0,
+            "items": items
+        },
+        "job": {"job_id": 156, "reference": "Harbour fit-out", "po": "PO-4411", "site": "1 George St, Sydney, NSW, 2000"},
+        "client": {"name": "Acme Signs Pty Ltd"},
+        "contact": {"first_name": "Sam", "surname": "Lee", "email": "sam@example.com", "phone": None},
+        "project": {"name": "Harbour"}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure quote PDF render time")
+    parser.add_argument("--batch", type=int, default=40, help="quotes in the pool batch")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    precompile_templates()
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    single = {}
+    for lines in (10, 100, 500):
+        context = quote_context(lines)
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            pdf = render_template_pdf(TEMPLATE, context, "Quote 156-001", "Outcry - Quote 156-001")
+            timings.append((time.perf_counter() - started) * 1000)
+        single[f"{lines} lines"] = {
+            "median_ms": round(statistics.median(timings), 2),
+            "bytes": len(pdf)
+        }
+
+    contexts = [quote_context(50) for _ in range(args.batch)]
+    started = time.perf_counter()
+    for context in contexts:
+        render_template_pdf(TEMPLATE, context)
+    serial_ms = (time.perf_counter() - started) * 1000
+
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=precompile_templates
+    ) as pool:
+        list(pool.map(render_template_pdf, [TEMPLATE] * args.workers, contexts[:args.workers]))  # start the processes
+        started = time.perf_counter()
+        list(pool.map(render_template_pdf, [TEMPLATE] * len(contexts), contexts))
+        pool_ms = (time.perf_counter() - started) * 1000
+
+    print(json.dumps({
+        "template_compile_ms": round(compile_ms, 2),
+        "single": single,
+        "batch": {
+            "quotes": args.batch,
+            "lines_per_quote": 50,
+            "serial_ms": round(serial_ms, 1),
+            "pool_ms": round(pool_ms, 1),
+            "workers": args.workers
+        }
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
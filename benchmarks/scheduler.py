@@ -0,0 +1,74 @@
+"""
+Scheduler benchmark
+Times scheduler.schedule_jobs on synthetic open jobs, without a database.
+
+Usage:
+    python benchmarks/scheduler.py [--jobs 5000] [--stages 6] [--runs 5]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from scheduler import schedule_jobs
+
+
+def make_jobs(count: int, stages: int, start: date, seed: int = 1) -> list:
+    """Jobs spread across stages with random task counts and due dates"""
+    rng = random.Random(seed)
+    jobs = []
+    for job_id in range(1, count + 1):
+        current = rng.randrange(stages)
+        jobs.append({
+            "job_id": job_id,
+            "reference": f"JOB-{job_id}",
+            "stages": [
+                {
+                    "stage_id": stage_id + 1,
+                    "units": rng.randint(0, 8),
+                    "due_date": start + timedelta(days=rng.randint(1, 120)) if rng.random() < 0.8 else None
+                }
+                for stage_id in range(current, stages)
+            ]
+        })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure production scheduler run time")
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--stages", type=int, default=6)
+    parser.add_argument("--capacity", type=int, default=150, help="tasks per stage per day")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    start = date.today()
+    jobs = make_jobs(args.jobs, args.stages, start)
+    timings = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = schedule_jobs(jobs, start, {}, args.capacity)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "stages": args.stages,
+        "capacity_per_day": args.capacity,
+        "at_risk": sum(1 for job in result if job["at_risk"]),
+        "schedule_ms": {
+            "min": round(min(timings), 2),
+            "median": round(statistics.median(timings), 2),
+            "max": round(max(timings), 2)
+        }
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Search benchmark
+Seeds a scratch SQLite database with clients, contacts and jobs, then times
+/api/search queries on the FTS5 index against the ILIKE fallback.
+
+Usage:
+    python benchmarks/search.py [--records 100000] [--runs 20]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+WORDS = [
+    "acme", "harbour", "signage", "print", "studio", "retail", "group", "civic", "metro", "coastal",
+    "northern", "western", "digital", "brand", "display", "events", "interiors", "fitout", "media", "supply"
+]
+QUERIES = ["acme", "harbour sig", "J12345", "PO-777", "coastal studio", "nomatch"]
+
+
+def seed(engine, records: int):
+    """records/2 clients, records/4 contacts and records/4 jobs with random word names"""
+    from sqlalchemy import insert
+    from models import Base, Client, Contact, Project, Staff, Job
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(1)
+    name = lambda: " ".join(rng.sample(WORDS, 3))
+    with engine.begin() as conn:
+        conn.execute(insert(Client), [
+            {"client_id": i, "name": f"{name()} {i}", "suburb": rng.choice(WORDS)}
+            for i in range(1, records // 2 + 1)
+        ])
+        conn.execute(insert(Contact), [
+            {"contact_id": i, "client_id": i, "first_name": rng.choice(WORDS), "surname": f"smith{i}",
+             "email": f"person{i}@{rng.choice(WORDS)}.com.au"}
+            for i in range(1, records // 4 + 1)
+        ])
+        conn.execute(insert(Project), [{"project_id": 1, "name": "Project"}])
+        conn.execute(insert(Staff), [{"staff_id": 1, "first_name": "A", "surname": "B"}])
+        conn.execute(insert(Job), [
+            {"job_id": i, "reference": f"J{i}", "po": f"PO-{i}", "job_address": f"{i} {name()} st",
+             "project_id": 1, "client_id": 1, "contact_id": 1, "staff_id": 1}
+            for i in range(1, records // 4 + 1)
+        ])
+
+
+def time_queries(db, search, runs: int) -> dict:
+    report = {}
+    for query in QUERIES:
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            results = search(db, query)
+            timings.append((time.perf_counter() - started) * 1000)
+        report[query] = {"results": len(results), "median_ms": round(statistics.median(timings), 2)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search query time")
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'search.db')}"
+        from database import engine, SessionLocal
+        import search_service
+
+        seed(engine, args.records)
+        started = time.perf_counter()
+        backend = search_service.ensure_search_index()
+        index_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        db = SessionLocal()
+        try:
+            fts = time_queries(db, search_service.search, args.runs)
+            search_service._backend = "like"
+            like = time_queries(db, search_service.search, max(1, args.runs // 5))
+        finally:
+            db.close()
+            engine.dispose()
+
+    print(json.dumps({
+        "records": args.records,
+        "backend": backend,
+        "index_build_ms": index_ms,
+        "fts5": fts,
+        "like_fallback": like
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+SQLite read/write concurrency benchmark
+Runs concurrent reader and writer threads against a scratch SQLite database,
+once with SQLite defaults (rollback journal) and once with the tuned profile
+from database.py (WAL + pragmas), and reports throughput and latency.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--readers 8] [--writers 2] [--seconds 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from database import build_engine
+
+SEED_ROWS = 20000
+
+
+def setup_database(engine):
+    """Create and seed the scratch table"""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE bench_tasks ("
+            "task_id INTEGER PRIMARY KEY, job_number INTEGER NOT NULL, "
+            "stage_id INTEGER NOT NULL, task_order INTEGER NOT NULL, task_name TEXT)"
+        ))
+        conn.execute(text("CREATE INDEX ix_bench_tasks_job ON bench_tasks (job_number)"))
+        conn.execute(
+            text(
+                "INSERT INTO bench_tasks (job_number, stage_id, task_order, task_name) "
+                "VALUES (:job_number, :stage_id, :task_order, :task_name)"
+            ),
+            [
+                {"job_number": i % 500, "stage_id": i % 6, "task_order": i, "task_name": f"task {i}"}
+                for i in range(SEED_ROWS)
+            ]
+        )
+
+
+def reader(engine, stop, latencies, errors):
+    """Repeatedly read one job's tasks"""
+    job_number = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(
+                    text("SELECT * FROM bench_tasks WHERE job_number = :job ORDER BY task_order"),
+                    {"job": job_number}
+                ).fetchall()
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            errors.append(1)
+        job_number = (job_number + 7) % 500
+
+
+def writer(engine, stop, latencies, errors):
+    """Repeatedly update a task and insert a new one in one transaction"""
+    counter = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("UPDATE bench_tasks SET stage_id = stage_id + 1 WHERE task_id = :id"),
+                    {"id": counter % SEED_ROWS + 1}
+                )
+                conn.execute(
+                    text(
+                        "INSERT INTO bench_tasks (job_number, stage_id, task_order, task_name) "
+                        "VALUES (:job, 1, :order, 'new')"
+                    ),
+                    {"job": counter % 500, "order": SEED_ROWS + counter}
+                )
+            latencies.append(time.perf_counter() - started)
+        except OperationalError:
+            errors.append(1)
+        counter += 1
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_profile(tuned: bool, readers: int, writers: int, seconds: float) -> dict:
+    """Run the workload against a fresh database file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", sqlite_tuning=tuned)
+        setup_database(engine)
+
+        stop = threading.Event()
+        read_latencies, write_latencies, read_errors, write_errors = [], [], [], []
+        threads = [
+            threading.Thread(target=reader, args=(engine, stop, read_latencies, read_errors))
+            for _ in range(readers)
+        ] + [
+            threading.Thread(target=writer, args=(engine, stop, write_latencies, write_errors))
+            for _ in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "reads_per_s": round(len(read_latencies) / seconds, 1),
+        "writes_per_s": round(len(write_latencies) / seconds, 1),
+        "read_p50_ms": ms(statistics.median(read_latencies)) if read_latencies else None,
+        "read_p95_ms": ms(percentile(read_latencies, 0.95)),
+        "write_p50_ms": ms(statistics.median(write_latencies)) if write_latencies else None,
+        "write_p95_ms": ms(percentile(write_latencies, 0.95)),
+        "read_errors": len(read_errors),
+        "write_errors": len(write_errors)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite default vs tuned concurrency")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    report = {
+        "readers": args.readers,
+        "writers": args.writers,
+        "seconds": args.seconds,
+        "default": run_profile(False, args.readers, args.writers, args.seconds),
+        "tuned": run_profile(True, args.readers, args.writers, args.seconds)
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Startup benchmark
+Measures how long a fresh worker takes to import main.py and run the
+application lifespan startup, in separate interpreter processes.
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--imports]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints import and lifespan timings as JSON
+CHILD_SCRIPT = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+
+async def start():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+t2 = asyncio.run(start())
+print(json.dumps({"import_s": t1 - t0, "lifespan_s": t2 - t1}))
+"""
+
+
+def run_once() -> dict:
+    """Start one worker process and return its timings"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total = time.perf_counter() - started
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_s"] = total
+    return timings
+
+
+def summarize(samples: list) -> dict:
+    """Min/median/max for each timing, in milliseconds"""
+    summary = {}
+    for key in ("import_s", "lifespan_s", "process_s"):
+        values = [sample[key] * 1000 for sample in samples]
+        summary[key.replace("_s", "_ms")] = {
+            "min": round(min(values), 2),
+            "median": round(statistics.median(values), 2),
+            "max": round(max(values), 2)
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API worker startup time")
+    parser.add_argument("--runs", type=int, default=10, help="number of cold starts to time")
+    parser.add_argument("--imports", action="store_true", help="also report per-module import time")
+    args = parser.parse_args()
+
+    samples = [run_once() for _ in range(args.runs)]
+    report = {"runs": args.runs, **summarize(samples)}
+
+    if args.imports:
+        sys.path.insert(0, PROJECT_ROOT)
+        from profiling import profile_imports
+        report["imports"] = profile_imports("main", cwd=PROJECT_ROOT)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
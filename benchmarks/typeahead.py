@@ -0,0 +1,91 @@
+"""
+Typeahead benchmark
+Times typeahead_service.TypeaheadIndex lookups over synthetic client names, without a database.
+
+Usage:
+    python benchmarks/typeahead.py [--records 20000] [--queries 2000]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from typeahead_service import TypeaheadIndex
+
+WORDS = [
+    "acme", "harbour", "signs", "print", "studio", "coastal", "metro", "design", "group",
+    "building", "north", "west", "city", "creative", "graphics", "media", "partners",
+    "projects", "build", "interiors", "retail", "property", "events", "health", "council"
+]
+SUFFIXES = ["Pty Ltd", "Co", "& Sons", "Group", ""]
+
+# (kind, query): one-letter and two-word prefixes, mid-word substrings, typos
+QUERIES = [("1 letter", "a"), ("prefix", "harb"), ("2 words", "coastal des"),
+           ("substring", "raphic"), ("3 letters", "ord"), ("typo", "hrabour"),
+           ("2-word typo", "hrabour sig"), ("no match", "zzzz")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure picker typeahead lookup time")
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000, help="lookups per query kind")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    # Half the words come from the common list above, half are made-up surnames/places
+    syllables = ["ba", "ker", "mor", "ton", "li", "an", "del", "ri", "wes", "ford", "ham", "sa", "vin", "co"]
+    made_up = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(args.records // 4)]
+    names = [
+        " ".join(rng.choice(WORDS if rng.random() < 0.5 else made_up).title() for _ in range(rng.randint(1, 3)))
+        + " " + rng.choice(SUFFIXES)
+        for _ in range(args.records)
+    ]
+    items = [(key, name, None, None, "") for key, name in enumerate(names)]
+
+    started = time.perf_counter()
+    index = TypeaheadIndex()
+    index.extend(items)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    tracemalloc.start()
+    TypeaheadIndex().extend(items)
+    memory_mb = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    results = {}
+    for kind, query in QUERIES:
+        timings = []
+        for _ in range(args.queries):
+            started = time.perf_counter()
+            found = index.lookup(query, 10)
+            timings.append((time.perf_counter() - started) * 1000)
+        results[kind] = {
+            "query": query,
+            "results": len(found),
+            "median_ms": round(statistics.median(timings), 4),
+            "max_ms": round(max(timings), 4)
+        }
+
+    started = time.perf_counter()
+    for key in range(100):
+        index.add(key, names[key] + " Renamed")
+    update_ms = (time.perf_counter() - started) * 1000 / 100
+
+    print(json.dumps({
+        "records": args.records,
+        "build_ms": round(build_ms, 2),
+        "peak_memory_mb": round(memory_mb, 1),
+        "update_ms": round(update_ms, 4),
+        "lookups": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
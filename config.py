@@ -20,14 +20,49 @@ DATABASE_URL: str = os.getenv(
     'sqlite:///outcry_database.db'
 )
 
-# Database connection pool settings
-DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
-DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+# Number of server worker processes (each worker has its own connection pool)
+WEB_CONCURRENCY: int = max(1, int(os.getenv('WEB_CONCURRENCY', str(os.cpu_count() or 1))))
+
+# Total database connections allowed across all workers (e.g. Postgres max_connections
+# minus a reserve for admin tools). When set, per-worker pool sizes are derived from it.
+DB_CONNECTION_BUDGET: Optional[int] = (
+    int(os.getenv('DB_CONNECTION_BUDGET')) if os.getenv('DB_CONNECTION_BUDGET') else None
+)
+
+
+def _pool_sizes_for_budget(budget: Optional[int], workers: int) -> tuple:
+    """
+    Split a total connection budget into per-worker (pool_size, max_overflow)
+    Half of each worker's share is kept open, the rest is burst overflow.
+    """
+    if not budget:
+        return 5, 10
+    per_worker = max(1, budget // workers)
+    pool_size = max(1, (per_worker + 1) // 2)
+    return pool_size, per_worker - pool_size
+
+
+_budget_pool_size, _budget_max_overflow = _pool_sizes_for_budget(DB_CONNECTION_BUDGET, WEB_CONCURRENCY)
+
+# Database connection pool settings (explicit values override the budget split)
+DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', str(_budget_pool_size)))
+DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', str(_budget_max_overflow)))
 DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '3600'))
 
+# Open DB_POOL_SIZE connections during startup so the first requests don't pay for connecting
+DB_POOL_PREWARM: bool = os.getenv('DB_POOL_PREWARM', 'False').lower() == 'true'
+
 # Enable SQLAlchemy echo (SQL query logging)
 DB_ECHO: bool = os.getenv('DB_ECHO', 'False').lower() == 'true'
 
+# SQLite performance profile, applied on connect when DATABASE_URL is SQLite
+# (WAL journal, relaxed fsync, memory-mapped I/O, larger page cache, busy wait)
+SQLITE_TUNING: bool = os.getenv('SQLITE_TUNING', 'True').lower() == 'true'
+SQLITE_SYNCHRONOUS: str = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+SQLITE_MMAP_SIZE: int = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE: int = int(os.getenv('SQLITE_CACHE_SIZE', '-65536'))  # negative = KiB (64MB)
+SQLITE_BUSY_TIMEOUT: int = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))  # milliseconds
+
 
 # ============================================================================
 # DROPBOX CONFIGURATION
@@ -42,6 +77,31 @@ DROPBOX_AVAILABLE: bool = DROPBOX_ACCESS_TOKEN is not None
 # Dropbox base path for uploads
 DROPBOX_BASE_PATH: str = os.getenv('DROPBOX_BASE_PATH', '/Outcry_Projects')
 
+# Seconds to wait for the background Dropbox connection check at startup
+DROPBOX_VALIDATION_TIMEOUT: float = float(os.getenv('DROPBOX_VALIDATION_TIMEOUT', '10'))
+
+
+# ============================================================================
+# FILE STORAGE CONFIGURATION
+# ============================================================================
+
+# Storage backend for uploaded files: 'dropbox' or 'local'
+# Defaults to Dropbox when a token is configured, otherwise local disk
+STORAGE_BACKEND: str = os.getenv(
+    'STORAGE_BACKEND',
+    'dropbox' if DROPBOX_AVAILABLE else 'local'
+).lower()
+
+# Root directory for the local storage backend
+LOCAL_STORAGE_PATH: str = os.getenv('LOCAL_STORAGE_PATH', 'uploads')
+
+# URL prefix under which locally stored files are served
+LOCAL_STORAGE_URL: str = os.getenv('LOCAL_STORAGE_URL', '/api/files')
+
+# Internal location for X-Accel-Redirect / X-Sendfile offloading (e.g. '/protected-uploads')
+# When set, file downloads are handed to the reverse proxy instead of streamed by Python
+LOCAL_STORAGE_ACCEL_REDIRECT: Optional[str] = os.getenv('LOCAL_STORAGE_ACCEL_REDIRECT')
+
 
 # ============================================================================
 # API KEYS
@@ -64,6 +124,9 @@ DEBUG: bool = os.getenv('DEBUG', 'False').lower() == 'true'
 HOST: str = os.getenv('HOST', '0.0.0.0')
 PORT: int = int(os.getenv('PORT', '5001'))
 
+# Seconds in-flight requests get to finish when a worker is asked to stop
+GRACEFUL_SHUTDOWN_TIMEOUT: int = int(os.getenv('GRACEFUL_SHUTDOWN_TIMEOUT', '30'))
+
 # CORS settings
 CORS_ORIGINS: list = os.getenv(
     'CORS_ORIGINS',
@@ -100,6 +163,129 @@ ALLOWED_EXTENSIONS: list = os.getenv(
 ).split(',')
 
 
+# ============================================================================
+# THROUGHPUT SCHEDULING CONFIGURATION
+# ============================================================================
+
+def _parse_stage_capacity(value: str) -> dict:
+    """Parse 'stage_id:tasks_per_day,...' (e.g. '1:20,2:12') into {stage_id: capacity}"""
+    capacities = {}
+    for entry in value.split(','):
+        stage_id, _, capacity = entry.partition(':')
+        if stage_id.strip().isdigit() and capacity.strip().isdigit():
+            capacities[int(stage_id)] = int(capacity)
+    return capacities
+
+
+# Tasks each stage can complete per working day, and the fallback for stages not listed
+SCHEDULE_STAGE_CAPACITY: dict = _parse_stage_capacity(os.getenv('SCHEDULE_STAGE_CAPACITY', ''))
+SCHEDULE_DEFAULT_CAPACITY: int = int(os.getenv('SCHEDULE_DEFAULT_CAPACITY', '10'))
+
+# Working days as weekday numbers (0 = Monday)
+SCHEDULE_WORKING_DAYS: list = [
+    int(day) for day in os.getenv('SCHEDULE_WORKING_DAYS', '0,1,2,3,4').split(',') if day.strip()
+]
+
+
+# ============================================================================
+# CHANGE EVENTS CONFIGURATION
+# ============================================================================
+
+# Fan events out to every worker with Postgres LISTEN/NOTIFY (Postgres only)
+EVENTS_PG_NOTIFY: bool = os.getenv(
+    'EVENTS_PG_NOTIFY',
+    str(DATABASE_URL.startswith('postgres'))
+).lower() == 'true'
+
+# NOTIFY channel shared by all workers
+EVENTS_CHANNEL: str = os.getenv('EVENTS_CHANNEL', 'outcry_events')
+
+# Seconds between keep-alive comments on idle /api/events streams
+EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv('EVENTS_HEARTBEAT_SECONDS', '15'))
+
+# Events buffered per subscriber before the oldest are dropped
+EVENTS_QUEUE_SIZE: int = int(os.getenv('EVENTS_QUEUE_SIZE', '256'))
+
+
+# ============================================================================
+# ANALYTICS CONFIGURATION
+# ============================================================================
+
+# Seconds flow metrics for a period that includes today are cached
+ANALYTICS_CACHE_TTL: int = int(os.getenv('ANALYTICS_CACHE_TTL', '300'))
+
+# Seconds flow metrics for a period that ended before today are cached
+# (still-open statuses keep ageing and completions can be edited later)
+ANALYTICS_PAST_CACHE_TTL: int = int(os.getenv('ANALYTICS_PAST_CACHE_TTL', '3600'))
+
+# Maximum number of cached metric/period results
+ANALYTICS_CACHE_SIZE: int = int(os.getenv('ANALYTICS_CACHE_SIZE', '256'))
+
+# Period used when a flow endpoint is called without from/to
+ANALYTICS_DEFAULT_DAYS: int = int(os.getenv('ANALYTICS_DEFAULT_DAYS', '90'))
+
+
+# ============================================================================
+# JOB HISTORY CONFIGURATION
+# ============================================================================
+
+# Hours between snapshots of every job's status and stage (0 disables them)
+# As-of queries replay job events from the nearest earlier snapshot
+JOB_SNAPSHOT_INTERVAL_HOURS: float = float(os.getenv('JOB_SNAPSHOT_INTERVAL_HOURS', '24'))
+
+# Job aggregates (/api/jobs/{id}/full) kept per worker, keyed by job version (0 disables)
+JOB_DETAIL_CACHE_SIZE: int = int(os.getenv('JOB_DETAIL_CACHE_SIZE', '512'))
+
+
+# ============================================================================
+# QUOTE DOCUMENT CONFIGURATION
+# ============================================================================
+
+# Company name printed at the top of quote PDFs
+QUOTE_PDF_COMPANY: str = os.getenv('QUOTE_PDF_COMPANY', 'Outcry')
+
+# Processes each API worker uses to render quote PDFs (started on first use)
+QUOTE_PDF_WORKERS: int = int(os.getenv('QUOTE_PDF_WORKERS', '2'))
+
+# Rendered quote PDFs kept per worker, keyed by quote and job version (0 disables)
+QUOTE_PDF_CACHE_SIZE: int = int(os.getenv('QUOTE_PDF_CACHE_SIZE', '256'))
+
+
+# ============================================================================
+# DELIVERY CONFIGURATION
+# ============================================================================
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name, '').strip()
+    return float(value) if value else None
+
+
+# Where delivery runs start (the workshop); runs start at the first stop when unset
+DELIVERY_DEPOT_LATITUDE: Optional[float] = _optional_float('DELIVERY_DEPOT_LATITUDE')
+DELIVERY_DEPOT_LONGITUDE: Optional[float] = _optional_float('DELIVERY_DEPOT_LONGITUDE')
+
+# Cell size (km) of the in-memory address grid used by radius searches
+ADDRESS_INDEX_CELL_KM: float = float(os.getenv('ADDRESS_INDEX_CELL_KM', '1.0'))
+
+# Seconds before the address grid is reloaded from the database
+# (writes made through this worker are applied immediately)
+ADDRESS_INDEX_TTL: int = int(os.getenv('ADDRESS_INDEX_TTL', '300'))
+
+
+# ============================================================================
+# SEARCH CONFIGURATION
+# ============================================================================
+
+# Create the search indexes at startup (Postgres GIN indexes, built
+# CONCURRENTLY; SQLite FTS5 table and triggers). Disable to manage them by hand.
+SEARCH_AUTO_INDEX: bool = os.getenv('SEARCH_AUTO_INDEX', 'True').lower() == 'true'
+
+# Picker typeahead: most records per entity held in memory (larger tables are
+# answered from the database), and seconds before an entity is reloaded
+TYPEAHEAD_MAX_RECORDS: int = int(os.getenv('TYPEAHEAD_MAX_RECORDS', '50000'))
+TYPEAHEAD_TTL: int = int(os.getenv('TYPEAHEAD_TTL', '300'))
+
+
 # ============================================================================
 # SECURITY CONFIGURATION
 # ============================================================================
@@ -143,6 +329,50 @@ def validate_config():
     if DROPBOX_AVAILABLE and not DROPBOX_ACCESS_TOKEN:
         errors.append("DROPBOX_ACCESS_TOKEN is required when using Dropbox")
     
+    # Check SQLite profile values (interpolated into PRAGMA statements)
+    if SQLITE_SYNCHRONOUS not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+        errors.append("SQLITE_SYNCHRONOUS must be OFF, NORMAL, FULL or EXTRA")
+    
+    # Check storage backend
+    if STORAGE_BACKEND not in ('dropbox', 'local'):
+        errors.append("STORAGE_BACKEND must be 'dropbox' or 'local'")
+    elif STORAGE_BACKEND == 'dropbox' and not DROPBOX_ACCESS_TOKEN:
+        errors.append("DROPBOX_ACCESS_TOKEN is required when STORAGE_BACKEND is 'dropbox'")
+    
+    # Check scheduling capacity
+    if SCHEDULE_DEFAULT_CAPACITY < 1 or any(c < 1 for c in SCHEDULE_STAGE_CAPACITY.values()):
+        errors.append("Schedule stage capacities must be at least 1 task per day")
+    if not SCHEDULE_WORKING_DAYS or any(day not in range(7) for day in SCHEDULE_WORKING_DAYS):
+        errors.append("SCHEDULE_WORKING_DAYS must list weekday numbers 0-6")
+    
+    # Check change events channel (interpolated into LISTEN)
+    if not EVENTS_CHANNEL.replace('_', '').isalnum():
+        errors.append("EVENTS_CHANNEL may only contain letters, digits and underscores")
+    
+    # Check delivery depot (both coordinates or neither)
+    if (DELIVERY_DEPOT_LATITUDE is None) != (DELIVERY_DEPOT_LONGITUDE is None):
+        errors.append("DELIVERY_DEPOT_LATITUDE and DELIVERY_DEPOT_LONGITUDE must be set together")
+    if ADDRESS_INDEX_CELL_KM <= 0:
+        errors.append("ADDRESS_INDEX_CELL_KM must be greater than 0")
+    
+    # Check typeahead index bounds
+    if TYPEAHEAD_MAX_RECORDS < 1 or TYPEAHEAD_TTL < 1:
+        errors.append("TYPEAHEAD_MAX_RECORDS and TYPEAHEAD_TTL must be at least 1")
+    
+    # Check analytics cache lifetimes
+    if ANALYTICS_CACHE_TTL < 0 or ANALYTICS_PAST_CACHE_TTL < 0:
+        errors.append("ANALYTICS_CACHE_TTL and ANALYTICS_PAST_CACHE_TTL must not be negative")
+    
+    # Check job detail cache size
+    if JOB_DETAIL_CACHE_SIZE < 0:
+        errors.append("JOB_DETAIL_CACHE_SIZE must not be negative")
+    
+    # Check quote PDF rendering
+    if QUOTE_PDF_WORKERS < 1:
+        errors.append("QUOTE_PDF_WORKERS must be at least 1")
+    if QUOTE_PDF_CACHE_SIZE < 0:
+        errors.append("QUOTE_PDF_CACHE_SIZE must not be negative")
+    
     if errors:
         raise ValueError(f"Configuration errors: {', '.join(errors)}")
     
@@ -157,18 +387,26 @@ def get_config_summary() -> dict:
         "database": {
             "url": DATABASE_URL.split('@')[-1] if '@' in DATABASE_URL else DATABASE_URL,
             "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "connection_budget": DB_CONNECTION_BUDGET,
             "echo": DB_ECHO
         },
         "dropbox": {
             "available": DROPBOX_AVAILABLE,
             "base_path": DROPBOX_BASE_PATH
         },
+        "storage": {
+            "backend": STORAGE_BACKEND,
+            "local_path": LOCAL_STORAGE_PATH if STORAGE_BACKEND == 'local' else None,
+            "accel_redirect": LOCAL_STORAGE_ACCEL_REDIRECT is not None
+        },
         "app": {
             "name": APP_NAME,
             "version": APP_VERSION,
             "debug": DEBUG,
             "host": HOST,
-            "port": PORT
+            "port": PORT,
+            "workers": WEB_CONCURRENCY
         },
         "cors": {
             "origins": CORS_ORIGINS if len(CORS_ORIGINS) < 5 else f"{len(CORS_ORIGINS)} origins",
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from models import Base
 # Import all models to ensure they're registered with Base
@@ -6,21 +6,83 @@ from models import (
     Client, Contact, Billing,
     ProductCategory, Product, ProductVariable, VariableOption, ProductProductVariable, MeasureType,
     Project, Quote, Job, Item, ItemVariable, ItemVariableOption,
-    JobStatus, JobStatusHistory,
+    JobStatus, JobStatusHistory, JobEvent, JobStateSnapshot, JobVersion,
     Staff,
-    ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate,
+    ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate, ThroughputJobStageDue,
     Address, Booking, Attachment
 )
-from config import DATABASE_URL, DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE
+from config import (
+    DATABASE_URL, DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE,
+    SQLITE_TUNING, SQLITE_SYNCHRONOUS, SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE, SQLITE_BUSY_TIMEOUT
+)
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Apply the SQLite performance profile to a new connection
+    
+    WAL lets readers run while a writer commits; synchronous=NORMAL is safe
+    with WAL and avoids an fsync per transaction; mmap/cache keep hot pages
+    in memory; busy_timeout makes writers wait instead of failing immediately.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _sqlite_begin_before_savepoint(connection, name):
+    """
+    Open a transaction before a SAVEPOINT issued outside one
+
+    pysqlite only begins a transaction implicitly before INSERT/UPDATE/DELETE,
+    so a begin_nested() as the first write would start its own transaction and
+    its RELEASE would commit the row before the caller could roll it back.
+    Reads still run outside a transaction, so under WAL they don't pin a
+    snapshot that would make a later write fail instead of waiting.
+    """
+    dbapi_connection = connection.connection.dbapi_connection
+    if not dbapi_connection.in_transaction:
+        dbapi_connection.execute("BEGIN")
+
+
+def build_engine(database_url: str = DATABASE_URL, sqlite_tuning: bool = SQLITE_TUNING):
+    """Create an engine with the pool settings from config.py"""
+    is_sqlite = database_url.startswith("sqlite")
+    connect_args = {}
+    if is_sqlite:
+        # Sessions are used from FastAPI's threadpool, not the creating thread
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000}
+    
+    new_engine = create_engine(
+        database_url,
+        echo=DB_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=connect_args
+    )
+    
+    if is_sqlite:
+        event.listen(new_engine, "savepoint", _sqlite_begin_before_savepoint)
+        if sqlite_tuning:
+            event.listen(new_engine, "connect", apply_sqlite_pragmas)
+        # SQLite has no schemas - map client./job./etc. tables onto the main database
+        schemas = {table.schema for table in Base.metadata.tables.values() if table.schema}
+        new_engine = new_engine.execution_options(
+            schema_translate_map={schema: None for schema in schemas}
+        )
+    
+    return new_engine
+
 
 # Create engine with configuration from config.py
-engine = create_engine(
-    DATABASE_URL,
-    echo=DB_ECHO,
-    pool_size=DB_POOL_SIZE,
-    max_overflow=DB_MAX_OVERFLOW,
-    pool_recycle=DB_POOL_RECYCLE
-)
+engine = build_engine()
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -42,3 +104,24 @@ def init_database():
     create_tables()
     print("Database initialized successfully!")
 
+def prewarm_pool(count: int = DB_POOL_SIZE) -> int:
+    """
+    Open up to `count` pooled connections and return them to the pool
+    
+    Called at worker startup so the first requests reuse warm connections
+    instead of paying connection setup. Returns the number opened.
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    finally:
+        for conn in connections:
+            conn.close()
+    return len(connections)
+
+def dispose_engine():
+    """Close all pooled connections (called on worker shutdown)"""
+    engine.dispose()
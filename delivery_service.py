@@ -0,0 +1,322 @@
+"""
+Delivery service - address and booking queries shared by the delivery router and app.py
+
+Addresses are deduplicated on write: find_or_create_address resolves a
+Google place id or a normalized address key to the existing row with one
+indexed lookup, and only inserts when neither matches. A place id never
+matches another place's row by key, so two places that normalize to the same
+text stay apart (the later one is stored without a key). Both columns
+carry unique indexes, so two requests racing to insert the same address end
+with one row - the loser's insert fails inside a savepoint and it re-reads.
+
+Radius searches use an in-memory GridIndex of address coordinates. The grid is
+loaded on first use and reloaded every ADDRESS_INDEX_TTL seconds. Address
+writes committed through SessionLocal on this worker are applied to it straight
+away by session listeners, so it only lags for writes made by other workers.
+"""
+import re
+import threading
+import time
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import and_, event, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+from config import ADDRESS_INDEX_CELL_KM, ADDRESS_INDEX_TTL
+from database import SessionLocal
+from fieldsets import Fieldset, Include
+from geo import GridIndex
+from models.delivery import Address, Booking
+
+_CHANGES_KEY = "address_index_changes"
+
+# Address columns accepted from clients (address_key is derived)
+ADDRESS_FIELDS = (
+    "name", "google_place_id", "formatted_address", "street_number", "street_name",
+    "suburb", "state", "postcode", "country", "latitude", "longitude"
+)
+
+# Street type spellings folded together in address keys
+_STREET_TYPES = {
+    "street": "st", "road": "rd", "avenue": "ave", "drive": "dr", "place": "pl",
+    "parade": "pde", "highway": "hwy", "lane": "ln", "court": "ct", "crescent": "cres",
+    "boulevard": "blvd", "terrace": "tce", "close": "cl", "circuit": "cct"
+}
+_COUNTRIES = {"australia", "au"}
+
+
+# ============================================================================
+# ADDRESS DEDUPLICATION
+# ============================================================================
+
+def normalize_address_key(details: dict) -> Optional[str]:
+    """
+    Dedupe key for an address: lowercased words with street types abbreviated
+
+    Built from formatted_address, or from the street/suburb/state/postcode
+    parts when there is none. A trailing country name is dropped, so
+    "12 Smith Street, Alexandria NSW 2015, Australia" and
+    "12 smith st alexandria nsw 2015" share a key.
+    """
+    text = details.get("formatted_address")
+    if not text:
+        parts = ("street_number", "street_name", "suburb", "state", "postcode")
+        text = " ".join(str(details[part]) for part in parts if details.get(part))
+    words = re.sub(r"[^a-z0-9]+", " ", str(text).lower()).split()
+    while words and words[-1] in _COUNTRIES:
+        words.pop()
+    if not words:
+        return None
+    return " ".join(_STREET_TYPES.get(word, word) for word in words)[:255]
+
+
+def _find_address(db: Session, place_id: Optional[str], address_key: Optional[str]) -> tuple:
+    """
+    (match, key_taken) from one query over both unique indexes
+
+    match is the row with the place id, else the row with the address key
+    unless both carry different place ids. key_taken is True in that case:
+    the key belongs to another place's row, so a new row can't use it.
+    """
+    conditions = []
+    if place_id:
+        conditions.append(Address.google_place_id == place_id)
+    if address_key:
+        conditions.append(Address.address_key == address_key)
+    if not conditions:
+        return None, False
+    by_place = by_key = None
+    for row in db.query(Address).filter(or_(*conditions)):
+        if place_id and row.google_place_id == place_id:
+            by_place = row
+        if address_key and row.address_key == address_key:
+            by_key = row
+    if by_place is not None:
+        return by_place, False
+    if place_id and by_key is not None and by_key.google_place_id not in (None, place_id):
+        return None, True
+    return by_key, False
+
+
+def find_or_create_address(db: Session, details: dict) -> tuple:
+    """
+    (address, created): the row matching `details` by place id or normalized text, else a new one
+
+    `details` holds Address columns (unknown keys are ignored). A matched row
+    keeps its data, but gains a place id or coordinates it was missing. The
+    returned row is flushed; committing is left to the caller.
+    """
+    values = {field: details[field] for field in ADDRESS_FIELDS if details.get(field) is not None}
+    place_id = values.pop("google_place_id", None) or None
+    if place_id:
+        values["google_place_id"] = place_id
+    address_key = normalize_address_key(values)
+
+    address, key_taken = _find_address(db, place_id, address_key)
+    if address is None:
+        try:
+            with db.begin_nested():
+                address = Address(**values, address_key=None if key_taken else address_key)
+                db.add(address)
+            return address, True
+        except IntegrityError:
+            # Inserted concurrently by another request - use that row
+            address, _ = _find_address(db, place_id, address_key)
+            if address is None:
+                raise
+
+    missing = {
+        field: values[field]
+        for field in ("google_place_id", "latitude", "longitude")
+        if getattr(address, field) is None and values.get(field) is not None
+    }
+    if address.address_key is None and address_key:
+        missing["address_key"] = address_key
+    if missing:
+        try:
+            with db.begin_nested():
+                for field, value in missing.items():
+                    setattr(address, field, value)
+        except IntegrityError:
+            pass  # the place id or key belongs to another row; keep this one unchanged
+    return address, False
+
+
+def backfill_address_keys(db: Session) -> int:
+    """
+    Set address_key on rows created before it existed; returns the number set
+
+    Rows whose key is already taken by an earlier row are left without one,
+    so the unique index holds; new bookings resolve to the earliest row.
+    """
+    taken = {key for (key,) in db.query(Address.address_key).filter(Address.address_key.isnot(None))}
+    updated = 0
+    for address in db.query(Address).filter(Address.address_key.is_(None)).order_by(Address.address_id):
+        key = normalize_address_key({field: getattr(address, field) for field in ADDRESS_FIELDS})
+        if key and key not in taken:
+            address.address_key = key
+            taken.add(key)
+            updated += 1
+    db.commit()
+    return updated
+
+
+# ============================================================================
+# BOOKING QUERIES
+# ============================================================================
+
+# Booking columns and relations a read endpoint can return (fields= / include=).
+# Each include is one selectin query for the whole page.
+BOOKING_FIELDSET = Fieldset(
+    Booking,
+    {
+        "addresses": (Booking.pickup_address, Booking.dropoff_address),
+        "creator": Include((Booking.creator,), ("staff_id", "first_name", "surname")),
+        "attachments": Booking.booking_attachments
+    },
+    default_includes=("addresses", "creator")
+)
+
+
+# ============================================================================
+# BOOKING CALENDAR
+# ============================================================================
+
+def booking_calendar(db: Session, from_date: date, to_date: date, include_completed: bool = False) -> list:
+    """
+    Pickups and drop-offs falling between two dates (inclusive), bucketed by day
+
+    The filter is two date ranges OR'd together, one per indexed column, so
+    the database reads both indexes instead of scanning the table. Addresses
+    are joined in the same query. Completed bookings are skipped unless
+    include_completed is set.
+    """
+    query = (
+        db.query(Booking)
+        .options(joinedload(Booking.pickup_address), joinedload(Booking.dropoff_address))
+        .filter(or_(
+            and_(Booking.pickup_date >= from_date, Booking.pickup_date <= to_date),
+            and_(Booking.dropoff_date >= from_date, Booking.dropoff_date <= to_date)
+        ))
+    )
+    if not include_completed:
+        query = query.filter(Booking.completion == False)
+
+    days = {}
+    for booking in query:
+        legs = (
+            ("pickup", booking.pickup_date, booking.pickup_time, booking.pickup_complete, booking.pickup_address),
+            ("dropoff", booking.dropoff_date, booking.dropoff_time, booking.dropoff_complete, booking.dropoff_address)
+        )
+        for kind, leg_date, scheduled_time, completed_at, address in legs:
+            if not from_date <= leg_date <= to_date:
+                continue
+            day = days.setdefault(leg_date, {"date": leg_date, "pickups": [], "dropoffs": []})
+            day[kind + "s"].append({
+                "booking_id": booking.booking_id,
+                "kind": kind,
+                "scheduled_time": scheduled_time,
+                "completed_at": completed_at,
+                "completion": booking.completion,
+                "job_number": booking.job_number,
+                "notes": booking.notes,
+                "address": address
+            })
+
+    for day in days.values():
+        for entries in (day["pickups"], day["dropoffs"]):
+            # Untimed entries after timed ones
+            entries.sort(key=lambda e: (
+                e["scheduled_time"] is None, e["scheduled_time"] or datetime.min.time(), e["booking_id"]
+            ))
+    return [days[day] for day in sorted(days)]
+
+
+# ============================================================================
+# ADDRESS RADIUS SEARCH
+# ============================================================================
+
+
+class AddressIndex:
+    """Address coordinates in a GridIndex, refreshed from the database on a TTL"""
+
+    def __init__(self, cell_km: float = ADDRESS_INDEX_CELL_KM, ttl: int = ADDRESS_INDEX_TTL):
+        self.cell_km = cell_km
+        self.ttl = ttl
+        self._grid: Optional[GridIndex] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session):
+        grid = GridIndex(self.cell_km)
+        rows = db.query(Address.address_id, Address.latitude, Address.longitude).filter(
+            Address.latitude.isnot(None), Address.longitude.isnot(None)
+        )
+        for address_id, latitude, longitude in rows:
+            grid.add(address_id, float(latitude), float(longitude))
+        self._grid = grid
+        self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session):
+        """(Re)load the grid if it was never loaded or is older than the TTL"""
+        if self._grid is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        with self._lock:
+            if self._grid is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._load(db)
+
+    def invalidate(self):
+        """Force a reload on the next search"""
+        self._grid = None
+
+    def apply(self, changes: List[tuple]):
+        """Apply committed (address_id, latitude, longitude) changes; None coordinates remove"""
+        if self._grid is None:
+            return
+        with self._lock:
+            for address_id, latitude, longitude in changes:
+                if latitude is None or longitude is None:
+                    self._grid.remove(address_id)
+                else:
+                    self._grid.add(address_id, float(latitude), float(longitude))
+
+    def nearby(self, db: Session, latitude: float, longitude: float, radius_km: float,
+               limit: Optional[int] = None) -> List[tuple]:
+        """(address_id, distance_km) within radius_km of a point, nearest first"""
+        self.ensure_loaded(db)
+        with self._lock:
+            return self._grid.within(latitude, longitude, radius_km, limit)
+
+
+address_index = AddressIndex()
+
+
+def _collect_address_changes(session: Session, flush_context):
+    """after_flush: remember address coordinate changes until the commit"""
+    changes = session.info.setdefault(_CHANGES_KEY, [])
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Address):
+            changes.append((obj.address_id, obj.latitude, obj.longitude))
+    for obj in session.deleted:
+        if isinstance(obj, Address):
+            changes.append((obj.address_id, None, None))
+
+
+def _apply_address_changes(session: Session):
+    if session.in_nested_transaction():
+        return
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes:
+        address_index.apply(changes)
+
+
+def _discard_address_changes(session: Session):
+    if not session.in_nested_transaction():
+        session.info.pop(_CHANGES_KEY, None)
+
+
+event.listen(SessionLocal, "after_flush", _collect_address_changes)
+event.listen(SessionLocal, "after_commit", _apply_address_changes)
+event.listen(SessionLocal, "after_rollback", _discard_address_changes)
@@ -2,36 +2,90 @@
 Dropbox Service Module
 Handles file uploads to Dropbox
 """
-import dropbox
-from typing import List, Dict, Optional
+import asyncio
+from typing import List, Dict, Optional, TYPE_CHECKING
 import os
 from datetime import datetime
 
+from config import DROPBOX_ACCESS_TOKEN, DROPBOX_VALIDATION_TIMEOUT
+
+# The Dropbox SDK is slow to import, so it is only loaded when a client is created
+if TYPE_CHECKING:
+    import dropbox
+
 # Global Dropbox client instance
-_dropbox_client: Optional[dropbox.Dropbox] = None
+_dropbox_client: Optional["dropbox.Dropbox"] = None
+
+# Cached result of the last connection check - read by /health
+_dropbox_health: Dict[str, Optional[str]] = {
+    "status": "unchecked",
+    "checked_at": None,
+    "error": None
+}
 
 
 def initialize_dropbox_service(access_token: str):
-    """Initialize Dropbox service with access token"""
+    """
+    Initialize Dropbox service with access token
+    
+    Only builds the client - no network call is made here. The connection is
+    checked later by validate_dropbox_service() so startup never waits on Dropbox.
+    """
     global _dropbox_client
     try:
+        import dropbox
         _dropbox_client = dropbox.Dropbox(access_token)
-        # Test the connection
-        _dropbox_client.users_get_current_account()
-        print("Dropbox service initialized successfully")
     except Exception as e:
         print(f"Error initializing Dropbox service: {str(e)}")
         raise
 
 
-def get_dropbox_service() -> dropbox.Dropbox:
-    """Get the Dropbox service instance"""
+def get_dropbox_service() -> "dropbox.Dropbox":
+    """Get the Dropbox service instance, creating it on first use if a token is configured"""
     global _dropbox_client
     if _dropbox_client is None:
-        raise RuntimeError("Dropbox service not initialized. Call initialize_dropbox_service() first.")
+        if not DROPBOX_ACCESS_TOKEN:
+            raise RuntimeError("Dropbox service not initialized. Call initialize_dropbox_service() first.")
+        initialize_dropbox_service(DROPBOX_ACCESS_TOKEN)
     return _dropbox_client
 
 
+def _set_dropbox_health(status: str, error: Optional[str] = None):
+    """Record the outcome of a connection check"""
+    _dropbox_health["status"] = status
+    _dropbox_health["checked_at"] = datetime.now().isoformat()
+    _dropbox_health["error"] = error
+
+
+def get_dropbox_health() -> Dict[str, Optional[str]]:
+    """Get the cached Dropbox health state without touching the network"""
+    return dict(_dropbox_health)
+
+
+async def validate_dropbox_service() -> bool:
+    """
+    Check the Dropbox connection in a worker thread and cache the result
+    
+    Intended to run as a background task from the application lifespan.
+    """
+    try:
+        _dropbox_health["status"] = "checking"
+        # Client creation imports the SDK, so it runs in the thread too
+        await asyncio.wait_for(
+            asyncio.to_thread(lambda: get_dropbox_service().users_get_current_account()),
+            timeout=DROPBOX_VALIDATION_TIMEOUT
+        )
+        _set_dropbox_health("ok")
+        print("✓ Dropbox connection verified")
+        return True
+    except asyncio.TimeoutError:
+        _set_dropbox_health("error", f"Timed out after {DROPBOX_VALIDATION_TIMEOUT}s")
+    except Exception as e:
+        _set_dropbox_health("error", str(e))
+    print(f"⚠ Warning: Dropbox connection check failed: {_dropbox_health['error']}")
+    return False
+
+
 def upload_multiple_files(
     files: List[Dict[str, bytes]],
     entity_id: int,
@@ -48,8 +102,8 @@ def upload_multiple_files(
     Returns:
         List of dicts with 'dropbox_path' and 'dropbox_shared_url'
     """
-    if not _dropbox_client:
-        raise RuntimeError("Dropbox service not initialized")
+    import dropbox
+    client = get_dropbox_service()
     
     results = []
     base_path = f"/{entity_type}/{entity_id}"
@@ -69,14 +123,14 @@ def upload_multiple_files(
         
         try:
             # Upload file to Dropbox
-            _dropbox_client.files_upload(
+            client.files_upload(
                 content,
                 dropbox_path,
                 mode=dropbox.files.WriteMode.overwrite
             )
             
             # Create shared link
-            shared_link = _dropbox_client.sharing_create_shared_link_with_settings(
+            shared_link = client.sharing_create_shared_link_with_settings(
                 dropbox_path
             )
             
@@ -129,11 +183,10 @@ def delete_file(dropbox_path: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    if not _dropbox_client:
-        raise RuntimeError("Dropbox service not initialized")
+    client = get_dropbox_service()
     
     try:
-        _dropbox_client.files_delete_v2(dropbox_path)
+        client.files_delete_v2(dropbox_path)
         return True
     except Exception as e:
         print(f"Error deleting file {dropbox_path} from Dropbox: {str(e)}")
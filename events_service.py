@@ -0,0 +1,225 @@
+"""
+Change events service - in-process pub/sub for the /api/events stream
+
+Write handlers call publish(db, ...) while they have the session open. Events
+are held on the session and only delivered once the transaction commits; a
+rollback discards them. Delivery goes to the EventBroker of this worker, whose
+subscribers are the open SSE streams.
+
+With several workers on Postgres, committed events are also sent with
+pg_notify inside the same transaction. Every worker LISTENs on the channel and
+hands notifications from other workers to its own broker. An event too big for
+one notification is split over several, each carrying part of its list fields,
+and a failed notify is logged without rolling back the write it announces.
+"""
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from config import EVENTS_PG_NOTIFY, EVENTS_CHANNEL, EVENTS_QUEUE_SIZE
+from database import SessionLocal, engine
+
+# Identifies this worker's own NOTIFY messages so they aren't delivered twice
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_PENDING_KEY = "pending_events"
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_MAX_BYTES = 7900
+
+
+class EventBroker:
+    """Fans events out to the subscriber queues of one worker"""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a new subscriber (call from the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _deliver(self, item: dict):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Slow consumer - drop its oldest event rather than block writers
+                queue.get_nowait()
+            queue.put_nowait(item)
+
+    def publish(self, item: dict):
+        """Deliver an event to all subscribers; safe to call from any thread"""
+        if not self._subscribers or self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._deliver, item)
+
+
+broker = EventBroker()
+
+
+def publish(db: Session, event_type: str, **data):
+    """
+    Queue a change event on the session; it is delivered after commit
+
+    Example: publish(db, "task.updated", task_id=1, status_id=2)
+    """
+    db.info.setdefault(_PENDING_KEY, []).append({
+        "type": event_type,
+        "data": data,
+        "at": datetime.now().isoformat(),
+        "origin": WORKER_ID
+    })
+
+
+def notify_payloads(item: dict) -> List[str]:
+    """
+    The NOTIFY payloads for one event, each under NOTIFY_MAX_BYTES
+
+    An event that is too big has its longest list field halved into two
+    events of the same type until every part fits; with no list left to split,
+    only its scalar fields (the ids) are sent, marked truncated.
+    """
+    payload = json.dumps(item, default=str)
+    if len(payload.encode()) <= NOTIFY_MAX_BYTES:
+        return [payload]
+
+    data = item["data"]
+    lists = [name for name, value in data.items() if isinstance(value, list) and len(value) > 1]
+    if not lists:
+        scalars = {
+            name: value for name, value in data.items()
+            if value is None or isinstance(value, (bool, int, float))
+        }
+        return [json.dumps({**item, "data": {**scalars, "truncated": True}}, default=str)]
+
+    name = max(lists, key=lambda list_name: len(data[list_name]))
+    half = len(data[name]) // 2
+    return (
+        notify_payloads({**item, "data": {**data, name: data[name][:half]}})
+        + notify_payloads({**item, "data": {**data, name: data[name][half:]}})
+    )
+
+
+def _notify_other_workers(session: Session):
+    """
+    before_commit: send pending events with pg_notify in the committing transaction
+
+    The notifies run in a SAVEPOINT: if one fails, other workers miss the
+    event, but the write itself still commits.
+    """
+    pending = session.info.get(_PENDING_KEY)
+    if not pending or not EVENTS_PG_NOTIFY or session.in_nested_transaction():
+        return
+    connection = session.connection()
+    try:
+        with connection.begin_nested():
+            for item in pending:
+                for payload in notify_payloads(item):
+                    connection.execute(
+                        text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": EVENTS_CHANNEL, "payload": payload}
+                    )
+    except DBAPIError as e:
+        print(f"⚠ Warning: Could not notify other workers of {len(pending)} events: {str(e)}")
+
+
+def _deliver_committed(session: Session):
+    """after_commit: hand this transaction's events to the local broker"""
+    if session.in_nested_transaction():
+        return  # a SAVEPOINT was released; the real commit is still to come
+    pending = session.info.pop(_PENDING_KEY, None)
+    for item in pending or ():
+        broker.publish(item)
+
+
+def _discard_pending(session: Session):
+    if not session.in_nested_transaction():
+        session.info.pop(_PENDING_KEY, None)
+
+
+event.listen(SessionLocal, "before_commit", _notify_other_workers)
+event.listen(SessionLocal, "after_commit", _deliver_committed)
+event.listen(SessionLocal, "after_rollback", _discard_pending)
+
+
+def _connect_listener():
+    """Open a dedicated autocommit connection LISTENing on the events channel"""
+    pooled = engine.raw_connection()
+    pooled.detach()
+    connection = pooled.dbapi_connection
+    connection.autocommit = True
+    cursor = connection.cursor()
+    cursor.execute(f"LISTEN {EVENTS_CHANNEL}")
+    cursor.close()
+    return connection
+
+
+async def listen_for_notifications(retry_delay: float = 5.0):
+    """
+    Forward NOTIFY messages from other workers to this worker's broker
+
+    Runs for the life of the worker (started from the app lifespan) and
+    reconnects if the listening connection drops.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            connection = await asyncio.to_thread(_connect_listener)
+        except Exception as e:
+            print(f"⚠ Warning: Event listener could not connect: {str(e)}")
+            await asyncio.sleep(retry_delay)
+            continue
+
+        lost = loop.create_future()
+
+        def on_readable():
+            try:
+                connection.poll()
+            except Exception as e:
+                if not lost.done():
+                    lost.set_result(e)
+                return
+            while connection.notifies:
+                notification = connection.notifies.pop(0)
+                try:
+                    item = json.loads(notification.payload)
+                except ValueError:
+                    continue
+                if item.get("origin") != WORKER_ID:
+                    broker.publish(item)
+
+        fileno = connection.fileno()
+        loop.add_reader(fileno, on_readable)
+        try:
+            error = await lost
+            print(f"⚠ Warning: Event listener connection lost: {str(error)}")
+        finally:
+            loop.remove_reader(fileno)
+            try:
+                connection.close()
+            except Exception:
+                pass
+        await asyncio.sleep(retry_delay)
+
+
+def format_sse(item: dict) -> str:
+    """Encode an event in text/event-stream format"""
+    payload = json.dumps({"type": item["type"], "at": item["at"], **item["data"]}, default=str)
+    return f"event: {item['type']}\ndata: {payload}\n\n"
@@ -0,0 +1,171 @@
+"""
+Sparse fieldsets and include-expansion for read endpoints
+
+    GET /api/clients?fields=client_id,name,suburb&include=contacts
+
+`fields=` picks which of the model's columns to return, and `include=` which
+related rows to embed. Both drive the SQL: only the chosen columns are
+selected (load_only), and each include is one selectin query for the whole
+page. Without `fields` every column is returned; without `include` the
+endpoint's default includes are. The primary key is always returned.
+
+Includes nest with dots (`include=quotes.items`), which also includes the
+parent. Unknown names raise ValueError.
+"""
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query, Session, load_only, selectinload
+
+
+class Include(NamedTuple):
+    """Related rows embedded under one include name"""
+    relations: tuple  # relationship attributes, e.g. (Booking.pickup_address, Booking.dropoff_address)
+    columns: Optional[Tuple[str, ...]] = None  # columns of the related rows returned (default: all)
+
+
+class Selection(NamedTuple):
+    columns: Tuple[str, ...]
+    includes: frozenset
+
+
+def _split(value: str) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _keys(mapper, columns) -> set:
+    """Attribute keys of mapped columns"""
+    return {mapper.get_property_by_column(column).key for column in columns}
+
+
+class Fieldset:
+    """The columns and includes one model's read endpoints can return"""
+
+    def __init__(self, model, includes: Optional[Dict[str, object]] = None, default_includes: Sequence[str] = ()):
+        """
+        `includes` maps include names to an Include, a relationship attribute
+        or a tuple of them. A dotted name ("quotes.items") is a relation of
+        the rows of its parent include, which must have a single relation.
+        """
+        mapper = model.__mapper__
+        self.model = model
+        self.columns = tuple(attr.key for attr in mapper.column_attrs)
+        self.primary_key = tuple(_keys(mapper, mapper.primary_key))
+        self.includes = {}
+        for name, spec in (includes or {}).items():
+            if not isinstance(spec, Include):
+                spec = Include(tuple(spec) if isinstance(spec, (tuple, list)) else (spec,))
+            parent = name.rpartition(".")[0]
+            if parent and len(self.includes.get(parent, Include(())).relations) != 1:
+                raise ValueError(f"Include '{name}' needs a parent include '{parent}' with one relation")
+            self.includes[name] = spec
+        self.default_includes = frozenset(default_includes)
+
+    def parse(self, fields: Optional[str] = None, include: Optional[str] = None,
+              default_includes: Optional[Sequence[str]] = None) -> Selection:
+        """
+        Selection for `fields=` and `include=` query values
+
+        None means all columns / the default includes (`default_includes`
+        overrides the Fieldset's, e.g. for a detail view); an empty `include`
+        means none.
+        """
+        columns = self.columns
+        if fields is not None:
+            names = _split(fields)
+            unknown = [name for name in names if name not in self.columns]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(self.columns)})")
+            columns = tuple(dict.fromkeys(self.primary_key + tuple(names)))
+
+        if include is None:
+            includes = self.default_includes if default_includes is None else frozenset(default_includes)
+        else:
+            names = set(_split(include))
+            unknown = names - self.includes.keys()
+            if unknown:
+                raise ValueError(
+                    f"Unknown include: {', '.join(sorted(unknown))} (allowed: {', '.join(self.includes)})"
+                )
+            for name in list(names):
+                while "." in name:
+                    name = name.rpartition(".")[0]
+                    names.add(name)
+            includes = frozenset(names)
+        return Selection(columns, includes)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _children(self, parent: str, selection: Selection) -> list:
+        return [name for name in sorted(selection.includes) if name.rpartition(".")[0] == parent]
+
+    def _related_columns(self, name: str, relation, selection: Selection) -> Optional[list]:
+        """Columns to load for one included relation, or None for all"""
+        include = self.includes[name]
+        if include.columns is None:
+            return None
+        mapper = relation.property.mapper
+        keys = set(include.columns) | _keys(mapper, mapper.primary_key)
+        for child in self._children(name, selection):
+            for child_relation in self.includes[child].relations:
+                keys |= _keys(mapper, child_relation.property.local_columns)
+        return [getattr(mapper.class_, key) for key in sorted(keys)]
+
+    def _loaders(self, name: str, selection: Selection, parent_loader=None) -> list:
+        loaders = []
+        for relation in self.includes[name].relations:
+            loader = parent_loader.selectinload(relation) if parent_loader is not None else selectinload(relation)
+            columns = self._related_columns(name, relation, selection)
+            loaders.append(loader.load_only(*columns) if columns else loader)
+            for child in self._children(name, selection):
+                loaders.extend(self._loaders(child, selection, loader))
+        return loaders
+
+    def options(self, selection: Selection) -> list:
+        """Loader options: load_only for the selected columns, selectinload per include"""
+        options = []
+        keys = set(selection.columns)
+        for name in self._children("", selection):
+            for relation in self.includes[name].relations:
+                # The parent side of the join (e.g. a foreign key) must be loaded too
+                keys |= _keys(self.model.__mapper__, relation.property.local_columns)
+            options.extend(self._loaders(name, selection))
+        if keys != set(self.columns):
+            options.append(load_only(*(getattr(self.model, key) for key in sorted(keys))))
+        return options
+
+    def query(self, db: Session, selection: Selection) -> Query:
+        return db.query(self.model).options(*self.options(selection))
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def _row(self, obj, name: str, selection: Selection) -> dict:
+        include = self.includes[name]
+        keys = include.columns or [attr.key for attr in inspect(obj).mapper.column_attrs]
+        row = {key: getattr(obj, key) for key in keys}
+        for child in self._children(name, selection):
+            row.update(self._embed(obj, child, selection))
+        return row
+
+    def _embed(self, obj, name: str, selection: Selection) -> dict:
+        embedded = {}
+        for relation in self.includes[name].relations:
+            value = getattr(obj, relation.key)
+            if value is None:
+                embedded[relation.key] = None
+            elif isinstance(value, (list, tuple, set)):
+                embedded[relation.key] = [self._row(item, name, selection) for item in value]
+            else:
+                embedded[relation.key] = self._row(value, name, selection)
+        return embedded
+
+    def payload(self, obj, selection: Selection) -> dict:
+        """The selected columns of `obj`, with included rows under their relation names"""
+        data = {key: getattr(obj, key) for key in selection.columns}
+        for name in self._children("", selection):
+            data.update(self._embed(obj, name, selection))
+        return data
@@ -0,0 +1,237 @@
+"""
+Geographic helpers - great-circle distances and delivery run ordering
+
+Distances between all stops of a run are computed in one vectorised haversine
+over NumPy arrays. A run is ordered by nearest neighbour, then improved with
+2-opt. Both steps keep every booking's pickup ahead of its drop-off.
+
+Routes are open paths: they start at the depot (or the first stop) and end at
+the last stop, with no return leg.
+"""
+import math
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+# NumPy is only needed for route planning, so it is loaded on first use
+if TYPE_CHECKING:
+    import numpy
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_matrix(latitudes: Sequence[float], longitudes: Sequence[float]) -> "numpy.ndarray":
+    """N x N matrix of haversine distances (km) between all points"""
+    import numpy as np
+
+    phi = np.radians(np.asarray(latitudes, dtype=float))
+    lam = np.radians(np.asarray(longitudes, dtype=float))
+    d_phi = phi[:, None] - phi[None, :]
+    d_lambda = lam[:, None] - lam[None, :]
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi)[:, None] * np.cos(phi)[None, :] * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ============================================================================
+# ROUTE PLANNING
+# ============================================================================
+
+def _nearest_neighbour(dist, after: List[Optional[int]]) -> List[int]:
+    """
+    Greedy tour over nodes 1..n-2 starting from node 0
+
+    A node is only eligible once the node in `after` (its pickup) is visited.
+    """
+    import numpy as np
+
+    count = len(after)
+    visited = np.zeros(count, dtype=bool)
+    visited[0] = visited[-1] = True
+    waiting = {}
+    eligible = np.zeros(count, dtype=bool)
+    for node in range(1, count - 1):
+        if after[node] is None:
+            eligible[node] = True
+        else:
+            waiting[after[node]] = node
+
+    route = [0]
+    current = 0
+    for _ in range(count - 2):
+        candidates = np.where(eligible & ~visited, dist[current], np.inf)
+        current = int(np.argmin(candidates))
+        visited[current] = True
+        route.append(current)
+        if current in waiting:
+            eligible[waiting.pop(current)] = True
+    route.append(count - 1)
+    return route
+
+
+def _two_opt(dist, route: List[int], after: List[Optional[int]], max_passes: int) -> List[int]:
+    """
+    Reverse segments of the route while that shortens it
+
+    Reversing route[i..j] flips the order of every pickup/drop-off pair inside
+    the segment, so j stops before the first drop-off whose pickup is also in
+    the segment. Deltas for all j of one i are computed in a single NumPy step.
+    """
+    import numpy as np
+
+    route = np.asarray(route)
+    last = len(route) - 2  # route[-1] is the open end
+    is_dropoff = np.array([node is not None for node in after], dtype=bool)
+    pickup = np.array([-1 if node is None else node for node in after])
+
+    for _ in range(max_passes):
+        improved = False
+        position = np.empty(len(route), dtype=int)
+        position[route] = np.arange(len(route))
+        for i in range(1, last):
+            nodes = route[i + 1:last + 1]
+            blocked = np.flatnonzero(is_dropoff[nodes] & (position[pickup[nodes]] >= i))
+            limit = i + 1 + (blocked[0] if len(blocked) else len(nodes))
+            if limit <= i + 1:
+                continue
+
+            a, b = route[i - 1], route[i]
+            c = route[i + 1:limit]
+            d = route[i + 2:limit + 1]
+            delta = dist[a, c] + dist[b, d] - dist[a, b] - dist[c, d]
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                j = i + 1 + best
+                route[i:j + 1] = route[i:j + 1][::-1].copy()
+                position[route] = np.arange(len(route))
+                improved = True
+        if not improved:
+            break
+    return route.tolist()
+
+
+def plan_route(
+    stops: List[dict],
+    start: Optional[tuple] = None,
+    max_passes: int = 50
+) -> dict:
+    """
+    Order delivery stops into a short run
+
+    Each stop is a dict with `latitude`, `longitude` and optionally `after`: the
+    index (in `stops`) of a stop that must be visited first. `start` is an
+    optional (latitude, longitude) the run begins from; without it the run
+    opens at the first eligible stop in list order, then 2-opt may change that.
+
+    Returns {"order": [stop indexes], "legs_km": [distance to each stop],
+    "total_km": float}.
+    """
+    if not stops:
+        return {"order": [], "legs_km": [], "total_km": 0.0}
+
+    # Node 0 is the start and node n+1 the open end; stop k is node k + 1.
+    # The end is 0 km from everything, and so is the start when there is no depot.
+    latitudes = [start[0] if start else 0.0] + [s["latitude"] for s in stops] + [0.0]
+    longitudes = [start[1] if start else 0.0] + [s["longitude"] for s in stops] + [0.0]
+    dist = distance_matrix(latitudes, longitudes)
+    dist[-1, :] = dist[:, -1] = 0.0
+    if start is None:
+        dist[0, :] = dist[:, 0] = 0.0
+
+    after = [None] + [None if s.get("after") is None else s["after"] + 1 for s in stops] + [None]
+    route = _nearest_neighbour(dist, after)
+    route = _two_opt(dist, route, after, max_passes)
+
+    order = [node - 1 for node in route[1:-1]]
+    legs = [round(float(dist[route[k - 1], route[k]]), 3) for k in range(1, len(route) - 1)]
+    return {"order": order, "legs_km": legs, "total_km": round(sum(legs), 3)}
+
+
+
+# ============================================================================
+# GRID INDEX
+# ============================================================================
+
+# Length of one degree of latitude on the sphere haversine_km uses
+KM_PER_DEGREE_LAT = EARTH_RADIUS_KM * math.pi / 180
+
+
+class GridIndex:
+    """
+    In-memory spatial index bucketing points into fixed-size lat/lng cells
+
+    A radius query only looks at the cells overlapping the circle's bounding
+    box (or, when the box spans more cells than are occupied, at the occupied
+    cells inside it), then checks each candidate's haversine distance. Points can be added,
+    moved and removed one at a time. Queries do not wrap at the antimeridian.
+    """
+
+    def __init__(self, cell_km: float = 1.0):
+        self.cell_deg = cell_km / KM_PER_DEGREE_LAT
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def add(self, key, lat: float, lng: float):
+        """Insert or move a point"""
+        self.remove(key)
+        cell = self._cell(lat, lng)
+        self._points[key] = (lat, lng, cell)
+        self._cells.setdefault(cell, {})[key] = (lat, lng)
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        bucket = self._cells.get(point[2])
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[point[2]]
+
+    def _buckets(self, min_row: int, max_row: int, min_col: int, max_col: int):
+        """Occupied cells in a row/col range, walking whichever is smaller: the range or the cells"""
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            for (row, col), bucket in self._cells.items():
+                if min_row <= row <= max_row and min_col <= col <= max_col:
+                    yield bucket
+            return
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                bucket = self._cells.get((row, col))
+                if bucket:
+                    yield bucket
+
+    def within(self, lat: float, lng: float, radius_km: float, limit: Optional[int] = None) -> List[tuple]:
+        """(key, distance_km) of points within radius_km, nearest first"""
+        d_lat = radius_km / KM_PER_DEGREE_LAT
+        # Longitude degrees are shortest at the edge of the band furthest from the
+        # equator; a circle reaching over the pole covers every longitude
+        edge = abs(lat) + d_lat
+        d_lng = 180.0 if edge >= 89.9 else min(
+            180.0, radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(edge)))
+        )
+
+        min_row, min_col = self._cell(lat - d_lat, lng - d_lng)
+        max_row, max_col = self._cell(lat + d_lat, lng + d_lng)
+        found = []
+        for bucket in self._buckets(min_row, max_row, min_col, max_col):
+            for key, (p_lat, p_lng) in bucket.items():
+                if abs(p_lat - lat) > d_lat:
+                    continue
+                distance = haversine_km(lat, lng, p_lat, p_lng)
+                if distance <= radius_km:
+                    found.append((key, distance))
+        found.sort(key=lambda item: item[1])
+        return found[:limit] if limit is not None else found
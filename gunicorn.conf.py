@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration for running the API with uvicorn workers
+
+Usage:
+    gunicorn main:app -c gunicorn.conf.py
+
+Uses the same WEB_CONCURRENCY / DB_CONNECTION_BUDGET settings as serve.py.
+"""
+import os
+
+os.environ.setdefault("DB_POOL_PREWARM", "true")
+
+from config import HOST, PORT, WEB_CONCURRENCY, GRACEFUL_SHUTDOWN_TIMEOUT
+
+bind = f"{HOST}:{PORT}"
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Each worker must open its own database pool, so the app is not preloaded
+preload_app = False
+
+# Give in-flight requests time to finish on SIGTERM / rolling restarts
+graceful_timeout = GRACEFUL_SHUTDOWN_TIMEOUT
+timeout = 120
+keepalive = 5
+
+# Recycle workers periodically, with jitter so they don't all restart at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
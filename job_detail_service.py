@@ -0,0 +1,274 @@
+"""
+Job detail service - the whole job aggregate for the job screen, versioned and cached
+
+GET /api/jobs/{id}/full returns the job with its project, client, contact,
+billing entity, staff, status, stage, status history, quotes and their items,
+throughput tasks, stage dates, and bookings with their addresses and
+attachments. Many-to-one relations are joined into the job query and each
+collection is one selectin query, so the number of queries is fixed however
+big the job is.
+
+Every job has a version stamp (job.job_versions). An after_flush listener on
+SessionLocal bumps it in the same transaction as any write to the job, a row
+under it (quote, item, item variable, chosen option, task, stage date, status
+history, booking, attachment) or a row it shows (client, contact, staff, product, ...).
+Writes that bypass the flush, like bulk UPDATEs, call bump_job_versions
+themselves. The rendered aggregate is cached per worker under (job_id,
+version), and the version doubles as the response ETag.
+
+The quote detail (GET /api/quotes/{id}) is loaded here the same way.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from config import JOB_DETAIL_CACHE_SIZE
+from database import SessionLocal
+from models.client import Billing, Client, Contact
+from models.delivery import Address, Attachment, Booking
+from models.job import (
+    Item, ItemVariable, ItemVariableOption, Job, JobStatus, JobStatusHistory, JobVersion, Project, Quote
+)
+from models.product import MeasureType, Product, ProductVariable, VariableOption
+from models.staff import Staff
+from models.throughput import ThroughputStage, ThroughputStageDate, ThroughputTask
+
+# Rows that name their job directly, and the attribute holding the job id
+_JOB_ATTRIBUTES = {
+    Job: "job_id",
+    Quote: "job_id",
+    JobStatusHistory: "job_id",
+    ThroughputStageDate: "job_id",
+    ThroughputTask: "job_number",
+    Booking: "job_number",  # Text column holding the job id
+}
+
+# Other rows the aggregate contains or shows: the attribute to read, and a
+# query from its values to the ids of the jobs affected
+_RELATED = {
+    Item: ("quote_id", lambda ids: select(Quote.job_id).where(Quote.quote_id.in_(ids))),
+    ItemVariable: ("item_id", lambda ids: (
+        select(Quote.job_id).join(Item, Item.quote_id == Quote.quote_id).where(Item.item_id.in_(ids))
+    )),
+    ItemVariableOption: ("item_variable_id", lambda ids: (
+        select(Quote.job_id)
+        .join(Item, Item.quote_id == Quote.quote_id)
+        .join(ItemVariable, ItemVariable.item_id == Item.item_id)
+        .where(ItemVariable.item_variable_id.in_(ids))
+    )),
+    Attachment: ("booking_id", lambda ids: select(Booking.job_number).where(Booking.booking_id.in_(ids))),
+    Address: ("address_id", lambda ids: select(Booking.job_number).where(
+        or_(Booking.pickup_address_id.in_(ids), Booking.dropoff_address_id.in_(ids))
+    )),
+    Project: ("project_id", lambda ids: select(Job.job_id).where(Job.project_id.in_(ids))),
+    Client: ("client_id", lambda ids: select(Job.job_id).where(Job.client_id.in_(ids))),
+    Contact: ("contact_id", lambda ids: select(Job.job_id).where(Job.contact_id.in_(ids))),
+    Billing: ("billing_id", lambda ids: select(Job.job_id).where(Job.billing_entity.in_(ids))),
+    Staff: ("staff_id", lambda ids: select(Job.job_id).where(Job.staff_id.in_(ids))),
+    JobStatus: ("job_status_id", lambda ids: select(Job.job_id).where(Job.job_status_id.in_(ids))),
+    ThroughputStage: ("stage_id", lambda ids: select(Job.job_id).where(Job.stage_id.in_(ids))),
+    # Product names and options are shown on quotes
+    Product: ("product_id", lambda ids: (
+        select(Quote.job_id).join(Item, Item.quote_id == Quote.quote_id).where(Item.product_id.in_(ids))
+    )),
+    MeasureType: ("measure_type_id", lambda ids: (
+        select(Quote.job_id)
+        .join(Item, Item.quote_id == Quote.quote_id)
+        .join(Product, Product.product_id == Item.product_id)
+        .where(Product.measure_type_id.in_(ids))
+    )),
+    ProductVariable: ("product_variable_id", lambda ids: (
+        select(Quote.job_id)
+        .join(Item, Item.quote_id == Quote.quote_id)
+        .join(ItemVariable, ItemVariable.item_id == Item.item_id)
+        .where(ItemVariable.product_variable_id.in_(ids))
+    )),
+    VariableOption: ("variable_option_id", lambda ids: (
+        select(Quote.job_id)
+        .join(Item, Item.quote_id == Quote.quote_id)
+        .join(ItemVariable, ItemVariable.item_id == Item.item_id)
+        .join(ItemVariableOption, ItemVariableOption.item_variable_id == ItemVariable.item_variable_id)
+        .where(ItemVariableOption.variable_option_id.in_(ids))
+    )),
+}
+
+
+def _job_id(value) -> Optional[int]:
+    """A job id from an Integer column or Booking.job_number text"""
+    if value is None:
+        return None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _values(obj, attribute: str) -> set:
+    """Current and (for a changed row) previous values of one attribute"""
+    values = {getattr(obj, attribute)}
+    history = inspect(obj).attrs[attribute].history
+    values.update(history.deleted)
+    values.discard(None)
+    return values
+
+
+def _bump(connection, job_ids: Iterable[int]):
+    """Upsert version + 1 for each job; ids are sorted so concurrent writers lock in the same order"""
+    job_ids = sorted(set(job_ids))
+    if not job_ids:
+        return
+    now = datetime.utcnow()
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(JobVersion).values([
+        {"job_id": job_id, "version": 1, "updated_at": now} for job_id in job_ids
+    ])
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[JobVersion.job_id],
+        set_={"version": JobVersion.version + 1, "updated_at": statement.excluded.updated_at}
+    ))
+
+
+def _bump_job_versions(session: Session, flush_context):
+    """after_flush: bump the version of every job the flushed rows belong to"""
+    job_ids = set()
+    related = {}
+    changed = [
+        obj for obj in session.dirty if session.is_modified(obj, include_collections=False)
+    ]
+    for obj in [*session.new, *changed, *session.deleted]:
+        model = type(obj)
+        if model in _JOB_ATTRIBUTES:
+            job_ids.update(_job_id(value) for value in _values(obj, _JOB_ATTRIBUTES[model]))
+        elif model in _RELATED:
+            related.setdefault(model, set()).update(_values(obj, _RELATED[model][0]))
+
+    connection = session.connection()
+    for model, values in related.items():
+        query = _RELATED[model][1](values)
+        job_ids.update(_job_id(value) for value in connection.execute(query).scalars())
+    job_ids.discard(None)
+    _bump(connection, job_ids)
+
+
+event.listen(SessionLocal, "after_flush", _bump_job_versions)
+
+
+def bump_job_versions(db: Session, job_ids: Iterable[int]):
+    """Bump job versions for writes made without a flush (e.g. bulk UPDATEs)"""
+    _bump(db.connection(), (_job_id(job_id) for job_id in job_ids if job_id is not None))
+
+
+def job_version(db: Session, job_id: int) -> Optional[int]:
+    """
+    The job's current version stamp, or None if there is no such job
+
+    A job that has not been written since versions were added is at 0.
+    """
+    row = (
+        db.query(JobVersion.version)
+        .select_from(Job)
+        .outerjoin(JobVersion, JobVersion.job_id == Job.job_id)
+        .filter(Job.job_id == job_id)
+        .first()
+    )
+    return None if row is None else row.version or 0
+
+
+# ============================================================================
+# LOADING AND CACHING
+# ============================================================================
+
+def load_job_graph(db: Session, job_id: int) -> Optional[tuple]:
+    """(job, bookings) with every relation the aggregate shows loaded, or None if there is no such job"""
+    job = (
+        db.query(Job)
+        .options(
+            joinedload(Job.project),
+            joinedload(Job.client),
+            joinedload(Job.contact),
+            joinedload(Job.billing),
+            joinedload(Job.staff),
+            joinedload(Job.job_status),
+            joinedload(Job.stage),
+            selectinload(Job.status_history),
+            selectinload(Job.quotes).selectinload(Quote.items),
+            selectinload(Job.tasks),
+            selectinload(Job.stage_dates)
+        )
+        .filter(Job.job_id == job_id)
+        .first()
+    )
+    if job is None:
+        return None
+
+    bookings = (
+        db.query(Booking)
+        .options(
+            joinedload(Booking.pickup_address),
+            joinedload(Booking.dropoff_address),
+            joinedload(Booking.creator),
+            selectinload(Booking.booking_attachments)
+        )
+        .filter(Booking.job_number == str(job_id))
+        .order_by(Booking.pickup_date, Booking.booking_id)
+        .all()
+    )
+    return job, bookings
+
+
+def _quote_graph(db: Session):
+    return db.query(Quote).options(
+        selectinload(Quote.items).options(
+            joinedload(Item.product).joinedload(Product.measure_type),
+            selectinload(Item.item_variables).options(
+                joinedload(ItemVariable.product_variable),
+                selectinload(ItemVariable.item_variable_options).joinedload(ItemVariableOption.variable_option)
+            )
+        )
+    )
+
+
+def load_quote_graph(db: Session, quote_id: int) -> Optional[Quote]:
+    """
+    A quote with its items, each item's product and measure type, and its
+    variables with their chosen options, in four queries whatever the size
+    """
+    return _quote_graph(db).filter(Quote.quote_id == quote_id).first()
+
+
+def load_quote_graphs(db: Session, quote_ids: Iterable[int]) -> list:
+    """load_quote_graph for many quotes, still in four queries"""
+    return _quote_graph(db).filter(Quote.quote_id.in_(list(quote_ids))).order_by(Quote.quote_id).all()
+
+
+_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+
+def clear_cache():
+    """Drop all cached job aggregates"""
+    _cache.clear()
+
+
+def cached_job_detail(job_id: int, version: int, render: Callable[[], Optional[bytes]]) -> Optional[bytes]:
+    """
+    The rendered aggregate for (job_id, version), calling render() on a miss
+
+    A stale entry is never served: any write moves the job to a new version,
+    and old versions age out of the LRU.
+    """
+    key = (job_id, version)
+    body = _cache.get(key)
+    if body is not None:
+        _cache.move_to_end(key)
+        return body
+
+    body = render()
+    if body is not None and JOB_DETAIL_CACHE_SIZE > 0:
+        _cache[key] = body
+        while len(_cache) > JOB_DETAIL_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body
@@ -0,0 +1,152 @@
+"""
+Job history service - append-only job event log and as-of state queries
+
+A before_flush listener on SessionLocal writes a JobEvent for every job that
+is created, deleted, or has its job_status_id or stage_id changed, so no
+route has to remember to record history.
+
+"State of all jobs as of X" starts from the latest JobStateSnapshot at or
+before X and replays only the events after it. Snapshots are taken
+periodically from the app lifespan (JOB_SNAPSHOT_INTERVAL_HOURS).
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import event, func, inspect, insert, literal, select
+from sqlalchemy.orm import Session
+
+from config import JOB_SNAPSHOT_INTERVAL_HOURS
+from database import SessionLocal
+from models.job import Job, JobEvent, JobStateSnapshot
+
+# Job columns whose changes are logged, and the event type for each
+_TRACKED = {"job_status_id": "status", "stage_id": "stage"}
+
+
+def _record_job_events(session: Session, flush_context, instances):
+    """before_flush: add JobEvent rows for pending job changes"""
+    now = datetime.utcnow()
+    events = []
+
+    for obj in session.new:
+        if isinstance(obj, Job):
+            events.append(JobEvent(job=obj, event_type="created", to_value=obj.job_status_id, occurred_at=now))
+            if obj.stage_id is not None:
+                events.append(JobEvent(job=obj, event_type="stage", to_value=obj.stage_id, occurred_at=now))
+
+    for obj in session.dirty:
+        if not isinstance(obj, Job):
+            continue
+        state = inspect(obj)
+        for column, event_type in _TRACKED.items():
+            history = state.attrs[column].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old != new:
+                events.append(JobEvent(
+                    job_id=obj.job_id, event_type=event_type,
+                    from_value=old, to_value=new, occurred_at=now
+                ))
+
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            events.append(JobEvent(
+                job_id=obj.job_id, event_type="deleted",
+                from_value=obj.job_status_id, occurred_at=now
+            ))
+
+    session.add_all(events)
+
+
+event.listen(SessionLocal, "before_flush", _record_job_events)
+
+
+# ============================================================================
+# SNAPSHOTS AND AS-OF QUERIES
+# ============================================================================
+
+def take_snapshot(db: Session, taken_at: Optional[datetime] = None) -> int:
+    """Record the current status and stage of every job; returns the row count"""
+    taken_at = taken_at or datetime.utcnow()
+    result = db.execute(
+        insert(JobStateSnapshot).from_select(
+            ["taken_at", "job_id", "job_status_id", "stage_id"],
+            select(
+                literal(taken_at, JobStateSnapshot.taken_at.type),
+                Job.job_id,
+                Job.job_status_id,
+                Job.stage_id
+            )
+        )
+    )
+    return result.rowcount
+
+
+def latest_snapshot_time(db: Session, before: Optional[datetime] = None) -> Optional[datetime]:
+    query = db.query(func.max(JobStateSnapshot.taken_at))
+    if before is not None:
+        query = query.filter(JobStateSnapshot.taken_at <= before)
+    return query.scalar()
+
+
+def job_states_as_of(db: Session, as_of: datetime) -> dict:
+    """
+    {job_id: {"job_status_id", "stage_id"}} for every job that existed at `as_of`
+
+    Loads the nearest earlier snapshot and replays the events after it.
+    """
+    taken_at = latest_snapshot_time(db, as_of)
+    states = {}
+    if taken_at is not None:
+        for row in db.query(JobStateSnapshot).filter(JobStateSnapshot.taken_at == taken_at):
+            states[row.job_id] = {"job_status_id": row.job_status_id, "stage_id": row.stage_id}
+
+    events = db.query(JobEvent).filter(JobEvent.occurred_at <= as_of)
+    if taken_at is not None:
+        events = events.filter(JobEvent.occurred_at > taken_at)
+    for job_event in events.order_by(JobEvent.occurred_at, JobEvent.job_event_id):
+        if job_event.event_type == "created":
+            states[job_event.job_id] = {"job_status_id": job_event.to_value, "stage_id": None}
+        elif job_event.event_type == "deleted":
+            states.pop(job_event.job_id, None)
+        elif job_event.job_id in states:
+            key = "job_status_id" if job_event.event_type == "status" else "stage_id"
+            states[job_event.job_id][key] = job_event.to_value
+    return states
+
+
+def snapshot_if_due() -> int:
+    """
+    Take a snapshot if none exists or the latest is older than the interval
+
+    Runs in its own session (called from the lifespan task). The first run
+    also gives jobs that predate the event log a baseline state.
+    """
+    db = SessionLocal()
+    try:
+        latest = latest_snapshot_time(db)
+        if latest is not None and datetime.utcnow() - latest < timedelta(hours=JOB_SNAPSHOT_INTERVAL_HOURS):
+            return 0
+        count = take_snapshot(db)
+        db.commit()
+        return count
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_periodic_snapshots():
+    """Lifespan task: check every hour whether a snapshot is due"""
+    while True:
+        try:
+            taken = await asyncio.to_thread(snapshot_if_due)
+            if taken:
+                print(f"✓ Job state snapshot taken for {taken} jobs")
+        except Exception as e:
+            print(f"⚠ Warning: Job state snapshot failed: {str(e)}")
+        await asyncio.sleep(3600)
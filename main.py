@@ -2,12 +2,18 @@
 FastAPI Application Entry Point
 Main entry point for the Outcry Projects API
 """
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import configuration
 from config import (
+    DB_POOL_PREWARM,
+    EVENTS_PG_NOTIFY,
+    JOB_SNAPSHOT_INTERVAL_HOURS,
     DROPBOX_AVAILABLE,
     DROPBOX_ACCESS_TOKEN,
     CORS_ORIGINS,
@@ -20,13 +26,24 @@ from config import (
     PORT
 )
 
+from database import prewarm_pool, dispose_engine
+from throughput_service import initialize_job_stage_due
+from events_service import listen_for_notifications
+from job_history_service import run_periodic_snapshots
+from search_service import ensure_search_index
+from typeahead_service import build_typeahead
+from quote_pdf_service import shutdown_render_pool
+
 # Import routers
 from routers import (
+    analytics_router,
     client_router,
     delivery_router,
+    events_router,
     job_router,
     product_router,
     public_router,
+    search_router,
     staff_router,
     throughput_router,
     upload_router,  # File upload router
@@ -34,17 +51,79 @@ from routers import (
 
 # Try to import dropbox_service, but make it optional
 try:
-    from dropbox_service import initialize_dropbox_service
+    from dropbox_service import validate_dropbox_service, get_dropbox_health
 except ImportError:
+    validate_dropbox_service = None
     print("Warning: dropbox_service not available")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup/shutdown
+    
+    The Dropbox client is created lazily on first use; here its connection is
+    only checked in the background, so worker startup never waits on the network.
+    """
+    background_tasks = []
+    
+    if DB_POOL_PREWARM:
+        try:
+            opened = await asyncio.to_thread(prewarm_pool)
+            print(f"✓ Database pool pre-warmed with {opened} connections")
+        except Exception as e:
+            print(f"⚠ Warning: Failed to pre-warm database pool: {str(e)}")
+    
+    try:
+        built = await asyncio.to_thread(initialize_job_stage_due)
+        if built:
+            print(f"✓ Built stage due-date index for {built} jobs")
+    except Exception as e:
+        print(f"⚠ Warning: Failed to build stage due-date index: {str(e)}")
+    
+    try:
+        backend = await asyncio.to_thread(ensure_search_index)
+        print(f"✓ Search ready ({backend})")
+    except Exception as e:
+        print(f"⚠ Warning: Failed to set up search indexes: {str(e)}")
+    
+    try:
+        loaded = await asyncio.to_thread(build_typeahead)
+        print(f"✓ Typeahead index loaded ({sum(count or 0 for count in loaded.values())} records)")
+    except Exception as e:
+        print(f"⚠ Warning: Failed to load typeahead index: {str(e)}")
+    
+    # Job state snapshots for as-of queries (first run gives a baseline)
+    if JOB_SNAPSHOT_INTERVAL_HOURS > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_snapshots()))
+    
+    # Multi-worker fan-out of change events for /api/events
+    if EVENTS_PG_NOTIFY:
+        background_tasks.append(asyncio.create_task(listen_for_notifications()))
+    
+    if validate_dropbox_service and DROPBOX_AVAILABLE and DROPBOX_ACCESS_TOKEN:
+        background_tasks.append(asyncio.create_task(validate_dropbox_service()))
+    elif DROPBOX_AVAILABLE:
+        print("⚠ Warning: DROPBOX_ACCESS_TOKEN not found in environment variables")
+    
+    yield
+    
+    for task in background_tasks:
+        if not task.done():
+            task.cancel()
+    
+    shutdown_render_pool()
+    dispose_engine()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=APP_NAME,
     version=APP_VERSION,
     description="Outcry Projects API - FastAPI backend for project management",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware - Fully open for React frontend development
@@ -59,22 +138,15 @@ app.add_middleware(
 # Note: Static files and templates removed - this is an API-only backend
 # Static files for uploads are handled via Dropbox integration
 
-# Initialize Dropbox service (if available)
-if DROPBOX_AVAILABLE and DROPBOX_ACCESS_TOKEN:
-    try:
-        initialize_dropbox_service(DROPBOX_ACCESS_TOKEN)
-        print("✓ Dropbox service initialized successfully")
-    except Exception as e:
-        print(f"⚠ Warning: Failed to initialize Dropbox service: {str(e)}")
-elif DROPBOX_AVAILABLE:
-    print("⚠ Warning: DROPBOX_ACCESS_TOKEN not found in environment variables")
-
 # Include routers - All domain routers
+app.include_router(analytics_router)   # Analytics: flow metrics
 app.include_router(client_router)      # Client domain: Client, Contact, Billing
 app.include_router(delivery_router)   # Delivery domain: Address, Booking, Attachment
+app.include_router(events_router)     # Change events: SSE stream for board screens
 app.include_router(job_router)        # Job domain: Project, Quote, Job, Item, etc.
 app.include_router(product_router)     # Product domain: Product, Category, Variable, etc.
 app.include_router(public_router)      # Public schema: General/system tables
+app.include_router(search_router)      # Search: ranked search, picker typeahead
 app.include_router(staff_router)      # Staff domain: Staff
 app.include_router(throughput_router)  # Throughput domain: Status, Stage, Task, StageDate
 app.include_router(upload_router)      # File upload: Dropbox integration
@@ -99,11 +171,14 @@ async def root():
 async def health_check():
     """
     Health check endpoint
+    
+    Dropbox state is the cached result of the background connection check.
     """
     return {
         "status": "healthy",
         "service": APP_NAME,
-        "version": APP_VERSION
+        "version": APP_VERSION,
+        "dropbox": get_dropbox_health() if validate_dropbox_service else {"status": "unavailable"}
     }
 
 # API info endpoint
@@ -136,6 +211,15 @@ async def get_google_maps_key():
 
 
 if __name__ == "__main__":
+    import sys
+    
+    # Startup profiling mode: report per-module import time as JSON and exit
+    if "--profile-startup" in sys.argv:
+        import json
+        from profiling import profile_imports
+        print(json.dumps(profile_imports("main"), indent=2))
+        sys.exit(0)
+    
     import uvicorn
     
     print(f"Starting {APP_NAME} v{APP_VERSION}")
@@ -12,10 +12,10 @@ from .client import Client, Contact, Billing
 from .product import ProductCategory, Product, ProductVariable, VariableOption, ProductProductVariable, MeasureType
 from .job import (
     Project, Quote, Job, Item, ItemVariable, ItemVariableOption,
-    JobStatus, JobStatusHistory
+    JobStatus, JobStatusHistory, JobEvent, JobStateSnapshot, JobVersion
 )
 from .staff import Staff
-from .throughput import ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate
+from .throughput import ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate, ThroughputJobStageDue
 from .delivery import Address, Booking, Attachment
 from .public import *  # Import any public schema models
 
@@ -42,6 +42,9 @@ __all__ = [
     "ItemVariableOption",
     "JobStatus",
     "JobStatusHistory",
+    "JobEvent",
+    "JobStateSnapshot",
+    "JobVersion",
     # Staff models
     "Staff",
     # Throughput models
@@ -49,6 +52,7 @@ __all__ = [
     "ThroughputStage",
     "ThroughputTask",
     "ThroughputStageDate",
+    "ThroughputJobStageDue",
     # Delivery models
     "Address",
     "Booking",
@@ -14,7 +14,7 @@ class Address(Base):
     
     address_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255))
-    google_place_id = Column(String(255))
+    google_place_id = Column(String(255), unique=True, index=True)
     formatted_address = Column(Text)
     street_number = Column(String(50))
     street_name = Column(String(255))
@@ -24,6 +24,8 @@ class Address(Base):
     country = Column(String(100))
     latitude = Column(Numeric(10, 8))
     longitude = Column(Numeric(11, 8))
+    # Normalized address text, the dedupe key for addresses without a place id
+    address_key = Column(String(255), unique=True, index=True)
     
     # Relationships
     pickup_bookings = relationship("Booking", foreign_keys="[Booking.pickup_address_id]", back_populates="pickup_address")
@@ -40,19 +42,19 @@ class Booking(Base):
     
     booking_id = Column(Integer, primary_key=True, autoincrement=True)
     pickup_address_id = Column(Integer, ForeignKey('delivery.address.address_id'))
-    pickup_date = Column(Date, nullable=False)
+    pickup_date = Column(Date, nullable=False, index=True)
     pickup_time = Column(Time)
     dropoff_address_id = Column(Integer, ForeignKey('delivery.address.address_id'))
-    dropoff_date = Column(Date, nullable=False)
+    dropoff_date = Column(Date, nullable=False, index=True)
     dropoff_time = Column(Time)
-    creator_id = Column(Integer, ForeignKey('staff.staff.staff_id'), nullable=False)
+    creator_id = Column(Integer, ForeignKey('staff.staff.staff_id'), nullable=False, index=True)
     notes = Column(Text)
     attachments = Column(Integer, ForeignKey('delivery.attachment.attachment_id'))
-    job_number = Column(Text)
+    job_number = Column(Text, index=True)
     pickup_complete = Column(DateTime)
     dropoff_complete = Column(DateTime)
     created = Column(DateTime, default=datetime.utcnow)
-    completion = Column(Boolean, default=False, nullable=False)
+    completion = Column(Boolean, default=False, nullable=False, index=True)
     
     # Relationships
     pickup_address = relationship("Address", foreign_keys=[pickup_address_id], back_populates="pickup_bookings")
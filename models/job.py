@@ -15,10 +15,10 @@ class Project(Base):
     project_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(Text, nullable=False)
     address = Column(Text)
-    suburb = Column(Text)
+    suburb = Column(Text, index=True)
     state = Column(Text)  # Enum_Common.State equivalent
     postcode = Column(Integer)  # Numeric(4) equivalent
-    date_created = Column(Date, default=datetime.utcnow().date())
+    date_created = Column(Date, default=lambda: datetime.utcnow().date(), index=True)
     
     # Relationships
     jobs = relationship("Job", back_populates="project")
@@ -49,20 +49,20 @@ class Job(Base):
     
     job_id = Column(Integer, primary_key=True, autoincrement=True)
     reference = Column(Text, nullable=False)
-    project_id = Column(Integer, ForeignKey('job.projects.project_id'), nullable=False)
-    client_id = Column(Integer, ForeignKey('client.clients.client_id'), nullable=False)
+    project_id = Column(Integer, ForeignKey('job.projects.project_id'), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey('client.clients.client_id'), nullable=False, index=True)
     billing_entity = Column(Integer, ForeignKey('client.billing.billing_id'), nullable=True)
     po = Column(Text)  # Purchase Order
-    date_created = Column(Date, default=datetime.utcnow().date())
+    date_created = Column(Date, default=lambda: datetime.utcnow().date(), index=True)
     contact_id = Column(Integer, ForeignKey('client.contacts.contact_id'), nullable=False)
-    staff_id = Column(Integer, ForeignKey('staff.staff.staff_id'), nullable=False)
-    job_status_id = Column(Integer, ForeignKey('job.job_statuses.job_status_id'))
+    staff_id = Column(Integer, ForeignKey('staff.staff.staff_id'), nullable=False, index=True)
+    job_status_id = Column(Integer, ForeignKey('job.job_statuses.job_status_id'), index=True)
     job_address = Column(Text)
     suburb = Column(Text)
     state = Column(Text)
     postcode = Column(Integer)
     approved_quote = Column(Integer, ForeignKey('job.quote.quote_id'), nullable=True)
-    stage_id = Column(Integer, ForeignKey('throughput.stage.stage_id'), nullable=True)
+    stage_id = Column(Integer, ForeignKey('throughput.stage.stage_id'), nullable=True, index=True)
     assets = Column(Text)
     
     # Relationships
@@ -74,7 +74,13 @@ class Job(Base):
     job_status = relationship("JobStatus")
     status_history = relationship("JobStatusHistory", back_populates="job", cascade="all, delete-orphan")
     approved_quote_rel = relationship("Quote", foreign_keys=[approved_quote])
+    quotes = relationship("Quote", foreign_keys="Quote.job_id", order_by="Quote.quote_id", viewonly=True)
     stage = relationship("ThroughputStage")
+    tasks = relationship(
+        "ThroughputTask", foreign_keys="ThroughputTask.job_number",
+        order_by="(ThroughputTask.stage_id, ThroughputTask.task_order)", viewonly=True
+    )
+    stage_dates = relationship("ThroughputStageDate", order_by="ThroughputStageDate.due_date", viewonly=True)
     
     def __repr__(self):
         return f"<Job(job_id={self.job_id}, reference='{self.reference}')>"
@@ -88,7 +94,7 @@ class JobStatusHistory(Base):
     job_status_history_id = Column(Integer, primary_key=True, autoincrement=True)
     job_id = Column(Integer, ForeignKey('job.jobs.job_id'), nullable=False)
     job_status_id = Column(Integer, ForeignKey('job.job_statuses.job_status_id'), nullable=False)
-    date = Column(Date, default=datetime.utcnow().date())
+    date = Column(Date, default=lambda: datetime.utcnow().date(), index=True)
     
     # Relationships
     job = relationship("Job", back_populates="status_history")
@@ -98,6 +104,68 @@ class JobStatusHistory(Base):
         return f"<JobStatusHistory(job_status_history_id={self.job_status_history_id}, job_id={self.job_id})>"
 
 
+class JobEvent(Base):
+    """
+    Append-only log of job status and stage changes with precise timestamps
+    
+    Rows are written by a flush listener (job_history_service) whenever a
+    job is created or deleted or its job_status_id/stage_id changes, whatever
+    code path made the change. job_id has no foreign key so events outlive
+    deleted jobs.
+    """
+    __tablename__ = 'job_events'
+    __table_args__ = {'schema': 'job'}
+    
+    job_event_id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, nullable=False, index=True)
+    event_type = Column(Text, nullable=False)  # created, status, stage, deleted
+    from_value = Column(Integer, nullable=True)
+    to_value = Column(Integer, nullable=True)
+    occurred_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    # Lets an event for a new job be flushed with it (job_id is filled in by the UOW)
+    job = relationship("Job", primaryjoin="foreign(JobEvent.job_id) == Job.job_id")
+    
+    def __repr__(self):
+        return (
+            f"<JobEvent(job_event_id={self.job_event_id}, job_id={self.job_id}, "
+            f"event_type='{self.event_type}', from_value={self.from_value}, to_value={self.to_value})>"
+        )
+
+
+class JobStateSnapshot(Base):
+    """Status and stage of every job at a point in time - the starting point for as-of queries"""
+    __tablename__ = 'job_state_snapshots'
+    __table_args__ = {'schema': 'job'}
+    
+    taken_at = Column(DateTime, primary_key=True)
+    job_id = Column(Integer, primary_key=True)
+    job_status_id = Column(Integer, nullable=True)
+    stage_id = Column(Integer, nullable=True)
+    
+    def __repr__(self):
+        return f"<JobStateSnapshot(taken_at='{self.taken_at}', job_id={self.job_id})>"
+
+
+class JobVersion(Base):
+    """
+    Per-job version stamp, bumped on every write to the job or its children
+
+    Rows are written by a flush listener (job_detail_service); a job without a
+    row is at version 0. job_id has no foreign key so the stamp also moves
+    when the job is deleted.
+    """
+    __tablename__ = 'job_versions'
+    __table_args__ = {'schema': 'job'}
+    
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=1)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<JobVersion(job_id={self.job_id}, version={self.version})>"
+
+
 class Quote(Base):
     """Quote schema for storing quote information"""
     __tablename__ = 'quote'
@@ -105,14 +173,14 @@ class Quote(Base):
     
     quote_id = Column(Integer, primary_key=True, autoincrement=True)
     quote_number = Column(Text, nullable=False)  # Format: job_id-quote_number (e.g., "156-001")
-    job_id = Column(Integer, ForeignKey('job.jobs.job_id'), nullable=False)
-    date_created = Column(Date, default=datetime.utcnow().date())
+    job_id = Column(Integer, ForeignKey('job.jobs.job_id'), nullable=False, index=True)
+    date_created = Column(Date, default=lambda: datetime.utcnow().date(), index=True)
     cost_excl_gst = Column(Float)
     cost_incl_gst = Column(Float)
     
     # Relationships
     job = relationship("Job", foreign_keys=[job_id])
-    items = relationship("Item", back_populates="quote", cascade="all, delete-orphan")
+    items = relationship("Item", back_populates="quote", cascade="all, delete-orphan", order_by="Item.item_id")
     
     def __repr__(self):
         return f"<Quote(quote_id={self.quote_id}, quote_number='{self.quote_number}', job_id={self.job_id})>"
@@ -137,7 +205,9 @@ class Item(Base):
     # Relationships
     quote = relationship("Quote", back_populates="items")
     product = relationship("Product", back_populates="items")
-    item_variables = relationship("ItemVariable", back_populates="item", cascade="all, delete-orphan")
+    item_variables = relationship(
+        "ItemVariable", back_populates="item", cascade="all, delete-orphan", order_by="ItemVariable.item_variable_id"
+    )
     
     def __repr__(self):
         return f"<Item(item_id={self.item_id}, quote_id={self.quote_id}, product_id={self.product_id})>"
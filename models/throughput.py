@@ -46,12 +46,12 @@ class ThroughputTask(Base):
     
     task_id = Column(Integer, primary_key=True, autoincrement=True)
     task_name = Column(Text, nullable=False)
-    job_number = Column(Integer, ForeignKey('job.jobs.job_id'), nullable=False)
+    job_number = Column(Integer, ForeignKey('job.jobs.job_id'), nullable=False, index=True)
     item_id = Column(Integer, ForeignKey('job.items.item_id'), nullable=True)
-    stage_id = Column(Integer, ForeignKey('throughput.stage.stage_id'), nullable=False)
-    status_id = Column(Integer, ForeignKey('throughput.status.status_id'), nullable=False)
+    stage_id = Column(Integer, ForeignKey('throughput.stage.stage_id'), nullable=False, index=True)
+    status_id = Column(Integer, ForeignKey('throughput.status.status_id'), nullable=False, index=True)
     task_order = Column(Integer, nullable=False)
-    time_completed = Column(DateTime, nullable=True)
+    time_completed = Column(DateTime, nullable=True, index=True)
     
     # Relationships
     job = relationship("Job")
@@ -80,3 +80,25 @@ class ThroughputStageDate(Base):
     def __repr__(self):
         return f"<ThroughputStageDate(stage_date_id={self.stage_date_id}, job_id={self.job_id}, status_id={self.status_id}, due_date='{self.due_date}')>"
 
+
+
+class ThroughputJobStageDue(Base):
+    """
+    Current stage due date per job - a maintained projection of
+    Job.stage_id joined to ThroughputStageDate, indexed on due_date so
+    overdue/upcoming lookups are a range scan. Kept in sync by
+    throughput_service.sync_job_stage_due on every stage and stage-date write.
+    """
+    __tablename__ = 'job_stage_due'
+    __table_args__ = {'schema': 'throughput'}
+    
+    job_id = Column(Integer, ForeignKey('job.jobs.job_id', ondelete='CASCADE'), primary_key=True)
+    stage_id = Column(Integer, ForeignKey('throughput.stage.stage_id'), nullable=False)
+    due_date = Column(Date, nullable=False, index=True)
+    
+    # Relationships
+    job = relationship("Job")
+    stage = relationship("ThroughputStage")
+    
+    def __repr__(self):
+        return f"<ThroughputJobStageDue(job_id={self.job_id}, stage_id={self.stage_id}, due_date='{self.due_date}')>"
@@ -0,0 +1,158 @@
+"""
+Gapped integer ordering for sortable rows (task_order, display_order)
+
+New rows are appended ORDER_GAP after the current maximum. A move takes the
+midpoint between its new neighbours, so inserting or moving touches one row.
+When two neighbours end up adjacent there is no midpoint left, and the rows in
+that list are renumbered with fresh gaps. This happens inline when needed, or
+in a background task when a move leaves a gap that is nearly used up.
+"""
+from typing import Optional, Sequence
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+ORDER_GAP = 1024
+
+
+def next_order(db: Session, order_column, scope: Sequence = ()) -> int:
+    """Order value for appending a row to the end of the scoped list"""
+    max_order = db.query(func.max(order_column)).filter(*scope).scalar()
+    return (max_order or 0) + ORDER_GAP
+
+
+def order_between(lower: Optional[int], upper: Optional[int]) -> Optional[int]:
+    """
+    Integer midway between two neighbour orders, or None if they are adjacent
+
+    `lower` is None at the start of the list and `upper` is None at the end.
+    """
+    if upper is None:
+        return (lower or 0) + ORDER_GAP
+    if lower is None:
+        lower = 0
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+def rebalance(db: Session, pk_column, order_column, scope: Sequence = (), exclude_pk=None) -> int:
+    """
+    Renumber the scoped rows ORDER_GAP apart, keeping their current order
+
+    Rows without an order go last. Runs as one executemany UPDATE in the
+    caller's transaction and returns the number of rows renumbered.
+    """
+    query = db.query(pk_column).filter(*scope)
+    if exclude_pk is not None:
+        query = query.filter(pk_column != exclude_pk)
+    pks = [
+        row[0]
+        for row in query.order_by(order_column.is_(None), order_column, pk_column)
+    ]
+    if not pks:
+        return 0
+
+    model = pk_column.class_
+    db.execute(
+        update(model),
+        [
+            {pk_column.key: pk, order_column.key: (index + 1) * ORDER_GAP}
+            for index, pk in enumerate(pks)
+        ]
+    )
+    _bump_job_versions(db, model, pks)
+    return len(pks)
+
+
+def _bump_job_versions(db: Session, model, pks: Sequence):
+    """
+    Bump the versions of the jobs whose tasks were renumbered
+
+    The executemany UPDATE in rebalance() skips the flush listener that
+    versions job aggregates (job_detail_service), so without this a cached
+    /jobs/{id}/full would keep the old task_order values.
+    """
+    from models.throughput import ThroughputTask
+
+    if model is not ThroughputTask:
+        return
+    from job_detail_service import bump_job_versions
+
+    job_ids = {
+        row[0]
+        for row in db.query(ThroughputTask.job_number).filter(ThroughputTask.task_id.in_(pks)).distinct()
+    }
+    bump_job_versions(db, job_ids)
+
+
+def _neighbour_orders(db, pk_column, order_column, scope, moving_pk, before_pk, after_pk):
+    """Orders of the rows the moved row will sit between"""
+    others = db.query(order_column).filter(*scope).filter(pk_column != moving_pk)
+
+    def order_of(pk):
+        row = others.filter(pk_column == pk).first()
+        if row is None:
+            raise LookupError(f"Row {pk} is not in this list")
+        return row[0]
+
+    if after_pk is not None:
+        lower = order_of(after_pk)
+        upper = order_of(before_pk) if before_pk is not None else (
+            others.filter(order_column > lower).with_entities(func.min(order_column)).scalar()
+        )
+    elif before_pk is not None:
+        upper = order_of(before_pk)
+        lower = others.filter(order_column < upper).with_entities(func.max(order_column)).scalar()
+    else:
+        lower = others.with_entities(func.max(order_column)).scalar()
+        upper = None
+    return lower, upper
+
+
+def move(db: Session, row, pk_column, order_column, scope: Sequence = (),
+         before_pk=None, after_pk=None) -> bool:
+    """
+    Place `row` after `after_pk` and/or before `before_pk` within the scope
+
+    With neither given the row goes to the end. Only the moved row is written
+    unless its neighbours are adjacent, in which case the rest of the list is
+    renumbered first. Raises LookupError if a neighbour is not in the scope.
+    Returns True when the new position leaves no room for another insert next
+    to it, so the caller can schedule a rebalance.
+    """
+    moving_pk = getattr(row, pk_column.key)
+    lower, upper = _neighbour_orders(db, pk_column, order_column, scope, moving_pk, before_pk, after_pk)
+    new_order = order_between(lower, upper)
+
+    if new_order is None:
+        rebalance(db, pk_column, order_column, scope, exclude_pk=moving_pk)
+        lower, upper = _neighbour_orders(db, pk_column, order_column, scope, moving_pk, before_pk, after_pk)
+        new_order = order_between(lower, upper)
+
+    setattr(row, order_column.key, new_order)
+
+    gaps = [new_order - (lower or 0)]
+    if upper is not None:
+        gaps.append(upper - new_order)
+    return min(gaps) < 2
+
+
+def _rebalance_job(pk_column, order_column, scope: Sequence):
+    """Background task body - renumber a list in its own session"""
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebalance(db, pk_column, order_column, scope)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Order rebalance failed for {order_column}: {e}")
+    finally:
+        db.close()
+
+
+def schedule_rebalance(background_tasks, pk_column, order_column, scope: Sequence = ()):
+    """Renumber the scoped list after the response has been sent"""
+    background_tasks.add_task(_rebalance_job, pk_column, order_column, tuple(scope))
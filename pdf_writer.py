@@ -0,0 +1,260 @@
+"""
+PDF documents from Jinja2 text templates
+
+A template (templates/pdf/*.j2) renders the document as lines of text with a
+little markup, and build_pdf() lays the lines out on A4 pages:
+
+    # Title            Helvetica Bold 18
+    ## Heading         Helvetica Bold 11
+    ---                horizontal rule
+    \\f                 page break (a line holding only a form feed)
+    anything else      Courier 9; long lines wrap, keeping their indent
+
+Body text is monospaced, so templates line up table columns with the `col`
+filter. Free text from users must go through `inline` (one line) or `block`
+(its own indented lines), so a note can't start a title, rule or page break. The writer uses only the standard PDF fonts and zlib, and the output
+is deterministic: the same text always gives the same bytes.
+
+This module is what the quote render pool runs, so it imports nothing from the
+app. precompile_templates() is the pool initializer: each process compiles
+every template once and renders from the compiled code after that.
+"""
+import os
+import textwrap
+import zlib
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+# Jinja2 is only needed where templates are rendered (the pool processes), so it is loaded on first use
+if TYPE_CHECKING:
+    from jinja2 import Environment
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "pdf")
+
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89  # A4 in points
+MARGIN = 50
+FOOTER_Y = 30
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold", "F3": "Courier"}
+
+# Line kind: (font, size, line height)
+STYLES = {
+    "title": ("F2", 18, 26),
+    "heading": ("F2", 11, 18),
+    "body": ("F3", 9, 11.5),
+    "rule": (None, 0, 8),
+    "blank": (None, 0, 11.5),
+}
+
+# Courier glyphs are 0.6 em wide
+BODY_CHARS = int((PAGE_WIDTH - 2 * MARGIN) / (0.6 * STYLES["body"][1]))
+
+
+# ============================================================================
+# LAYOUT
+# ============================================================================
+
+def _lines(text: str) -> List[Tuple[str, str]]:
+    """(kind, text) for each line of marked-up text, with body lines wrapped"""
+    lines = []
+    # split("\n") rather than splitlines(), which also breaks at form feeds
+    for raw in text.expandtabs(4).replace("\r\n", "\n").split("\n"):
+        line = raw.rstrip()
+        if raw.strip(" ") == "\f":
+            lines.append(("page", ""))
+        elif line.startswith("## "):
+            lines.append(("heading", line[3:]))
+        elif line.startswith("# "):
+            lines.append(("title", line[2:]))
+        elif line == "---":
+            lines.append(("rule", ""))
+        elif not line:
+            lines.append(("blank", ""))
+        else:
+            indent = line[:len(line) - len(line.lstrip())]
+            wrapped = textwrap.wrap(
+                line, BODY_CHARS, subsequent_indent=indent + "  ", drop_whitespace=False
+            ) if len(line) > BODY_CHARS else [line]
+            lines.extend(("body", part.rstrip()) for part in wrapped)
+    return lines
+
+
+def paginate(text: str) -> List[List[Tuple[str, str, float]]]:
+    """Pages of (kind, text, y) from marked-up text"""
+    pages = [[]]
+    y = PAGE_HEIGHT - MARGIN
+    for kind, line in _lines(text):
+        if kind == "page":
+            if pages[-1]:
+                pages.append([])
+                y = PAGE_HEIGHT - MARGIN
+            continue
+        height = STYLES[kind][2]
+        if y - height < MARGIN and pages[-1]:
+            pages.append([])
+            y = PAGE_HEIGHT - MARGIN
+        if kind == "blank" and not pages[-1]:
+            continue  # no blank lines at the top of a page
+        y -= height
+        pages[-1].append((kind, line, y))
+    return pages
+
+
+# ============================================================================
+# PDF OUTPUT
+# ============================================================================
+
+def _text(value: str) -> bytes:
+    """A PDF string literal in WinAnsiEncoding (unsupported characters become '?')"""
+    data = value.encode("cp1252", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _content(page: List[Tuple[str, str, float]], footer: str) -> bytes:
+    """Content stream for one page"""
+    ops = []
+    for kind, line, y in page:
+        if kind == "rule":
+            ops.append(b"0.5 w %.2f %.2f m %.2f %.2f l S" % (MARGIN, y + 3, PAGE_WIDTH - MARGIN, y + 3))
+        elif kind != "blank":
+            font, size, _ = STYLES[kind]
+            ops.append(b"BT /%s %d Tf %.2f %.2f Td %s Tj ET" % (font.encode(), size, MARGIN, y, _text(line)))
+    if footer:
+        ops.append(b"BT /F1 8 Tf %.2f %.2f Td %s Tj ET" % (MARGIN, FOOTER_Y, _text(footer)))
+    return b"\n".join(ops)
+
+
+def build_pdf(text: str, title: str = "", footer: str = "") -> bytes:
+    """
+    A PDF of marked-up text
+
+    `footer` is printed at the bottom of every page, followed by "Page n of m".
+    """
+    pages = paginate(text)
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    def stream(data: bytes) -> int:
+        data = zlib.compress(data)
+        return add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data))
+
+    catalog = add(b"")  # filled in once the page tree exists
+    pages_id = add(b"")
+    fonts = b" ".join(
+        b"/%s %d 0 R" % (name.encode(), add(
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode()
+        ))
+        for name, base in FONTS.items()
+    )
+    page_ids = []
+    for number, page in enumerate(pages, 1):
+        page_footer = f"{footer}    Page {number} of {len(pages)}".strip()
+        contents = stream(_content(page, page_footer))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /Font << %s >> >> /Contents %d 0 R >>"
+            % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, fonts, contents)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % page_id for page_id in page_ids), len(page_ids)
+    )
+    info = add(b"<< /Title %s /Producer (Outcry) >>" % _text(title))
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog, info, xref
+    )
+    return bytes(output)
+
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+
+def _column(value, width: int, align: str = "left") -> str:
+    """Pad or cut a value to a fixed-width column (one space kept between columns)"""
+    text = "" if value is None else str(value)
+    if len(text) >= width:
+        text = text[:width - 2] + "~" if width > 2 else text[:width]
+    return text.rjust(width - 1) + " " if align == "right" else text.ljust(width)
+
+
+def _defuse(line: str) -> str:
+    """A line that can't be read as markup (a leading space stops #, ## and ---)"""
+    return " " + line if line.startswith(("#", "---")) else line
+
+
+def _inline(value) -> str:
+    """Free text on one line: line breaks, tabs and form feeds become single spaces"""
+    if value is None:
+        return ""
+    return _defuse(" ".join(str(value).split()))
+
+
+def _block(value, indent: int = 4) -> str:
+    """Free text as lines of its own, every line indented (or defused when indent is 0)"""
+    if value is None:
+        return ""
+    text = str(value).replace("\r\n", "\n").replace("\r", "\n").replace("\f", " ").replace("\v", " ")
+    lines = [line.expandtabs(4).rstrip() for line in text.strip("\n").split("\n")]
+    return "\n".join(" " * indent + line if indent else _defuse(line) for line in lines)
+
+
+def _money(value) -> str:
+    return f"{float(value or 0):,.2f}"
+
+
+def _number(value) -> str:
+    """A quantity or measurement without trailing zeros"""
+    if value is None:
+        return ""
+    return f"{float(value):,.3f}".rstrip("0").rstrip(".")
+
+
+_environment: Optional["Environment"] = None
+
+
+def environment() -> "Environment":
+    """The template environment of this process (templates are compiled once and kept)"""
+    global _environment
+    if _environment is None:
+        from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            auto_reload=False,
+            cache_size=-1
+        )
+        _environment.filters.update(
+            col=_column, money=_money, number=_number, inline=_inline, block=_block
+        )
+    return _environment
+
+
+def precompile_templates() -> int:
+    """Compile every PDF template now rather than on first use; returns the count"""
+    env = environment()
+    names = env.list_templates(extensions=["j2"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def render_template_pdf(template: str, context: dict, title: str = "", footer: str = "") -> bytes:
+    """Render a template with `context` and lay the result out as a PDF"""
+    text = environment().get_template(template).render(**context)
+    return build_pdf(text, title=title, footer=footer)
@@ -0,0 +1,86 @@
+"""
+Startup profiling
+Runs `python -X importtime` in a fresh interpreter and summarizes the
+per-module import cost as JSON-friendly data
+"""
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """
+    Parse `-X importtime` stderr lines into a list of
+    {"module", "self_ms", "cumulative_ms", "depth"} dicts
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": depth
+        })
+    return modules
+
+
+def profile_imports(module: str = "main", top: int = 25, cwd: str = None) -> Dict:
+    """
+    Import `module` in a child interpreter with -X importtime and summarize it
+
+    Returns the total import time, the slowest modules by cumulative time and
+    the self time aggregated per top-level package.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = parse_importtime(result.stderr)
+    total_ms = next(
+        (m["cumulative_ms"] for m in modules if m["module"] == module and m["depth"] == 0),
+        sum(m["self_ms"] for m in modules)
+    )
+
+    packages = defaultdict(lambda: {"self_ms": 0.0, "modules": 0})
+    for m in modules:
+        package = packages[m["module"].split(".")[0]]
+        package["self_ms"] += m["self_ms"]
+        package["modules"] += 1
+
+    slowest = sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+    by_package = sorted(
+        (
+            {"package": name, "self_ms": round(data["self_ms"], 2), "modules": data["modules"]}
+            for name, data in packages.items()
+        ),
+        key=lambda p: p["self_ms"],
+        reverse=True
+    )[:top]
+
+    return {
+        "module": module,
+        "total_ms": round(total_ms, 2),
+        "module_count": len(modules),
+        "slowest_modules": [
+            {
+                "module": m["module"],
+                "self_ms": round(m["self_ms"], 2),
+                "cumulative_ms": round(m["cumulative_ms"], 2)
+            }
+            for m in slowest
+        ],
+        "by_package": by_package
+    }
@@ -0,0 +1,169 @@
+"""
+Whitelisted filter and sort query parameters for list endpoints
+
+    GET /api/jobs?status=2&staff_id=4&date_created[gte]=2024-01-01&sort=-date_created
+
+Each list endpoint declares a FilterSet: the parameter names it accepts and the
+column each one maps to. `name=value` is an equality test and
+`name[op]=value` applies one of OPERATORS. `sort` takes a comma-separated list
+of sortable names, `-` for descending; the primary key is always appended so
+pages are stable.
+
+Values are converted to the column's Python type before they reach SQL, so
+every condition is a plain comparison on the column. Filter columns must be
+indexed, which the FilterSet checks when it is created. Unknown names,
+operators and bad values raise ValueError.
+"""
+import re
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Sequence
+
+from sqlalchemy.orm import Query
+
+OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, values: column.in_(values),
+    "null": lambda column, is_null: column.is_(None) if is_null else column.isnot(None),
+}
+
+# Operators whose value is not of the column's type
+_LIST_OPERATORS = {"in"}
+_BOOLEAN_OPERATORS = {"null"}
+MAX_IN_VALUES = 500
+
+_OPERATOR_KEY = re.compile(r"^(\w+)\[(\w+)\]$")
+
+
+def _column(attribute):
+    """The Column behind a mapped attribute (Job.staff_id -> jobs.staff_id)"""
+    return attribute.property.columns[0] if hasattr(attribute, "property") else attribute
+
+
+def _is_indexed(column) -> bool:
+    return bool(
+        column.primary_key or column.index or column.unique
+        or any(column in index.columns for index in column.table.indexes)
+    )
+
+
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("true", "1", "yes"):
+        return True
+    if value in ("false", "0", "no"):
+        return False
+    raise ValueError("expected true or false")
+
+
+def _convert(column, raw: str):
+    """Convert a query-string value to the column's Python type"""
+    python_type = column.type.python_type
+    raw = raw.strip()
+    if python_type is bool:
+        return _parse_bool(raw)
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw[:10])
+    if python_type is time:
+        return time.fromisoformat(raw)
+    if python_type in (int, float, Decimal):
+        return python_type(raw)
+    return raw
+
+
+class FilterSet:
+    """The filter and sort parameters one list endpoint accepts"""
+
+    def __init__(
+        self,
+        model,
+        fields: Dict[str, object],
+        sortable: Optional[Iterable[str]] = None,
+        default_sort: Sequence[str] = ()
+    ):
+        """
+        `fields` maps parameter names to columns of `model`; `sortable` names
+        the fields (or other model columns) `sort` may use and defaults to
+        all fields. `default_sort` applies when the request has no `sort`.
+        """
+        primary_key = model.__mapper__.primary_key
+        if len(primary_key) != 1:
+            raise ValueError(f"{model.__name__}: FilterSet needs a single-column primary key")
+        self.model = model
+        self.primary_key = primary_key[0]
+        self.fields = {name: _column(column) for name, column in fields.items()}
+        for name, column in self.fields.items():
+            if not _is_indexed(column):
+                raise ValueError(f"{model.__name__}: filter '{name}' is on {column}, which has no index")
+        names = fields if sortable is None else sortable
+        self.sortable = {
+            name: self.fields[name] if name in self.fields else _column(getattr(model, name))
+            for name in names
+        }
+        self.default_sort = tuple(default_sort)
+
+    def conditions(self, params) -> list:
+        """
+        SQL conditions for the filter parameters in `params`
+
+        `params` is a Starlette QueryParams (or any mapping, or (key, value)
+        pairs). Keys that aren't filters are left to the endpoint, except
+        `name[op]` keys, which must name a filter.
+        """
+        items = params.multi_items() if hasattr(params, "multi_items") else (
+            params.items() if hasattr(params, "items") else params
+        )
+        conditions = []
+        for key, raw in items:
+            match = _OPERATOR_KEY.match(key)
+            name, op = (match.group(1), match.group(2)) if match else (key, "eq")
+            if name not in self.fields:
+                if match:
+                    raise ValueError(f"Unknown filter '{name}' (allowed: {', '.join(self.fields)})")
+                continue
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator '{op}' for '{name}' (allowed: {', '.join(OPERATORS)})")
+
+            column = self.fields[name]
+            try:
+                if op in _BOOLEAN_OPERATORS:
+                    value = _parse_bool(raw)
+                elif op in _LIST_OPERATORS:
+                    value = [_convert(column, part) for part in raw.split(",") if part.strip()]
+                    if not value or len(value) > MAX_IN_VALUES:
+                        raise ValueError(f"expected 1 to {MAX_IN_VALUES} comma-separated values")
+                else:
+                    value = _convert(column, raw)
+            except (TypeError, ValueError, ArithmeticError) as e:
+                raise ValueError(f"Invalid value for '{key}': {raw!r} ({e})")
+            conditions.append(OPERATORS[op](column, value))
+        return conditions
+
+    def ordering(self, sort: Optional[str]) -> list:
+        """ORDER BY clauses for a `sort` parameter, ending with the primary key"""
+        names = [part.strip() for part in sort.split(",") if part.strip()] if sort else self.default_sort
+        clauses = []
+        columns = []
+        for name in names:
+            descending = name.startswith("-")
+            name = name.lstrip("-+")
+            if name not in self.sortable:
+                raise ValueError(f"Cannot sort by '{name}' (allowed: {', '.join(self.sortable)})")
+            column = self.sortable[name]
+            columns.append(column)
+            clauses.append(column.desc() if descending else column.asc())
+        if not any(column is self.primary_key for column in columns):
+            clauses.append(self.primary_key.asc())
+        return clauses
+
+    def apply(self, query: Query, params) -> Query:
+        """Filter and order `query` by the request's query parameters"""
+        query = query.filter(*self.conditions(params))
+        return query.order_by(*self.ordering(params.get("sort")))
@@ -0,0 +1,208 @@
+"""
+Quote PDF service - renders quotes to PDF on a process pool
+
+The API worker loads the quotes (job_detail_service.load_quote_graphs, four
+queries for any number) and turns each into a plain dict. A pool process fills
+templates/pdf/quote.j2 and lays it out with pdf_writer, so layout never runs
+in an API worker. The pool is started on first use with the spawn start method
+(a forked child would inherit the worker's database connections and threads),
+and each process precompiles the templates when it starts. A batch is spread
+across all pool processes.
+
+A quote's PDF only changes when its job's version does: job_detail_service
+bumps it on writes to the quote, its items and options, and the rows they
+show. Rendered PDFs are therefore cached per worker under (quote_id, job
+version), and the same pair is the ETag.
+"""
+import asyncio
+import io
+import multiprocessing
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence
+
+from sqlalchemy.orm import Session, joinedload
+
+from config import QUOTE_PDF_CACHE_SIZE, QUOTE_PDF_COMPANY, QUOTE_PDF_WORKERS
+from job_detail_service import load_quote_graphs
+from models.job import Job, JobVersion, Quote
+from pdf_writer import precompile_templates, render_template_pdf
+
+QUOTE_TEMPLATE = "quote.j2"
+
+# Most quotes one batch request may render
+MAX_BATCH = 200
+
+
+class QuotePdf(NamedTuple):
+    version: int
+    filename: str
+    content: bytes
+
+
+def quote_versions(db: Session, quote_ids: Iterable[int]) -> Dict[int, int]:
+    """{quote_id: its job's version} for the quotes that exist, in one query"""
+    rows = (
+        db.query(Quote.quote_id, JobVersion.version)
+        .outerjoin(JobVersion, JobVersion.job_id == Quote.job_id)
+        .filter(Quote.quote_id.in_(set(quote_ids)))
+    )
+    return {quote_id: version or 0 for quote_id, version in rows}
+
+
+# ============================================================================
+# TEMPLATE CONTEXT
+# ============================================================================
+
+def _filename(quote: Quote) -> str:
+    number = "".join(char if char.isalnum() or char in "-_." else "-" for char in quote.quote_number)
+    return f"Quote {number}.pdf"
+
+
+def _item_context(item) -> dict:
+    product = item.product
+    return {
+        "product": product.name,
+        "reference": item.reference,
+        "notes": item.notes,
+        "quantity": item.quantity,
+        "length": float(item.length) if item.length is not None else None,
+        "height": float(item.height) if item.height is not None else None,
+        "measure": product.measure_type.measure_type if product.measure_type else "",
+        "cost_excl_gst": item.cost_excl_gst,
+        "cost_incl_gst": item.cost_incl_gst,
+        "options": [
+            f"{variable.product_variable.name}: "
+            + ", ".join(chosen.variable_option.name for chosen in variable.item_variable_options)
+            for variable in item.item_variables
+        ]
+    }
+
+
+def _quote_context(quote: Quote, job: Optional[Job]) -> dict:
+    """Everything quote.j2 shows, as plain data the pool processes can receive"""
+    client, contact, project = (job.client, job.contact, job.project) if job else (None, None, None)
+    site = ", ".join(
+        str(part) for part in (job.job_address, job.suburb, job.state, job.postcode) if part
+    ) if job else ""
+    return {
+        "company": QUOTE_PDF_COMPANY,
+        "quote": {
+            "quote_number": quote.quote_number,
+            "date_created": quote.date_created.strftime("%d/%m/%Y") if quote.date_created else "",
+            "cost_excl_gst": quote.cost_excl_gst or 0,
+            "cost_incl_gst": quote.cost_incl_gst or 0,
+            "gst": (quote.cost_incl_gst or 0) - (quote.cost_excl_gst or 0),
+            "items": [_item_context(item) for item in quote.items]
+        },
+        "job": {
+            "job_id": quote.job_id,
+            "reference": job.reference if job else "",
+            "po": job.po if job else None,
+            "site": site
+        },
+        "client": {"name": client.name} if client else None,
+        "contact": {
+            "first_name": contact.first_name,
+            "surname": contact.surname,
+            "email": contact.email,
+            "phone": contact.phone
+        } if contact else None,
+        "project": {"name": project.name} if project else None
+    }
+
+
+# ============================================================================
+# RENDER POOL AND CACHE
+# ============================================================================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_cache: "OrderedDict[tuple, QuotePdf]" = OrderedDict()
+
+
+def _render_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=QUOTE_PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=precompile_templates
+        )
+    return _pool
+
+
+def shutdown_render_pool():
+    """Stop the render processes (lifespan shutdown, or after a process died)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def clear_cache():
+    """Drop all cached quote PDFs"""
+    _cache.clear()
+
+
+async def quote_pdfs(db: Session, versions: Dict[int, int]) -> Dict[int, QuotePdf]:
+    """
+    PDFs for the quotes in `versions` ({quote_id: version}, from quote_versions)
+
+    Cached PDFs are returned as they are; the rest are loaded together and
+    rendered in parallel on the pool. Raises BrokenProcessPool if a render
+    process died; the pool is restarted on the next call.
+    """
+    pdfs = {}
+    missing = []
+    for quote_id, version in versions.items():
+        hit = _cache.get((quote_id, version))
+        if hit is not None:
+            _cache.move_to_end((quote_id, version))
+            pdfs[quote_id] = hit
+        else:
+            missing.append(quote_id)
+    if not missing:
+        return pdfs
+
+    quotes = load_quote_graphs(db, missing)
+    jobs = {
+        job.job_id: job
+        for job in db.query(Job)
+        .options(joinedload(Job.client), joinedload(Job.contact), joinedload(Job.project))
+        .filter(Job.job_id.in_({quote.job_id for quote in quotes}))
+    }
+
+    loop = asyncio.get_running_loop()
+    pool = _render_pool()
+    renders = [
+        loop.run_in_executor(
+            pool, render_template_pdf, QUOTE_TEMPLATE, _quote_context(quote, jobs.get(quote.job_id)),
+            f"Quote {quote.quote_number}", f"{QUOTE_PDF_COMPANY} - Quote {quote.quote_number}"
+        )
+        for quote in quotes
+    ]
+    try:
+        contents = await asyncio.gather(*renders)
+    except BrokenProcessPool:
+        shutdown_render_pool()
+        raise
+
+    for quote, content in zip(quotes, contents):
+        pdf = QuotePdf(versions[quote.quote_id], _filename(quote), content)
+        pdfs[quote.quote_id] = pdf
+        if QUOTE_PDF_CACHE_SIZE > 0:
+            _cache[(quote.quote_id, pdf.version)] = pdf
+    while len(_cache) > QUOTE_PDF_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return pdfs
+
+
+def zip_pdfs(pdfs: Sequence[QuotePdf]) -> bytes:
+    """A zip archive of PDFs (stored, not compressed - PDF streams already are)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for pdf in pdfs:
+            archive.writestr(pdf.filename, pdf.content)
+    return buffer.getvalue()
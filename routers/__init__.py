@@ -1,23 +1,32 @@
 """
 FastAPI routers for each domain
+
+Routers are imported on first access, so importing one router (e.g. from
+app.py or a script) doesn't pay for loading every domain.
 """
-from .client import router as client_router
-from .product import router as product_router
-from .job import router as job_router
-from .staff import router as staff_router
-from .upload import router as upload_router
-from .delivery import router as delivery_router
-from .throughput import router as throughput_router
-from .public import router as public_router
+from importlib import import_module
+
+# Router name -> submodule that defines it
+_ROUTER_MODULES = {
+    "client_router": ".client",
+    "product_router": ".product",
+    "job_router": ".job",
+    "staff_router": ".staff",
+    "upload_router": ".upload",
+    "delivery_router": ".delivery",
+    "throughput_router": ".throughput",
+    "public_router": ".public",
+    "events_router": ".events",
+    "analytics_router": ".analytics",
+    "search_router": ".search",
+}
+
+__all__ = list(_ROUTER_MODULES)
 
-__all__ = [
-    "client_router",
-    "product_router",
-    "job_router",
-    "staff_router",
-    "upload_router",
-    "delivery_router",
-    "throughput_router",
-    "public_router",
-]
 
+def __getattr__(name):
+    if name not in _ROUTER_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    router = import_module(_ROUTER_MODULES[name], __name__).router
+    globals()[name] = router
+    return router
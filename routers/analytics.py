@@ -0,0 +1,79 @@
+"""
+Analytics router - flow metrics (time in status/stage, throughput, WIP)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from database import SessionLocal
+from analytics_service import (
+    default_period, status_times, stage_times, weekly_throughput, work_in_progress
+)
+from schemas.analytics import (
+    StatusTimeRead, StageTimeRead, ThroughputWeekRead, WipStageRead, FlowSummaryRead
+)
+
+router = APIRouter(prefix="/api", tags=["analytics"])
+
+
+def get_db():
+    """Database dependency"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_period(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to")
+) -> tuple:
+    """Period dependency - `from`/`to` query params, defaulting to the last ANALYTICS_DEFAULT_DAYS days"""
+    from_date, to_date = default_period(from_date, to_date)
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    return from_date, to_date
+
+
+# ============================================================================
+# FLOW ANALYTICS ROUTES
+# ============================================================================
+
+@router.get("/analytics/flow", response_model=FlowSummaryRead)
+async def get_flow_summary(period: tuple = Depends(get_period), db: Session = Depends(get_db)):
+    """All flow metrics for a period"""
+    from_date, to_date = period
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "status_times": status_times(db, from_date, to_date),
+        "stage_times": stage_times(db, from_date, to_date),
+        "throughput": weekly_throughput(db, from_date, to_date),
+        "wip": work_in_progress(db)
+    }
+
+
+@router.get("/analytics/flow/status-times", response_model=List[StatusTimeRead])
+async def get_status_times(period: tuple = Depends(get_period), db: Session = Depends(get_db)):
+    """Days spent in each job status, for statuses entered during the period"""
+    return status_times(db, *period)
+
+
+@router.get("/analytics/flow/stage-times", response_model=List[StageTimeRead])
+async def get_stage_times(period: tuple = Depends(get_period), db: Session = Depends(get_db)):
+    """Days each throughput stage took, for stages finished during the period"""
+    return stage_times(db, *period)
+
+
+@router.get("/analytics/flow/throughput", response_model=List[ThroughputWeekRead])
+async def get_weekly_throughput(period: tuple = Depends(get_period), db: Session = Depends(get_db)):
+    """Tasks completed and jobs finished per week"""
+    return weekly_throughput(db, *period)
+
+
+@router.get("/analytics/flow/wip", response_model=List[WipStageRead])
+async def get_work_in_progress(db: Session = Depends(get_db)):
+    """Jobs and outstanding tasks currently in each stage"""
+    return work_in_progress(db)
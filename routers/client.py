@@ -1,22 +1,31 @@
 """
 Client domain router - Client, Contact, Billing CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 
 from database import SessionLocal
 from models.client import Client, Contact, Billing
 from schemas.client import (
-    ClientBase, ClientCreate, ClientRead,
+    ClientBase, ClientCreate, ClientRead, ClientDetailRead,
     ContactBase, ContactCreate, ContactRead,
     BillingBase, BillingCreate, BillingRead
 )
+from typeahead_service import typeahead
+from fieldsets import Fieldset
 from typing import Optional
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api", tags=["client"])
 
+# Client columns and relations the client list can return (fields= / include=)
+CLIENT_FIELDSET = Fieldset(
+    Client,
+    {"contacts": Client.contacts, "billing": Client.billing},
+    default_includes=("contacts", "billing")
+)
+
 
 def get_db():
     """Database dependency"""
@@ -31,42 +40,26 @@ def get_db():
 # CLIENT ROUTES
 # ============================================================================
 
-@router.get("/clients", response_model=List[ClientRead])
-async def get_clients(db: Session = Depends(get_db)):
-    """Get all clients with their contacts and billing entities"""
-    clients = db.query(Client).all()
-    result = []
-    for client in clients:
-        client_data = {
-            "client_id": client.client_id,
-            "name": client.name,
-            "address": client.address,
-            "suburb": client.suburb,
-            "state": client.state,
-            "postcode": client.postcode,
-            "contacts": [],
-            "billing": []
-        }
-        for contact in client.contacts:
-            client_data["contacts"].append({
-                "contact_id": contact.contact_id,
-                "first_name": contact.first_name,
-                "surname": contact.surname,
-                "email": contact.email,
-                "phone": contact.phone,
-                "client_id": contact.client_id
-            })
-        for bill in client.billing:
-            client_data["billing"].append({
-                "billing_id": bill.billing_id,
-                "entity": bill.entity,
-                "address": bill.address,
-                "suburb": bill.suburb,
-                "state": bill.state,
-                "postcode": bill.postcode
-            })
-        result.append(client_data)
-    return result
+@router.get("/clients", response_model=List[ClientDetailRead], response_model_exclude_unset=True)
+async def get_clients(
+    fields: Optional[str] = Query(None, description="Comma-separated client columns (default: all)"),
+    include: Optional[str] = Query(None, description="Comma-separated: contacts, billing (default: both)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all clients with their contacts and billing entities
+
+    `fields` picks the client columns returned (client_id is always there) and
+    `include` the related rows, e.g. `?fields=name,suburb&include=` for a
+    picker. Only those columns are selected, and each relation is a single
+    extra query for all clients.
+    """
+    try:
+        selection = CLIENT_FIELDSET.parse(fields, include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    clients = CLIENT_FIELDSET.query(db, selection).order_by(Client.client_id).all()
+    return [CLIENT_FIELDSET.payload(client, selection) for client in clients]
 
 
 @router.get("/clients/{client_id}", response_model=ClientRead)
@@ -92,6 +85,7 @@ async def create_client(client: ClientCreate, db: Session = Depends(get_db)):
         db.add(new_client)
         db.commit()
         db.refresh(new_client)
+        typeahead.upsert("client", new_client)
         return new_client
     except Exception as e:
         db.rollback()
@@ -123,6 +117,7 @@ async def update_client(
         
         db.commit()
         db.refresh(client)
+        typeahead.upsert("client", client)
         return client
     except HTTPException:
         raise
@@ -139,8 +134,13 @@ async def delete_client(client_id: int, db: Session = Depends(get_db)):
         if not client:
             raise HTTPException(status_code=404, detail="Client not found")
         
+        # Contacts go with the client, so they leave the contact picker too
+        contact_ids = [contact_id for (contact_id,) in
+                       db.query(Contact.contact_id).filter(Contact.client_id == client_id)]
         db.delete(client)
         db.commit()
+        typeahead.remove("client", client_id)
+        typeahead.remove("contact", *contact_ids)
         return None
     except HTTPException:
         raise
@@ -186,6 +186,7 @@ async def create_contact(contact: ContactCreate, db: Session = Depends(get_db)):
         db.add(new_contact)
         db.commit()
         db.refresh(new_contact)
+        typeahead.upsert("contact", new_contact)
         return new_contact
     except Exception as e:
         db.rollback()
@@ -215,6 +216,7 @@ async def update_contact(
         
         db.commit()
         db.refresh(contact)
+        typeahead.upsert("contact", contact)
         return contact
     except HTTPException:
         raise
@@ -233,6 +235,7 @@ async def delete_contact(contact_id: int, db: Session = Depends(get_db)):
         
         db.delete(contact)
         db.commit()
+        typeahead.remove("contact", contact_id)
         return None
     except HTTPException:
         raise
@@ -1,22 +1,44 @@
 """
 Delivery domain router - Address, Booking, Attachment CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import date, datetime, time
 
+from config import DELIVERY_DEPOT_LATITUDE, DELIVERY_DEPOT_LONGITUDE
 from database import SessionLocal
+from delivery_service import (
+    ADDRESS_FIELDS, BOOKING_FIELDSET, address_index, booking_calendar,
+    find_or_create_address, normalize_address_key
+)
+from geo import plan_route
+from query_filters import FilterSet
 from models.delivery import Address, Booking, Attachment
 from schemas.delivery import (
-    AddressBase, AddressCreate, AddressRead,
-    BookingBase, BookingCreate, BookingRead,
-    AttachmentBase, AttachmentCreate, AttachmentRead
+    AddressBase, AddressCreate, AddressRead, NearbyAddressRead,
+    BookingBase, BookingCreate, BookingRead, BookingDetailRead, BookingCalendarDay,
+    AttachmentBase, AttachmentCreate, AttachmentRead,
+    DeliveryRun
 )
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api", tags=["delivery"])
 
+# Filter/sort query parameters accepted by the booking list (see query_filters.py)
+BOOKING_FILTERS = FilterSet(
+    Booking,
+    {
+        "pickup_date": Booking.pickup_date,
+        "dropoff_date": Booking.dropoff_date,
+        "creator_id": Booking.creator_id,
+        "completion": Booking.completion
+    },
+    sortable=("booking_id", "pickup_date", "dropoff_date", "created")
+)
+
 
 def get_db():
     """Database dependency"""
@@ -42,6 +64,33 @@ async def get_addresses(
     return addresses
 
 
+@router.get("/addresses/nearby", response_model=List[NearbyAddressRead])
+def get_nearby_addresses(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(5.0, gt=0, le=500, description="Radius in km"),
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Addresses within `radius` km of a point, nearest first (uses the in-memory address grid)
+
+    A plain def so the grid (re)load and search run in the threadpool, not on the event loop.
+    """
+    matches = address_index.nearby(db, lat, lng, radius, limit)
+    if not matches:
+        return []
+    addresses = {
+        address.address_id: address
+        for address in db.query(Address).filter(Address.address_id.in_([m[0] for m in matches]))
+    }
+    return [
+        {**AddressRead.model_validate(addresses[address_id]).model_dump(), "distance_km": round(distance, 3)}
+        for address_id, distance in matches
+        if address_id in addresses
+    ]
+
+
 @router.get("/addresses/{address_id}", response_model=AddressRead)
 async def get_address(address_id: int, db: Session = Depends(get_db)):
     """Get a single address by ID"""
@@ -52,12 +101,22 @@ async def get_address(address_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/addresses", response_model=AddressRead, status_code=201)
-async def create_address(address: AddressCreate, db: Session = Depends(get_db)):
-    """Create a new address"""
-    db_address = Address(**address.model_dump())
-    db.add(db_address)
-    db.commit()
-    db.refresh(db_address)
+async def create_address(address: AddressCreate, response: Response, db: Session = Depends(get_db)):
+    """
+    Create an address, or return the existing one for the same place
+
+    Matches on google_place_id, then on the normalized address text; an
+    existing match is returned with status 200 instead of 201.
+    """
+    try:
+        db_address, created = find_or_create_address(db, address.model_dump())
+        db.commit()
+        db.refresh(db_address)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    if not created:
+        response.status_code = 200
     return db_address
 
 
@@ -74,8 +133,16 @@ async def update_address(
     
     for key, value in address.model_dump(exclude_unset=True).items():
         setattr(db_address, key, value)
+    db_address.google_place_id = db_address.google_place_id or None
+    db_address.address_key = normalize_address_key(
+        {field: getattr(db_address, field) for field in ADDRESS_FIELDS}
+    )
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Another address already has this place id or address")
     db.refresh(db_address)
     return db_address
 
@@ -96,24 +163,73 @@ async def delete_address(address_id: int, db: Session = Depends(get_db)):
 # BOOKING ROUTES
 # ============================================================================
 
-@router.get("/bookings", response_model=List[BookingRead])
+@router.get("/bookings", response_model=List[BookingDetailRead], response_model_exclude_unset=True)
 async def get_bookings(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated booking columns (default: all)"),
+    include: Optional[str] = Query(None, description="Comma-separated: addresses, creator, attachments"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get bookings with their related rows, optionally filtered and sorted
+
+    `fields` picks the booking columns returned (booking_id is always there)
+    and `include` the relations (default: addresses,creator; list views
+    normally skip attachments). Only those columns are selected, and each
+    relation is a single extra query for the whole page.
+
+    Filters: pickup_date, dropoff_date, creator_id, completion (`name=value`
+    or `name[op]=value`, op one of eq, ne, gt, gte, lt, lte, in, null). Sort:
+    booking_id, pickup_date, dropoff_date, created, e.g.
+    `?completion=false&pickup_date[gte]=2024-01-15&sort=pickup_date`.
+    """
+    try:
+        selection = BOOKING_FIELDSET.parse(fields, include)
+        query = BOOKING_FILTERS.apply(BOOKING_FIELDSET.query(db, selection), request.query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    bookings = query.offset(skip).limit(limit).all()
+    return [BOOKING_FIELDSET.payload(booking, selection) for booking in bookings]
+
+
+@router.get("/bookings/calendar", response_model=List[BookingCalendarDay])
+async def get_booking_calendar(
+    from_date: date = Query(..., alias="from"),
+    to_date: date = Query(..., alias="to"),
+    include_completed: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Get all bookings"""
-    bookings = db.query(Booking).offset(skip).limit(limit).all()
-    return bookings
+    """
+    Pickups and drop-offs between `from` and `to` (inclusive), grouped by day
+
+    Only days with entries are returned. Completed bookings are left out
+    unless include_completed=true.
+    """
+    if from_date > to_date:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    if (to_date - from_date).days > 366:
+        raise HTTPException(status_code=400, detail="Calendar range is limited to 366 days")
+    return booking_calendar(db, from_date, to_date, include_completed)
 
 
-@router.get("/bookings/{booking_id}", response_model=BookingRead)
-async def get_booking(booking_id: int, db: Session = Depends(get_db)):
-    """Get a single booking by ID"""
-    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
+@router.get("/bookings/{booking_id}", response_model=BookingDetailRead, response_model_exclude_unset=True)
+async def get_booking(
+    booking_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated booking columns (default: all)"),
+    include: Optional[str] = Query(None, description="Comma-separated: addresses, creator, attachments"),
+    db: Session = Depends(get_db)
+):
+    """Get a single booking by ID with its related rows (default: all of them)"""
+    try:
+        selection = BOOKING_FIELDSET.parse(fields, include, default_includes=BOOKING_FIELDSET.includes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    booking = BOOKING_FIELDSET.query(db, selection).filter(Booking.booking_id == booking_id).first()
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
-    return booking
+    return BOOKING_FIELDSET.payload(booking, selection)
 
 
 @router.post("/bookings", response_model=BookingRead, status_code=201)
@@ -226,6 +342,116 @@ async def delete_attachment(attachment_id: int, db: Session = Depends(get_db)):
     return None
 
 
+# ============================================================================
+# DELIVERY RUN ROUTES
+# ============================================================================
+
+def _run_stops(bookings: List[Booking], run_date: date) -> tuple:
+    """
+    Split the day's outstanding pickups and drop-offs into routable stops and skipped ones
+
+    A drop-off whose pickup is on the same run gets `after` pointing at that
+    pickup, so the route visits the pickup first.
+    """
+    stops, unrouted = [], []
+    for booking in bookings:
+        pickup_index = None
+        legs = (
+            ("pickup", booking.pickup_date, booking.pickup_complete, booking.pickup_address, booking.pickup_time),
+            ("dropoff", booking.dropoff_date, booking.dropoff_complete, booking.dropoff_address, booking.dropoff_time)
+        )
+        for kind, leg_date, completed, address, scheduled_time in legs:
+            if leg_date != run_date or completed is not None:
+                continue
+            if address is None or address.latitude is None or address.longitude is None:
+                unrouted.append({"booking_id": booking.booking_id, "kind": kind,
+                                 "reason": "address has no coordinates"})
+                continue
+            if kind == "dropoff" and booking.pickup_date == run_date and booking.pickup_complete is None \
+                    and pickup_index is None:
+                unrouted.append({"booking_id": booking.booking_id, "kind": kind,
+                                 "reason": "pickup could not be routed"})
+                continue
+            if kind == "pickup":
+                pickup_index = len(stops)
+            stops.append({
+                "booking_id": booking.booking_id,
+                "kind": kind,
+                "address": address,
+                "scheduled_time": scheduled_time,
+                "job_number": booking.job_number,
+                "latitude": float(address.latitude),
+                "longitude": float(address.longitude),
+                "after": pickup_index if kind == "dropoff" else None
+            })
+    return stops, unrouted
+
+
+@router.get("/delivery/runs", response_model=DeliveryRun)
+async def get_delivery_run(
+    run_date: date = Query(..., alias="date"),
+    db: Session = Depends(get_db)
+):
+    """
+    Route order for the day's outstanding pickups and drop-offs
+
+    Stops are ordered by nearest neighbour plus 2-opt over haversine
+    distances, starting from the depot (DELIVERY_DEPOT_LATITUDE/LONGITUDE)
+    when configured. Each booking's pickup comes before its drop-off. Stops
+    whose address has no coordinates are listed under `unrouted`.
+    """
+    bookings = (
+        db.query(Booking)
+        .options(joinedload(Booking.pickup_address), joinedload(Booking.dropoff_address))
+        .filter(
+            Booking.completion == False,
+            or_(Booking.pickup_date == run_date, Booking.dropoff_date == run_date)
+        )
+        .all()
+    )
+    # Earliest scheduled stops first, so a run without a depot opens with them
+    bookings.sort(key=lambda b: (
+        min(t for t in (b.pickup_time, b.dropoff_time, time.max) if t is not None),
+        b.booking_id
+    ))
+    stops, unrouted = _run_stops(bookings, run_date)
+
+    start = None
+    if DELIVERY_DEPOT_LATITUDE is not None and DELIVERY_DEPOT_LONGITUDE is not None:
+        start = (DELIVERY_DEPOT_LATITUDE, DELIVERY_DEPOT_LONGITUDE)
+    route = plan_route(stops, start)
+
+    run_stops = []
+    cumulative = 0.0
+    for sequence, (index, leg_km) in enumerate(zip(route["order"], route["legs_km"]), start=1):
+        stop = stops[index]
+        address = stop["address"]
+        cumulative += leg_km
+        run_stops.append({
+            "sequence": sequence,
+            "booking_id": stop["booking_id"],
+            "kind": stop["kind"],
+            "address_id": address.address_id,
+            "name": address.name,
+            "formatted_address": address.formatted_address,
+            "latitude": stop["latitude"],
+            "longitude": stop["longitude"],
+            "scheduled_time": stop["scheduled_time"],
+            "job_number": stop["job_number"],
+            "leg_km": leg_km,
+            "cumulative_km": round(cumulative, 3)
+        })
+
+    return {
+        "date": run_date,
+        "start_latitude": start[0] if start else None,
+        "start_longitude": start[1] if start else None,
+        "total_km": route["total_km"],
+        "stops": run_stops,
+        "unrouted": unrouted
+    }
+
+
 # ============================================================================
 # TEST ENDPOINT
 # ============================================================================
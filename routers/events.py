@@ -0,0 +1,65 @@
+"""
+Events router - Server-Sent Events stream of committed changes
+Shop-floor screens subscribe here instead of polling the job and task endpoints
+"""
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from config import EVENTS_HEARTBEAT_SECONDS
+from events_service import broker, format_sse
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+
+# ============================================================================
+# EVENT STREAM ROUTES
+# ============================================================================
+
+@router.get("/events")
+async def stream_events(request: Request, types: Optional[str] = None):
+    """
+    Stream task, stage and job-status changes as they are committed
+
+    Optional `types` is a comma-separated list of event types or prefixes
+    (e.g. `task,job.stage`). Idle streams get a keep-alive comment every
+    EVENTS_HEARTBEAT_SECONDS.
+    """
+    prefixes = tuple(t.strip() for t in types.split(",") if t.strip()) if types else ()
+
+    async def event_stream():
+        # Subscribe only once the stream runs, so a client that is gone before
+        # the first chunk never leaves a queue behind
+        queue = broker.subscribe()
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if prefixes and not item["type"].startswith(prefixes):
+                    continue
+                yield format_sse(item)
+        finally:
+            broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # don't let nginx buffer the stream
+        }
+    )
+
+
+@router.get("/events/status")
+async def events_status():
+    """Number of open event streams on this worker"""
+    return {"subscribers": broker.subscriber_count}
@@ -1,15 +1,16 @@
 """
 Job domain router - Project, Job, Quote, Item, JobStatus CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
+from concurrent.futures.process import BrokenProcessPool
 
 from database import SessionLocal
 from models.job import (
     Project, Job, Quote, Item, ItemVariable, ItemVariableOption,
-    JobStatus, JobStatusHistory
+    JobStatus, JobStatusHistory, JobEvent
 )
 from models.client import Client, Contact, Billing
 from models.staff import Staff
@@ -22,12 +23,59 @@ from schemas.job import (
     ItemVariableBase, ItemVariableCreate, ItemVariableRead,
     ItemVariableOptionBase, ItemVariableOptionCreate, ItemVariableOptionRead,
     JobStatusBase, JobStatusCreate, JobStatusRead,
-    JobStatusHistoryBase, JobStatusHistoryCreate, JobStatusHistoryRead
+    JobStatusHistoryBase, JobStatusHistoryCreate, JobStatusHistoryRead,
+    JobEventRead, JobStateRead, JobDetailRead, JobFullRead, QuoteDetailRead, QuotePdfBatchRequest
 )
+from schemas.delivery import BookingDetailRead
+from events_service import publish
+from job_history_service import job_states_as_of
+from job_detail_service import cached_job_detail, job_version, load_job_graph, load_quote_graph
+from quote_pdf_service import MAX_BATCH, quote_pdfs, quote_versions, zip_pdfs
+from typeahead_service import typeahead
+from query_filters import FilterSet
+from fieldsets import Fieldset, Include
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api", tags=["job"])
 
+# Filter/sort query parameters accepted by the list endpoints (see query_filters.py)
+PROJECT_FILTERS = FilterSet(
+    Project,
+    {"suburb": Project.suburb, "date_created": Project.date_created},
+    sortable=("project_id", "name", "date_created")
+)
+JOB_FILTERS = FilterSet(
+    Job,
+    {
+        "status": Job.job_status_id,
+        "job_status_id": Job.job_status_id,
+        "stage_id": Job.stage_id,
+        "staff_id": Job.staff_id,
+        "client_id": Job.client_id,
+        "project_id": Job.project_id,
+        "date_created": Job.date_created
+    },
+    sortable=("job_id", "reference", "date_created", "job_status_id", "stage_id")
+)
+# Job columns and relations the job list can return (fields= / include=)
+JOB_FIELDSET = Fieldset(Job, {
+    "client": Job.client,
+    "project": Job.project,
+    "contact": Job.contact,
+    "staff": Include((Job.staff,), ("staff_id", "first_name", "surname", "email", "phone")),
+    "billing": Job.billing,
+    "job_status": Job.job_status,
+    "stage": Job.stage,
+    "status_history": Job.status_history,
+    "quotes": Job.quotes,
+    "quotes.items": Quote.items
+})
+QUOTE_FILTERS = FilterSet(
+    Quote,
+    {"job_id": Quote.job_id, "date_created": Quote.date_created},
+    sortable=("quote_id", "quote_number", "date_created", "cost_excl_gst")
+)
+
 
 def get_db():
     """Database dependency"""
@@ -43,10 +91,19 @@ def get_db():
 # ============================================================================
 
 @router.get("/projects", response_model=List[ProjectRead])
-async def get_projects(db: Session = Depends(get_db)):
-    """Get all projects"""
-    projects = db.query(Project).all()
-    return projects
+async def get_projects(request: Request, db: Session = Depends(get_db)):
+    """
+    Get all projects, optionally filtered and sorted
+
+    Filters: suburb, date_created (`name=value` or `name[op]=value`, op one of
+    eq, ne, gt, gte, lt, lte, in, null). Sort: project_id, name, date_created,
+    e.g. `?date_created[gte]=2024-01-01&sort=-date_created`.
+    """
+    try:
+        query = PROJECT_FILTERS.apply(db.query(Project), request.query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return query.all()
 
 
 @router.get("/projects/{project_id}", response_model=ProjectRead)
@@ -72,6 +129,7 @@ async def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
         db.add(new_project)
         db.commit()
         db.refresh(new_project)
+        typeahead.upsert("project", new_project)
         return new_project
     except Exception as e:
         db.rollback()
@@ -98,6 +156,7 @@ async def update_project(
         
         db.commit()
         db.refresh(project_obj)
+        typeahead.upsert("project", project_obj)
         return project_obj
     except HTTPException:
         raise
@@ -116,6 +175,7 @@ async def delete_project(project_id: int, db: Session = Depends(get_db)):
         
         db.delete(project)
         db.commit()
+        typeahead.remove("project", project_id)
         return None
     except HTTPException:
         raise
@@ -169,11 +229,75 @@ async def create_job_status(status: JobStatusCreate, db: Session = Depends(get_d
 # JOB ROUTES
 # ============================================================================
 
-@router.get("/jobs", response_model=List[JobRead])
-async def get_jobs(db: Session = Depends(get_db)):
-    """Get all jobs"""
-    jobs = db.query(Job).all()
-    return jobs
+@router.get("/jobs", response_model=List[JobDetailRead], response_model_exclude_unset=True)
+async def get_jobs(
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated job columns (default: all)"),
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated: client, project, contact, staff, billing, job_status, stage, "
+                    "status_history, quotes, quotes.items (default: none)"
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Get all jobs, optionally filtered and sorted
+
+    `fields` picks the job columns returned (job_id is always there) and
+    `include` the related rows, e.g. `?fields=reference&include=quotes.items`.
+    Only those columns are selected, and each relation is a single extra
+    query for all jobs.
+
+    Filters: status (= job_status_id), stage_id, staff_id, client_id,
+    project_id, date_created (`name=value` or `name[op]=value`, op one of eq,
+    ne, gt, gte, lt, lte, in, null). Sort: job_id, reference, date_created,
+    job_status_id, stage_id, e.g.
+    `?status=2&staff_id=4&date_created[gte]=2024-01-01&sort=-date_created`.
+    """
+    try:
+        selection = JOB_FIELDSET.parse(fields, include)
+        query = JOB_FILTERS.apply(JOB_FIELDSET.query(db, selection), request.query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [JOB_FIELDSET.payload(job, selection) for job in query.all()]
+
+
+@router.get("/jobs/state", response_model=List[JobStateRead])
+async def get_job_states(
+    as_of: Optional[datetime] = None,
+    job_status_id: Optional[int] = None,
+    stage_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Status and stage of every job as of a point in time (default: now)
+    
+    Starts from the nearest earlier state snapshot and replays the job event
+    log from there. A date-only `as_of` means the end of that day.
+    """
+    if as_of is None:
+        as_of = datetime.utcnow()
+    elif as_of.time() == datetime.min.time():
+        as_of = datetime.combine(as_of.date(), datetime.max.time())
+    
+    states = job_states_as_of(db, as_of)
+    return [
+        {"job_id": job_id, **state}
+        for job_id, state in sorted(states.items())
+        if (job_status_id is None or state["job_status_id"] == job_status_id)
+        and (stage_id is None or state["stage_id"] == stage_id)
+    ]
+
+
+@router.get("/jobs/{job_id}/events", response_model=List[JobEventRead])
+async def get_job_events(job_id: int, db: Session = Depends(get_db)):
+    """Get a job's status and stage changes, oldest first"""
+    return (
+        db.query(JobEvent)
+        .filter(JobEvent.job_id == job_id)
+        .order_by(JobEvent.occurred_at, JobEvent.job_event_id)
+        .all()
+    )
 
 
 @router.get("/jobs/{job_id}", response_model=JobRead)
@@ -185,6 +309,47 @@ async def get_job(job_id: int, db: Session = Depends(get_db)):
     return job
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+@router.get("/jobs/{job_id}/full", response_model=JobFullRead)
+async def get_job_full(job_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Get a job with its quotes and items, tasks, stage dates, status history,
+    bookings and attachments, and the client, contact and staff it shows
+
+    Loaded in a fixed number of queries and cached per job version. The
+    version is the ETag: send it back in If-None-Match to get a 304 when
+    nothing under the job has changed.
+    """
+    version = job_version(db, job_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    etag = f'"job-{job_id}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    def render() -> Optional[bytes]:
+        graph = load_job_graph(db, job_id)
+        if graph is None:
+            return None
+        job, bookings = graph
+        full = JobFullRead.model_validate(job)
+        full.version = version
+        full.bookings = [BookingDetailRead.model_validate(booking, from_attributes=True) for booking in bookings]
+        return full.model_dump_json().encode()
+    
+    body = cached_job_detail(job_id, version, render)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.post("/jobs", response_model=JobRead, status_code=201)
 async def create_job(job: JobCreate, db: Session = Depends(get_db)):
     """Create a new job"""
@@ -210,6 +375,10 @@ async def create_job(job: JobCreate, db: Session = Depends(get_db)):
             date=new_job.date_created or datetime.now().date()
         )
         db.add(initial_history)
+        publish(
+            db, "job.created",
+            job_id=new_job.job_id, job_status_id=new_job.job_status_id, stage_id=new_job.stage_id
+        )
         db.commit()
         db.refresh(new_job)
         return new_job
@@ -257,6 +426,10 @@ async def update_job(
                 date=datetime.now().date()
             )
             db.add(new_history)
+            publish(
+                db, "job.status_changed",
+                job_id=job_obj.job_id, from_status_id=old_status, job_status_id=job_obj.job_status_id
+            )
         
         db.commit()
         db.refresh(job_obj)
@@ -277,6 +450,7 @@ async def delete_job(job_id: int, db: Session = Depends(get_db)):
             raise HTTPException(status_code=404, detail="Job not found")
         
         db.delete(job)
+        publish(db, "job.deleted", job_id=job_id)
         db.commit()
         return None
     except HTTPException:
@@ -298,47 +472,78 @@ def generate_quote_number(job_id: int, db: Session) -> str:
 
 
 @router.get("/quotes", response_model=List[QuoteRead])
-async def get_quotes(job_id: Optional[int] = None, db: Session = Depends(get_db)):
-    """Get all quotes, optionally filtered by job_id"""
-    query = db.query(Quote)
-    if job_id:
-        query = query.filter(Quote.job_id == job_id)
-    quotes = query.all()
-    return quotes
+async def get_quotes(request: Request, db: Session = Depends(get_db)):
+    """
+    Get all quotes, optionally filtered and sorted
 
+    Filters: job_id, date_created (`name=value` or `name[op]=value`, op one of
+    eq, ne, gt, gte, lt, lte, in, null). Sort: quote_id, quote_number,
+    date_created, cost_excl_gst, e.g. `?job_id=12&sort=-date_created`.
+    """
+    try:
+        query = QUOTE_FILTERS.apply(db.query(Quote), request.query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return query.all()
 
-@router.get("/quotes/{quote_id}", response_model=QuoteRead)
+
+@router.get("/quotes/{quote_id}", response_model=QuoteDetailRead)
 async def get_quote(quote_id: int, db: Session = Depends(get_db)):
-    """Get a single quote by ID with items"""
-    quote = db.query(Quote).filter(Quote.quote_id == quote_id).first()
+    """
+    Get a single quote with its items, each with its product and measure type
+    and its variables with the chosen options (four queries for any quote)
+    """
+    quote = load_quote_graph(db, quote_id)
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
+    return quote
+
+
+@router.get("/quotes/{quote_id}/pdf", response_class=Response)
+async def get_quote_pdf(quote_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    Get a quote as a PDF
+
+    Rendered on the quote PDF process pool and cached until the quote or
+    anything it shows changes; the ETag works with If-None-Match.
+    """
+    versions = quote_versions(db, [quote_id])
+    if not versions:
+        raise HTTPException(status_code=404, detail="Quote not found")
+    etag = f'"quote-{quote_id}-{versions[quote_id]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        pdf = (await quote_pdfs(db, versions))[quote_id]
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Quote renderer restarted, please retry")
+    headers["Content-Disposition"] = f'inline; filename="{pdf.filename}"'
+    return Response(content=pdf.content, media_type="application/pdf", headers=headers)
+
+
+@router.post("/quotes/pdf", response_class=Response)
+async def get_quote_pdfs(batch: QuotePdfBatchRequest, db: Session = Depends(get_db)):
+    """Render many quotes (in parallel on the pool) and return them as a zip of PDFs"""
+    quote_ids = list(dict.fromkeys(batch.quote_ids))
+    if not quote_ids or len(quote_ids) > MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"quote_ids must list 1 to {MAX_BATCH} quotes")
     
-    items = db.query(Item).filter(Item.quote_id == quote_id).all()
-    items_data = []
-    for item in items:
-        items_data.append({
-            "item_id": item.item_id,
-            "quote_id": item.quote_id,
-            "product_id": item.product_id,
-            "reference": item.reference,
-            "notes": item.notes,
-            "quantity": float(item.quantity),
-            "length": float(item.length) if item.length else None,
-            "height": float(item.height) if item.height else None,
-            "cost_excl_gst": float(item.cost_excl_gst) if item.cost_excl_gst else None,
-            "cost_incl_gst": float(item.cost_incl_gst) if item.cost_incl_gst else None
-        })
+    versions = quote_versions(db, quote_ids)
+    missing = [quote_id for quote_id in quote_ids if quote_id not in versions]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Quotes not found: {missing}")
     
-    return {
-        "quote_id": quote.quote_id,
-        "quote_number": quote.quote_number,
-        "job_id": quote.job_id,
-        "date_created": quote.date_created,
-        "cost_excl_gst": float(quote.cost_excl_gst) if quote.cost_excl_gst else None,
-        "cost_incl_gst": float(quote.cost_incl_gst) if quote.cost_incl_gst else None,
-        "items": items_data
-    }
+    try:
+        pdfs = await quote_pdfs(db, versions)
+    except BrokenProcessPool:
+        raise HTTPException(status_code=503, detail="Quote renderer restarted, please retry")
+    return Response(
+        content=zip_pdfs([pdfs[quote_id] for quote_id in quote_ids]),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="quotes.zip"'}
+    )
 
 
 @router.post("/quotes", response_model=QuoteRead, status_code=201)
@@ -1,9 +1,8 @@
 """
 Product domain router - ProductCategory, Product, ProductVariable, VariableOption, MeasureType CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
 
 from database import SessionLocal
@@ -15,10 +14,13 @@ from schemas.product import (
     ProductCategoryBase, ProductCategoryCreate, ProductCategoryRead,
     MeasureTypeBase, MeasureTypeCreate, MeasureTypeRead,
     ProductBase, ProductCreate, ProductRead,
-    ProductVariableBase, ProductVariableCreate, ProductVariableRead,
+    ProductVariableBase, ProductVariableCreate, ProductVariableRead, ProductVariableResponse,
     VariableOptionBase, VariableOptionCreate, VariableOptionRead,
-    ProductProductVariableBase, ProductProductVariableCreate, ProductProductVariableRead
+    ProductProductVariableBase, ProductProductVariableCreate, ProductProductVariableRead,
+    ProductVariableMove
 )
+from ordering import next_order, move, schedule_rebalance
+from typeahead_service import typeahead
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api", tags=["product"])
@@ -271,6 +273,7 @@ async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
         db.add(new_product)
         db.commit()
         db.refresh(new_product)
+        typeahead.upsert("product", new_product)
         return new_product
     except Exception as e:
         db.rollback()
@@ -295,6 +298,7 @@ async def update_product(
         
         db.commit()
         db.refresh(product_obj)
+        typeahead.upsert("product", product_obj)
         return product_obj
     except HTTPException:
         raise
@@ -313,6 +317,7 @@ async def delete_product(product_id: int, db: Session = Depends(get_db)):
         
         db.delete(product)
         db.commit()
+        typeahead.remove("product", product_id)
         return None
     except HTTPException:
         raise
@@ -377,12 +382,10 @@ async def create_variable(variable: ProductVariableCreate, db: Session = Depends
         db.flush()
         
         if variable.product_id:
-            max_order = (
-                db.query(func.coalesce(func.max(ProductProductVariable.display_order), 0))
-                .filter(ProductProductVariable.product_id == variable.product_id)
-                .scalar()
-            ) or 0
-            order_value = variable.display_order if variable.display_order is not None else (max_order + 1)
+            order_value = variable.display_order if variable.display_order is not None else next_order(
+                db, ProductProductVariable.display_order,
+                [ProductProductVariable.product_id == variable.product_id]
+            )
             assignment = ProductProductVariable(
                 product_id=variable.product_id,
                 product_variable_id=new_variable.product_variable_id,
@@ -572,12 +575,10 @@ async def assign_variable_to_product(
             return {"message": "Variable already assigned to product"}
         
         if display_order is None:
-            max_order = (
-                db.query(func.coalesce(func.max(ProductProductVariable.display_order), 0))
-                .filter(ProductProductVariable.product_id == product_id)
-                .scalar()
-            ) or 0
-            display_order = max_order + 1
+            display_order = next_order(
+                db, ProductProductVariable.display_order,
+                [ProductProductVariable.product_id == product_id]
+            )
         
         assignment = ProductProductVariable(
             product_id=product_id,
@@ -599,6 +600,68 @@ async def assign_variable_to_product(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post(
+    "/products/{product_id}/variables/{variable_id}/move",
+    response_model=ProductProductVariableRead
+)
+async def move_product_variable(
+    product_id: int,
+    variable_id: int,
+    position: ProductVariableMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Move a variable before/after another variable of the same product"""
+    assignment = db.query(ProductProductVariable).filter(
+        ProductProductVariable.product_id == product_id,
+        ProductProductVariable.product_variable_id == variable_id
+    ).first()
+    if not assignment:
+        raise HTTPException(status_code=404, detail="Variable is not assigned to this product")
+    
+    # Neighbours are given as variable ids - resolve them to assignment rows
+    def assignment_id(neighbour_variable_id):
+        if neighbour_variable_id is None:
+            return None
+        row = db.query(ProductProductVariable.product_product_variable).filter(
+            ProductProductVariable.product_id == product_id,
+            ProductProductVariable.product_variable_id == neighbour_variable_id
+        ).first()
+        if not row:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Variable {neighbour_variable_id} is not assigned to this product"
+            )
+        return row[0]
+    
+    scope = [ProductProductVariable.product_id == product_id]
+    try:
+        needs_rebalance = move(
+            db, assignment,
+            ProductProductVariable.product_product_variable,
+            ProductProductVariable.display_order,
+            scope,
+            before_pk=assignment_id(position.before_id),
+            after_pk=assignment_id(position.after_id)
+        )
+        db.commit()
+        db.refresh(assignment)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if needs_rebalance:
+        schedule_rebalance(
+            background_tasks,
+            ProductProductVariable.product_product_variable,
+            ProductProductVariable.display_order,
+            scope
+        )
+    return assignment
+
+
 
 # ============================================================================
 # TEST ENDPOINT
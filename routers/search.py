@@ -0,0 +1,81 @@
+"""
+Search router - ranked search across clients, contacts, projects, jobs and quotes,
+and typeahead lookups for form pickers
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from database import SessionLocal
+from search_service import ENTITIES, search
+from typeahead_service import typeahead, ENTITIES as TYPEAHEAD_ENTITIES
+from schemas.search import SearchResult, TypeaheadItem
+
+router = APIRouter(prefix="/api", tags=["search"])
+
+
+def get_db():
+    """Database dependency"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ============================================================================
+# SEARCH ROUTES
+# ============================================================================
+
+@router.get("/search", response_model=List[SearchResult])
+async def search_records(
+    q: str = Query(..., min_length=2, max_length=200),
+    types: Optional[str] = Query(None, description="Comma-separated: client, contact, project, job, quote"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Search client names, contact names/emails, project names, job
+    references/POs/site addresses and quote numbers
+
+    Every word must match the start of a word in the record (substrings also
+    match on Postgres with pg_trgm). Results from all types are ranked
+    together, best first; a title equal to or starting with `q` ranks highest.
+    """
+    entities = None
+    if types:
+        entities = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = set(entities) - set(ENTITIES)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown types: {', '.join(sorted(unknown))} (allowed: {', '.join(ENTITIES)})"
+            )
+    return search(db, q, entities, limit)
+
+
+# ============================================================================
+# TYPEAHEAD ROUTES
+# ============================================================================
+
+@router.get("/typeahead/{entity}", response_model=List[TypeaheadItem])
+async def typeahead_lookup(
+    entity: str,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    parent_id: Optional[int] = Query(None, description="client_id for contacts, product_category_id for products"),
+    db: Session = Depends(get_db)
+):
+    """
+    Picker suggestions for clients, contacts, projects or products
+
+    Served from an in-memory index: labels starting with `q` first, then
+    records with a word starting with each word of `q`, then close trigram
+    matches (typos, substrings) with a score below 1.
+    """
+    if entity not in TYPEAHEAD_ENTITIES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown typeahead entity: {entity} (allowed: {', '.join(TYPEAHEAD_ENTITIES)})"
+        )
+    return typeahead.lookup(db, entity, q, limit, parent_id)
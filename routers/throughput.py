@@ -1,23 +1,55 @@
 """
 Throughput domain router - ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate CRUD operations
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy import func, case, update
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
 
 from database import SessionLocal
-from models.throughput import ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate
+from models.throughput import (
+    ThroughputStatus, ThroughputStage, ThroughputTask, ThroughputStageDate, ThroughputJobStageDue
+)
+from models.job import Job
+from models.client import Client
+from models.staff import Staff
 from schemas.throughput import (
     ThroughputStatusBase, ThroughputStatusCreate, ThroughputStatusRead,
     ThroughputStageBase, ThroughputStageCreate, ThroughputStageRead,
     ThroughputTaskBase, ThroughputTaskCreate, ThroughputTaskRead,
-    ThroughputStageDateBase, ThroughputStageDateCreate, ThroughputStageDateRead
+    ThroughputTaskBulkUpdate, ThroughputTaskBulkResult, ThroughputTaskMove,
+    ThroughputStageDateBase, ThroughputStageDateCreate, ThroughputStageDateRead,
+    ThroughputBoardStage,
+    ThroughputScheduleRequest, ThroughputSchedule,
+    ThroughputDueJob
 )
+from throughput_service import sync_job_stage_due
+from events_service import publish
+from job_detail_service import bump_job_versions
+from config import SCHEDULE_STAGE_CAPACITY, SCHEDULE_DEFAULT_CAPACITY, SCHEDULE_WORKING_DAYS
+from scheduler import schedule_jobs, UNTASKED_STAGE_UNITS
+from ordering import move, next_order, schedule_rebalance
+from query_filters import FilterSet
 from fastapi.responses import JSONResponse
 
 router = APIRouter(prefix="/api", tags=["throughput"])
 
+# Filter/sort query parameters accepted by the task list (see query_filters.py)
+TASK_FILTERS = FilterSet(
+    ThroughputTask,
+    {
+        "job_number": ThroughputTask.job_number,
+        "stage_id": ThroughputTask.stage_id,
+        "status_id": ThroughputTask.status_id,
+        "time_completed": ThroughputTask.time_completed
+    },
+    sortable=("task_id", "job_number", "stage_id", "task_order", "time_completed")
+)
+
+# Most tasks one bulk PATCH may change
+MAX_BULK_TASKS = 500
+
 
 def get_db():
     """Database dependency"""
@@ -28,6 +60,19 @@ def get_db():
         db.close()
 
 
+def _publish_task(db: Session, event_type: str, task: ThroughputTask):
+    """Queue a change event for a task (delivered to /api/events on commit)"""
+    publish(
+        db, event_type,
+        task_id=task.task_id,
+        job_id=task.job_number,
+        stage_id=task.stage_id,
+        status_id=task.status_id,
+        task_order=task.task_order,
+        time_completed=task.time_completed
+    )
+
+
 # ============================================================================
 # THROUGHPUT STATUS ROUTES
 # ============================================================================
@@ -170,25 +215,126 @@ async def delete_throughput_stage(stage_id: int, db: Session = Depends(get_db)):
 
 @router.get("/throughput/tasks", response_model=List[ThroughputTaskRead])
 async def get_throughput_tasks(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    job_number: Optional[int] = None,
-    stage_id: Optional[int] = None,
-    status_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Get all throughput tasks, optionally filtered by job_number, stage_id, or status_id"""
-    query = db.query(ThroughputTask)
-    if job_number is not None:
-        query = query.filter(ThroughputTask.job_number == job_number)
-    if stage_id is not None:
-        query = query.filter(ThroughputTask.stage_id == stage_id)
-    if status_id is not None:
-        query = query.filter(ThroughputTask.status_id == status_id)
+    """
+    Get throughput tasks, optionally filtered and sorted
+
+    Filters: job_number, stage_id, status_id, time_completed (`name=value` or
+    `name[op]=value`, op one of eq, ne, gt, gte, lt, lte, in, null). Sort:
+    task_id, job_number, stage_id, task_order, time_completed, e.g.
+    `?stage_id=2&time_completed[null]=true&sort=task_order`.
+    """
+    try:
+        query = TASK_FILTERS.apply(db.query(ThroughputTask), request.query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     tasks = query.offset(skip).limit(limit).all()
     return tasks
 
 
+@router.patch("/throughput/tasks:bulk", response_model=ThroughputTaskBulkResult)
+async def bulk_update_throughput_tasks(
+    payload: ThroughputTaskBulkUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    Apply many task_order / status_id / stage_id changes in one transaction
+    
+    Used by drag-and-drop on the board: the whole move is one request, one
+    existence check and one executemany UPDATE by primary key.
+    """
+    if not payload.tasks:
+        return {"updated": 0, "task_ids": []}
+    if len(payload.tasks) > MAX_BULK_TASKS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_BULK_TASKS} tasks can be updated in one request"
+        )
+    
+    task_ids = [change.task_id for change in payload.tasks]
+    if len(set(task_ids)) != len(task_ids):
+        raise HTTPException(status_code=400, detail="Each task_id may only appear once")
+    
+    found = {
+        row.task_id: row.job_number
+        for row in db.query(ThroughputTask.task_id, ThroughputTask.job_number)
+        .filter(ThroughputTask.task_id.in_(task_ids))
+    }
+    missing = [task_id for task_id in task_ids if task_id not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Throughput tasks not found: {missing}")
+    
+    # Group changes by the set of columns they touch so each group is a
+    # single executemany with a uniform parameter set
+    batches = {}
+    for change in payload.tasks:
+        values = change.model_dump(exclude_unset=True, exclude_none=True)
+        if len(values) > 1:
+            batches.setdefault(tuple(sorted(values)), []).append(values)
+    
+    try:
+        for rows in batches.values():
+            db.execute(update(ThroughputTask), rows)
+        # Bulk UPDATEs skip the flush listener that versions jobs
+        bump_job_versions(db, {found[row["task_id"]] for rows in batches.values() for row in rows})
+        publish(db, "task.bulk_updated", tasks=[row for rows in batches.values() for row in rows])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    updated_ids = [row["task_id"] for rows in batches.values() for row in rows]
+    return {"updated": len(updated_ids), "task_ids": updated_ids}
+
+
+@router.post("/throughput/tasks/{task_id}/move", response_model=ThroughputTaskRead)
+async def move_throughput_task(
+    task_id: int,
+    position: ThroughputTaskMove,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Move a task before/after another task of the same job and stage
+    
+    Only the moved task is written; its new task_order is the midpoint of its
+    neighbours. Passing stage_id moves it into that stage as well.
+    """
+    task = db.query(ThroughputTask).filter(ThroughputTask.task_id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Throughput task not found")
+    
+    if position.stage_id is not None:
+        task.stage_id = position.stage_id
+    scope = [
+        ThroughputTask.job_number == task.job_number,
+        ThroughputTask.stage_id == task.stage_id
+    ]
+    
+    try:
+        needs_rebalance = move(
+            db, task, ThroughputTask.task_id, ThroughputTask.task_order, scope,
+            before_pk=position.before_id, after_pk=position.after_id
+        )
+        _publish_task(db, "task.updated", task)
+        db.commit()
+        db.refresh(task)
+    except LookupError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Neighbour task not found in this job and stage")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if needs_rebalance:
+        schedule_rebalance(background_tasks, ThroughputTask.task_id, ThroughputTask.task_order, scope)
+    return task
+
+
 @router.get("/throughput/tasks/{task_id}", response_model=ThroughputTaskRead)
 async def get_throughput_task(task_id: int, db: Session = Depends(get_db)):
     """Get a single throughput task by ID"""
@@ -203,9 +349,22 @@ async def create_throughput_task(
     task: ThroughputTaskCreate,
     db: Session = Depends(get_db)
 ):
-    """Create a new throughput task"""
-    db_task = ThroughputTask(**task.model_dump())
+    """
+    Create a new throughput task
+
+    Without a task_order the task is appended to its job's list in the stage,
+    ORDER_GAP after the last one, so later moves have room between neighbours.
+    """
+    values = task.model_dump()
+    if values["task_order"] is None:
+        values["task_order"] = next_order(db, ThroughputTask.task_order, [
+            ThroughputTask.job_number == task.job_number,
+            ThroughputTask.stage_id == task.stage_id
+        ])
+    db_task = ThroughputTask(**values)
     db.add(db_task)
+    db.flush()
+    _publish_task(db, "task.created", db_task)
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -225,6 +384,7 @@ async def update_throughput_task(
     for key, value in task.model_dump(exclude_unset=True).items():
         setattr(db_task, key, value)
     
+    _publish_task(db, "task.updated", db_task)
     db.commit()
     db.refresh(db_task)
     return db_task
@@ -238,6 +398,7 @@ async def delete_throughput_task(task_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Throughput task not found")
     
     db.delete(db_task)
+    _publish_task(db, "task.deleted", db_task)
     db.commit()
     return None
 
@@ -283,6 +444,11 @@ async def create_throughput_stage_date(
     """Create a new throughput stage date"""
     db_stage_date = ThroughputStageDate(**stage_date.model_dump())
     db.add(db_stage_date)
+    sync_job_stage_due(db, [db_stage_date.job_id])
+    publish(
+        db, "stage_date.updated",
+        job_id=db_stage_date.job_id, stage_id=db_stage_date.status_id, due_date=db_stage_date.due_date
+    )
     db.commit()
     db.refresh(db_stage_date)
     return db_stage_date
@@ -301,9 +467,15 @@ async def update_throughput_stage_date(
     if not db_stage_date:
         raise HTTPException(status_code=404, detail="Throughput stage date not found")
     
+    previous_job_id = db_stage_date.job_id
     for key, value in stage_date.model_dump(exclude_unset=True).items():
         setattr(db_stage_date, key, value)
     
+    sync_job_stage_due(db, [previous_job_id, db_stage_date.job_id])
+    publish(
+        db, "stage_date.updated",
+        job_id=db_stage_date.job_id, stage_id=db_stage_date.status_id, due_date=db_stage_date.due_date
+    )
     db.commit()
     db.refresh(db_stage_date)
     return db_stage_date
@@ -319,10 +491,298 @@ async def delete_throughput_stage_date(stage_date_id: int, db: Session = Depends
         raise HTTPException(status_code=404, detail="Throughput stage date not found")
     
     db.delete(db_stage_date)
+    sync_job_stage_due(db, [db_stage_date.job_id])
+    publish(db, "stage_date.deleted", job_id=db_stage_date.job_id, stage_id=db_stage_date.status_id)
     db.commit()
     return None
 
 
+@router.get("/throughput/due", response_model=List[ThroughputDueJob])
+async def get_throughput_due(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    Get jobs whose current stage is due in a date range (inclusive)
+    
+    Reads the maintained job_stage_due projection, so this is a range scan on
+    its due_date index. Omit `from` to include everything already overdue.
+    """
+    query = (
+        db.query(
+            ThroughputJobStageDue.job_id,
+            ThroughputJobStageDue.stage_id,
+            ThroughputJobStageDue.due_date,
+            Job.reference,
+            ThroughputStage.stage
+        )
+        .join(Job, Job.job_id == ThroughputJobStageDue.job_id)
+        .join(ThroughputStage, ThroughputStage.stage_id == ThroughputJobStageDue.stage_id)
+    )
+    if from_date is not None:
+        query = query.filter(ThroughputJobStageDue.due_date >= from_date)
+    if to_date is not None:
+        query = query.filter(ThroughputJobStageDue.due_date <= to_date)
+    
+    rows = (
+        query.order_by(ThroughputJobStageDue.due_date, ThroughputJobStageDue.job_id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    today = date.today()
+    return [
+        {
+            "job_id": row.job_id,
+            "reference": row.reference,
+            "stage_id": row.stage_id,
+            "stage": row.stage,
+            "due_date": row.due_date,
+            "overdue": row.due_date < today
+        }
+        for row in rows
+    ]
+
+
+# ============================================================================
+# THROUGHPUT BOARD ROUTES
+# ============================================================================
+
+@router.get("/throughput/board", response_model=List[ThroughputBoardStage])
+async def get_throughput_board(
+    staff_id: Optional[int] = None,
+    client_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get the production board: every stage in stage_order with the jobs
+    currently in it, their task progress and stage due date.
+    
+    Built from two queries (stages, then jobs joined to grouped task counts
+    and stage due dates) instead of a request per job.
+    """
+    stages = db.query(ThroughputStage).order_by(ThroughputStage.stage_order).all()
+    
+    # Task counts per job and stage - completed tasks have a completion time
+    task_counts = (
+        db.query(
+            ThroughputTask.job_number.label("job_id"),
+            ThroughputTask.stage_id.label("stage_id"),
+            func.count(ThroughputTask.task_id).label("task_count"),
+            func.sum(
+                case((ThroughputTask.time_completed.isnot(None), 1), else_=0)
+            ).label("tasks_completed")
+        )
+        .group_by(ThroughputTask.job_number, ThroughputTask.stage_id)
+        .subquery()
+    )
+    
+    # One due date per job and stage
+    stage_due = (
+        db.query(
+            ThroughputStageDate.job_id.label("job_id"),
+            ThroughputStageDate.status_id.label("stage_id"),
+            func.min(ThroughputStageDate.due_date).label("due_date")
+        )
+        .group_by(ThroughputStageDate.job_id, ThroughputStageDate.status_id)
+        .subquery()
+    )
+    
+    query = (
+        db.query(
+            Job.job_id,
+            Job.reference,
+            Job.client_id,
+            Job.staff_id,
+            Job.job_status_id,
+            Job.stage_id,
+            Client.name.label("client_name"),
+            Staff.first_name,
+            Staff.surname,
+            stage_due.c.due_date,
+            func.coalesce(task_counts.c.task_count, 0).label("task_count"),
+            func.coalesce(task_counts.c.tasks_completed, 0).label("tasks_completed")
+        )
+        .outerjoin(Client, Client.client_id == Job.client_id)
+        .outerjoin(Staff, Staff.staff_id == Job.staff_id)
+        .outerjoin(
+            task_counts,
+            (task_counts.c.job_id == Job.job_id) & (task_counts.c.stage_id == Job.stage_id)
+        )
+        .outerjoin(
+            stage_due,
+            (stage_due.c.job_id == Job.job_id) & (stage_due.c.stage_id == Job.stage_id)
+        )
+        .filter(Job.stage_id.isnot(None))
+    )
+    if staff_id is not None:
+        query = query.filter(Job.staff_id == staff_id)
+    if client_id is not None:
+        query = query.filter(Job.client_id == client_id)
+    
+    # Soonest due first, undated jobs last
+    rows = query.order_by(
+        stage_due.c.due_date.is_(None),
+        stage_due.c.due_date,
+        Job.job_id
+    ).all()
+    
+    jobs_by_stage = {stage.stage_id: [] for stage in stages}
+    for row in rows:
+        if row.stage_id not in jobs_by_stage:
+            continue
+        task_count = int(row.task_count or 0)
+        tasks_completed = int(row.tasks_completed or 0)
+        jobs_by_stage[row.stage_id].append({
+            "job_id": row.job_id,
+            "reference": row.reference,
+            "client_id": row.client_id,
+            "client_name": row.client_name,
+            "staff_id": row.staff_id,
+            "staff_name": f"{row.first_name} {row.surname}" if row.first_name else None,
+            "job_status_id": row.job_status_id,
+            "due_date": row.due_date,
+            "task_count": task_count,
+            "tasks_completed": tasks_completed,
+            "completion_percentage": round(tasks_completed * 100.0 / task_count, 1) if task_count else 0.0
+        })
+    
+    return [
+        {
+            "stage_id": stage.stage_id,
+            "stage": stage.stage,
+            "stage_order": stage.stage_order,
+            "jobs": jobs_by_stage[stage.stage_id]
+        }
+        for stage in stages
+    ]
+
+
+# ============================================================================
+# THROUGHPUT SCHEDULE ROUTES
+# ============================================================================
+
+def _build_schedule(
+    db: Session,
+    start_date: date,
+    stage_capacities: dict,
+    default_capacity: int,
+    at_risk_only: bool = False
+) -> dict:
+    """Load open jobs with their remaining stage work and run the scheduler"""
+    stages = db.query(ThroughputStage).order_by(ThroughputStage.stage_order).all()
+    stage_ids = [stage.stage_id for stage in stages]
+    stage_position = {stage_id: index for index, stage_id in enumerate(stage_ids)}
+    
+    jobs = db.query(Job.job_id, Job.reference, Job.stage_id).filter(Job.stage_id.isnot(None)).all()
+    
+    # Outstanding tasks per (job, stage); stages with no tasks at all count as untasked
+    task_units = {}
+    for row in (
+        db.query(
+            ThroughputTask.job_number,
+            ThroughputTask.stage_id,
+            func.sum(case((ThroughputTask.time_completed.is_(None), 1), else_=0))
+        )
+        .join(Job, Job.job_id == ThroughputTask.job_number)
+        .filter(Job.stage_id.isnot(None))
+        .group_by(ThroughputTask.job_number, ThroughputTask.stage_id)
+    ):
+        task_units[(row[0], row[1])] = int(row[2] or 0)
+    
+    due_dates = {}
+    for row in (
+        db.query(
+            ThroughputStageDate.job_id,
+            ThroughputStageDate.status_id,
+            func.min(ThroughputStageDate.due_date)
+        )
+        .join(Job, Job.job_id == ThroughputStageDate.job_id)
+        .filter(Job.stage_id.isnot(None))
+        .group_by(ThroughputStageDate.job_id, ThroughputStageDate.status_id)
+    ):
+        due_dates[(row[0], row[1])] = row[2]
+    
+    scheduler_input = []
+    for job in jobs:
+        if job.stage_id not in stage_position:
+            continue
+        scheduler_input.append({
+            "job_id": job.job_id,
+            "reference": job.reference,
+            "stages": [
+                {
+                    "stage_id": stage_id,
+                    "units": task_units.get((job.job_id, stage_id), UNTASKED_STAGE_UNITS),
+                    "due_date": due_dates.get((job.job_id, stage_id))
+                }
+                for stage_id in stage_ids[stage_position[job.stage_id]:]
+            ]
+        })
+    
+    scheduled = schedule_jobs(
+        scheduler_input,
+        start_date,
+        stage_capacities,
+        default_capacity,
+        SCHEDULE_WORKING_DAYS
+    )
+    at_risk = [job for job in scheduled if job["at_risk"]]
+    return {
+        "start_date": start_date,
+        "job_count": len(scheduled),
+        "at_risk_count": len(at_risk),
+        "jobs": at_risk if at_risk_only else scheduled
+    }
+
+
+@router.get("/throughput/schedule", response_model=ThroughputSchedule)
+async def get_throughput_schedule(
+    start_date: Optional[date] = None,
+    at_risk_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Project when each open job will clear its remaining stages
+    
+    Uses the stage capacities from config (SCHEDULE_STAGE_CAPACITY) and flags
+    jobs whose projected stage finish is after the stage due date.
+    """
+    return _build_schedule(
+        db,
+        start_date or date.today(),
+        SCHEDULE_STAGE_CAPACITY,
+        SCHEDULE_DEFAULT_CAPACITY,
+        at_risk_only
+    )
+
+
+@router.post("/throughput/schedule", response_model=ThroughputSchedule)
+async def run_throughput_schedule(
+    request: ThroughputScheduleRequest,
+    at_risk_only: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Project the schedule with capacities supplied in the request (what-if planning)"""
+    capacities = {**SCHEDULE_STAGE_CAPACITY, **request.stage_capacities}
+    default_capacity = (
+        request.default_capacity if request.default_capacity is not None else SCHEDULE_DEFAULT_CAPACITY
+    )
+    if default_capacity < 1 or any(capacity < 1 for capacity in capacities.values()):
+        raise HTTPException(status_code=400, detail="Stage capacities must be at least 1 task per day")
+    
+    return _build_schedule(
+        db,
+        request.start_date or date.today(),
+        capacities,
+        default_capacity,
+        at_risk_only
+    )
+
+
 # ============================================================================
 # TEST ENDPOINT
 # ============================================================================
@@ -1,7 +1,7 @@
 """
-File upload router - Handles file uploads to Dropbox
+File upload router - Handles file uploads to the configured storage backend
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
@@ -10,13 +10,7 @@ from database import SessionLocal
 from models.delivery import Attachment
 from schemas.delivery import AttachmentRead as AttachmentResponse
 
-# Try to import dropbox_service, but make it optional
-try:
-    from dropbox_service import get_dropbox_service, upload_multiple_files
-    DROPBOX_AVAILABLE = True
-except ImportError:
-    DROPBOX_AVAILABLE = False
-    print("Warning: dropbox_service not available")
+from storage_service import ENTITY_TYPES, get_storage_backend, serve_local_file
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
@@ -39,23 +33,22 @@ async def upload_files(
     db: Session = Depends(get_db)
 ):
     """
-    Upload files to Dropbox
+    Upload files to the configured storage backend (Dropbox or local disk)
     
     - **files**: List of files to upload
     - **entity_id**: ID of the entity (job_id, booking_id, etc.)
-    - **entity_type**: Type of entity ('job', 'booking', 'general', etc.)
+    - **entity_type**: Type of entity ('job', 'booking' or 'general')
     - **uploaded_by**: ID of the user uploading the files (optional)
     
-    Returns list of uploaded file information with Dropbox paths and shared URLs
+    Returns list of uploaded file information with storage paths and shared URLs
     """
-    if not DROPBOX_AVAILABLE:
-        raise HTTPException(
-            status_code=503,
-            detail="Dropbox service not available. Please check configuration."
-        )
-    
     if not files or all(not file.filename for file in files):
         raise HTTPException(status_code=400, detail="No files provided")
+    if entity_type not in ENTITY_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"entity_type must be one of: {', '.join(ENTITY_TYPES)}"
+        )
     
     try:
         # Prepare files for upload
@@ -71,9 +64,9 @@ async def upload_files(
         if not files_to_upload:
             raise HTTPException(status_code=400, detail="No valid files to upload")
         
-        # Upload files to Dropbox
-        dropbox_service = get_dropbox_service()
-        upload_results = upload_multiple_files(
+        # Upload files to the storage backend
+        storage = get_storage_backend()
+        upload_results = storage.upload_multiple_files(
             files_to_upload,
             entity_id,
             entity_type
@@ -82,7 +75,7 @@ async def upload_files(
         if not upload_results:
             raise HTTPException(
                 status_code=500,
-                detail="Failed to upload files to Dropbox"
+                detail=f"Failed to upload files to {storage.name} storage"
             )
         
         # Save attachment records to database
@@ -117,7 +110,7 @@ async def upload_files(
     
     except HTTPException:
         raise
-    except RuntimeError as e:
+    except (RuntimeError, ImportError) as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         db.rollback()
@@ -226,14 +219,13 @@ async def delete_attachment(attachment_id: int, db: Session = Depends(get_db)):
         if not attachment:
             raise HTTPException(status_code=404, detail="Attachment not found")
         
-        # Optionally delete from Dropbox
-        if DROPBOX_AVAILABLE and attachment.dropbox_path:
+        # Optionally delete from the storage backend
+        if attachment.dropbox_path:
             try:
-                from dropbox_service import delete_file
-                delete_file(attachment.dropbox_path)
+                get_storage_backend().delete_file(attachment.dropbox_path)
             except Exception as e:
-                print(f"Error deleting file from Dropbox: {str(e)}")
-                # Continue with database deletion even if Dropbox deletion fails
+                print(f"Error deleting file from storage: {str(e)}")
+                # Continue with database deletion even if storage deletion fails
         
         db.delete(attachment)
         db.commit()
@@ -244,3 +236,20 @@ async def delete_attachment(attachment_id: int, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+
+@router.api_route("/files/{file_path:path}", methods=["GET", "HEAD"])
+async def serve_file(file_path: str, request: Request):
+    """
+    Serve a file held by the local storage backend
+    
+    Files are handed off with zero-copy (sendfile) where the server or reverse
+    proxy supports it, so large downloads don't pass through Python.
+    """
+    full_path = get_storage_backend().local_path(file_path)
+    if full_path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    try:
+        return serve_local_file(full_path, file_path, method=request.method)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found")
@@ -7,7 +7,7 @@ from datetime import date, datetime, time
 
 # Import all schemas
 from .client import (
-    ClientBase, ClientCreate, ClientRead,
+    ClientBase, ClientCreate, ClientRead, ClientDetailRead,
     ContactBase, ContactCreate, ContactRead,
     BillingBase, BillingCreate, BillingRead
 )
@@ -15,9 +15,10 @@ from .product import (
     ProductCategoryBase, ProductCategoryCreate, ProductCategoryRead,
     MeasureTypeBase, MeasureTypeCreate, MeasureTypeRead,
     ProductBase, ProductCreate, ProductRead,
-    ProductVariableBase, ProductVariableCreate, ProductVariableRead,
+    ProductVariableBase, ProductVariableCreate, ProductVariableRead, ProductVariableResponse,
     VariableOptionBase, VariableOptionCreate, VariableOptionRead,
-    ProductProductVariableBase, ProductProductVariableCreate, ProductProductVariableRead
+    ProductProductVariableBase, ProductProductVariableCreate, ProductProductVariableRead,
+    ProductVariableMove
 )
 from .staff import (
     StaffBase, StaffCreate, StaffRead
@@ -27,37 +28,51 @@ from .job import (
     JobStatusBase, JobStatusCreate, JobStatusRead,
     JobBase, JobCreate, JobRead,
     JobStatusHistoryBase, JobStatusHistoryCreate, JobStatusHistoryRead,
+    JobEventRead, JobStateRead,
     QuoteBase, QuoteCreate, QuoteRead,
     ItemBase, ItemCreate, ItemRead,
     ItemVariableBase, ItemVariableCreate, ItemVariableRead,
-    ItemVariableOptionBase, ItemVariableOptionCreate, ItemVariableOptionRead
+    ItemVariableOptionBase, ItemVariableOptionCreate, ItemVariableOptionRead,
+    ItemProductRead, ItemVariableOptionDetailRead, ItemVariableDetailRead, ItemDetailRead, QuoteDetailRead,
+    QuotePdfBatchRequest,
+    JobStaffRead, JobQuoteRead, JobDetailRead, JobFullRead
 )
 from .delivery import (
-    AddressBase, AddressCreate, AddressRead,
-    BookingBase, BookingCreate, BookingRead,
-    AttachmentBase, AttachmentCreate, AttachmentRead
+    AddressBase, AddressCreate, AddressRead, NearbyAddressRead,
+    BookingBase, BookingCreate, BookingRead, BookingCreatorRead, BookingDetailRead,
+    BookingCalendarEntry, BookingCalendarDay,
+    AttachmentBase, AttachmentCreate, AttachmentRead,
+    DeliveryRunStop, DeliveryRunSkipped, DeliveryRun
 )
 from .throughput import (
     ThroughputStatusBase, ThroughputStatusCreate, ThroughputStatusRead,
     ThroughputStageBase, ThroughputStageCreate, ThroughputStageRead,
     ThroughputTaskBase, ThroughputTaskCreate, ThroughputTaskRead,
-    ThroughputStageDateBase, ThroughputStageDateCreate, ThroughputStageDateRead
+    ThroughputTaskBulkChange, ThroughputTaskBulkUpdate, ThroughputTaskBulkResult, ThroughputTaskMove,
+    ThroughputStageDateBase, ThroughputStageDateCreate, ThroughputStageDateRead, ThroughputDueJob,
+    ThroughputBoardJob, ThroughputBoardStage,
+    ThroughputScheduleRequest, ThroughputScheduleStage, ThroughputScheduleJob, ThroughputSchedule
 )
+from .analytics import (
+    StatusTimeRead, StageTimeRead, ThroughputWeekRead, WipStageRead, FlowSummaryRead
+)
+from .search import SearchResult, TypeaheadItem
 # Public schema imports - add when models exist
 # from .public import (...)
 
 __all__ = [
     # Client schemas
-    "ClientBase", "ClientCreate", "ClientRead",
+    "ClientBase", "ClientCreate", "ClientRead", "ClientDetailRead",
     "ContactBase", "ContactCreate", "ContactRead",
     "BillingBase", "BillingCreate", "BillingRead",
     # Product schemas
     "ProductCategoryBase", "ProductCategoryCreate", "ProductCategoryRead",
     "MeasureTypeBase", "MeasureTypeCreate", "MeasureTypeRead",
     "ProductBase", "ProductCreate", "ProductRead",
-    "ProductVariableBase", "ProductVariableCreate", "ProductVariableRead",
+    "ProductVariableBase", "ProductVariableCreate", "ProductVariableRead", "ProductVariableResponse",
     "VariableOptionBase", "VariableOptionCreate", "VariableOptionRead",
     "ProductProductVariableBase", "ProductProductVariableCreate", "ProductProductVariableRead",
+    "ProductVariableMove",
     # Staff schemas
     "StaffBase", "StaffCreate", "StaffRead",
     # Job schemas
@@ -65,18 +80,31 @@ __all__ = [
     "JobStatusBase", "JobStatusCreate", "JobStatusRead",
     "JobBase", "JobCreate", "JobRead",
     "JobStatusHistoryBase", "JobStatusHistoryCreate", "JobStatusHistoryRead",
+    "JobEventRead", "JobStateRead",
     "QuoteBase", "QuoteCreate", "QuoteRead",
     "ItemBase", "ItemCreate", "ItemRead",
     "ItemVariableBase", "ItemVariableCreate", "ItemVariableRead",
     "ItemVariableOptionBase", "ItemVariableOptionCreate", "ItemVariableOptionRead",
+    "ItemProductRead", "ItemVariableOptionDetailRead", "ItemVariableDetailRead", "ItemDetailRead",
+    "QuoteDetailRead", "QuotePdfBatchRequest",
+    "JobStaffRead", "JobQuoteRead", "JobDetailRead", "JobFullRead",
     # Delivery schemas
-    "AddressBase", "AddressCreate", "AddressRead",
-    "BookingBase", "BookingCreate", "BookingRead",
+    "AddressBase", "AddressCreate", "AddressRead", "NearbyAddressRead",
+    "BookingBase", "BookingCreate", "BookingRead", "BookingCreatorRead", "BookingDetailRead",
+    "BookingCalendarEntry", "BookingCalendarDay",
     "AttachmentBase", "AttachmentCreate", "AttachmentRead",
+    "DeliveryRunStop", "DeliveryRunSkipped", "DeliveryRun",
     # Throughput schemas
     "ThroughputStatusBase", "ThroughputStatusCreate", "ThroughputStatusRead",
     "ThroughputStageBase", "ThroughputStageCreate", "ThroughputStageRead",
     "ThroughputTaskBase", "ThroughputTaskCreate", "ThroughputTaskRead",
-    "ThroughputStageDateBase", "ThroughputStageDateCreate", "ThroughputStageDateRead",
+    "ThroughputTaskBulkChange", "ThroughputTaskBulkUpdate", "ThroughputTaskBulkResult", "ThroughputTaskMove",
+    "ThroughputStageDateBase", "ThroughputStageDateCreate", "ThroughputStageDateRead", "ThroughputDueJob",
+    "ThroughputBoardJob", "ThroughputBoardStage",
+    "ThroughputScheduleRequest", "ThroughputScheduleStage", "ThroughputScheduleJob", "ThroughputSchedule",
+    # Analytics schemas
+    "StatusTimeRead", "StageTimeRead", "ThroughputWeekRead", "WipStageRead", "FlowSummaryRead",
+    # Search schemas
+    "SearchResult", "TypeaheadItem",
 ]
 
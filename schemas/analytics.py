@@ -0,0 +1,47 @@
+"""
+Pydantic schemas for flow analytics responses
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import date
+
+
+class StatusTimeRead(BaseModel):
+    job_status_id: int
+    job_status: str
+    transitions: int
+    still_open: int = 0
+    avg_days: Optional[float] = None
+    min_days: Optional[float] = None
+    max_days: Optional[float] = None
+
+
+class StageTimeRead(BaseModel):
+    stage_id: int
+    stage: str
+    jobs: int
+    avg_days: Optional[float] = None
+    min_days: Optional[float] = None
+    max_days: Optional[float] = None
+
+
+class ThroughputWeekRead(BaseModel):
+    week_start: date
+    tasks_completed: int = 0
+    jobs_completed: int = 0
+
+
+class WipStageRead(BaseModel):
+    stage_id: int
+    stage: str
+    jobs: int = 0
+    open_tasks: int = 0
+
+
+class FlowSummaryRead(BaseModel):
+    from_date: date
+    to_date: date
+    status_times: List[StatusTimeRead] = []
+    stage_times: List[StageTimeRead] = []
+    throughput: List[ThroughputWeekRead] = []
+    wip: List[WipStageRead] = []
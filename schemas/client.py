@@ -2,7 +2,7 @@
 Pydantic schemas for Client domain models
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 # Client Schemas
@@ -65,3 +65,15 @@ class BillingRead(BillingBase):
     class Config:
         from_attributes = True
 
+
+
+class ClientDetailRead(BaseModel):
+    """Client as returned with fields= / include=; only the selected columns and relations are present"""
+    client_id: int
+    name: Optional[str] = None
+    address: Optional[str] = None
+    suburb: Optional[str] = None
+    state: Optional[str] = None
+    postcode: Optional[int] = None
+    contacts: Optional[List[ContactRead]] = None
+    billing: Optional[List[BillingRead]] = None
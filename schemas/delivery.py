@@ -2,7 +2,7 @@
 Pydantic schemas for Delivery domain models
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime, time
 from decimal import Decimal
 
@@ -28,11 +28,16 @@ class AddressCreate(AddressBase):
 
 class AddressRead(AddressBase):
     address_id: int
+    address_key: Optional[str] = None
     
     class Config:
         from_attributes = True
 
 
+class NearbyAddressRead(AddressRead):
+    distance_km: float
+
+
 # Booking Schemas
 class BookingBase(BaseModel):
     pickup_address_id: Optional[int] = None
@@ -62,6 +67,55 @@ class BookingRead(BookingBase):
         from_attributes = True
 
 
+class BookingCreatorRead(BaseModel):
+    staff_id: int
+    first_name: str
+    surname: str
+    
+    class Config:
+        from_attributes = True
+
+
+class BookingDetailRead(BaseModel):
+    """Booking as returned with fields= / include=; only the selected columns and relations are present"""
+    booking_id: int
+    pickup_address_id: Optional[int] = None
+    pickup_date: Optional[date] = None
+    pickup_time: Optional[time] = None
+    dropoff_address_id: Optional[int] = None
+    dropoff_date: Optional[date] = None
+    dropoff_time: Optional[time] = None
+    creator_id: Optional[int] = None
+    notes: Optional[str] = None
+    attachments: Optional[int] = None
+    job_number: Optional[str] = None
+    pickup_complete: Optional[datetime] = None
+    dropoff_complete: Optional[datetime] = None
+    created: Optional[datetime] = None
+    completion: Optional[bool] = None
+    pickup_address: Optional[AddressRead] = None
+    dropoff_address: Optional[AddressRead] = None
+    creator: Optional[BookingCreatorRead] = None
+    booking_attachments: Optional[List["AttachmentRead"]] = None
+
+
+class BookingCalendarEntry(BaseModel):
+    booking_id: int
+    kind: str  # "pickup" or "dropoff"
+    scheduled_time: Optional[time] = None
+    completed_at: Optional[datetime] = None
+    completion: bool
+    job_number: Optional[str] = None
+    notes: Optional[str] = None
+    address: Optional[AddressRead] = None
+
+
+class BookingCalendarDay(BaseModel):
+    date: date
+    pickups: List[BookingCalendarEntry]
+    dropoffs: List[BookingCalendarEntry]
+
+
 # Attachment Schemas
 class AttachmentBase(BaseModel):
     booking_id: Optional[int] = None
@@ -81,3 +135,37 @@ class AttachmentRead(AttachmentBase):
     class Config:
         from_attributes = True
 
+
+
+# Delivery Run Schemas
+class DeliveryRunStop(BaseModel):
+    sequence: int
+    booking_id: int
+    kind: str  # "pickup" or "dropoff"
+    address_id: int
+    name: Optional[str] = None
+    formatted_address: Optional[str] = None
+    latitude: float
+    longitude: float
+    scheduled_time: Optional[time] = None
+    job_number: Optional[str] = None
+    leg_km: float
+    cumulative_km: float
+
+
+class DeliveryRunSkipped(BaseModel):
+    booking_id: int
+    kind: str
+    reason: str
+
+
+class DeliveryRun(BaseModel):
+    date: date
+    start_latitude: Optional[float] = None
+    start_longitude: Optional[float] = None
+    total_km: float
+    stops: List[DeliveryRunStop]
+    unrouted: List[DeliveryRunSkipped]
+
+
+BookingDetailRead.model_rebuild()
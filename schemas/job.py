@@ -2,10 +2,16 @@
 Pydantic schemas for Job domain models
 """
 from pydantic import BaseModel
-from typing import Optional
-from datetime import date
+from typing import List, Optional
+import datetime as dt
+from datetime import date, datetime
 from decimal import Decimal
 
+from .client import ClientRead, ContactRead, BillingRead
+from .delivery import BookingDetailRead
+from .product import MeasureTypeRead, ProductRead, ProductVariableRead, VariableOptionRead
+from .throughput import ThroughputStageRead, ThroughputTaskRead, ThroughputStageDateRead
+
 
 # Project Schemas
 class ProjectBase(BaseModel):
@@ -75,11 +81,30 @@ class JobRead(JobBase):
         from_attributes = True
 
 
+# JobEvent Schemas (append-only status/stage log)
+class JobEventRead(BaseModel):
+    job_event_id: int
+    job_id: int
+    event_type: str
+    from_value: Optional[int] = None
+    to_value: Optional[int] = None
+    occurred_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class JobStateRead(BaseModel):
+    job_id: int
+    job_status_id: Optional[int] = None
+    stage_id: Optional[int] = None
+
+
 # JobStatusHistory Schemas
 class JobStatusHistoryBase(BaseModel):
     job_id: int
     job_status_id: int
-    date: Optional[date] = None
+    date: Optional[dt.date] = None  # the field name shadows datetime.date inside the class
 
 
 class JobStatusHistoryCreate(JobStatusHistoryBase):
@@ -170,3 +195,96 @@ class ItemVariableOptionRead(ItemVariableOptionBase):
     class Config:
         from_attributes = True
 
+
+
+# Quote detail (/api/quotes/{quote_id}): items with their product and chosen options
+class ItemProductRead(ProductRead):
+    measure_type: Optional[MeasureTypeRead] = None
+
+
+class ItemVariableOptionDetailRead(ItemVariableOptionRead):
+    variable_option: VariableOptionRead
+
+
+class ItemVariableDetailRead(ItemVariableRead):
+    product_variable: ProductVariableRead
+    item_variable_options: List[ItemVariableOptionDetailRead] = []
+
+
+class ItemDetailRead(ItemRead):
+    length: Optional[float] = None
+    height: Optional[float] = None
+    product: ItemProductRead
+    item_variables: List[ItemVariableDetailRead] = []
+
+
+class QuoteDetailRead(QuoteRead):
+    items: List[ItemDetailRead] = []
+
+
+
+class QuotePdfBatchRequest(BaseModel):
+    quote_ids: List[int]
+
+
+# Job aggregate (/api/jobs/{job_id}/full)
+class JobStaffRead(BaseModel):
+    staff_id: int
+    first_name: str
+    surname: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class JobQuoteRead(QuoteRead):
+    items: List[ItemRead] = []
+
+
+class JobDetailRead(BaseModel):
+    """Job as returned with fields= / include=; only the selected columns and relations are present"""
+    job_id: int
+    reference: Optional[str] = None
+    project_id: Optional[int] = None
+    client_id: Optional[int] = None
+    billing_entity: Optional[int] = None
+    po: Optional[str] = None
+    date_created: Optional[date] = None
+    contact_id: Optional[int] = None
+    staff_id: Optional[int] = None
+    job_status_id: Optional[int] = None
+    job_address: Optional[str] = None
+    suburb: Optional[str] = None
+    state: Optional[str] = None
+    postcode: Optional[int] = None
+    approved_quote: Optional[int] = None
+    stage_id: Optional[int] = None
+    assets: Optional[str] = None
+    client: Optional[ClientRead] = None
+    project: Optional[ProjectRead] = None
+    contact: Optional[ContactRead] = None
+    staff: Optional[JobStaffRead] = None
+    billing: Optional[BillingRead] = None
+    job_status: Optional[JobStatusRead] = None
+    stage: Optional[ThroughputStageRead] = None
+    status_history: Optional[List[JobStatusHistoryRead]] = None
+    quotes: Optional[List[JobQuoteRead]] = None
+
+
+class JobFullRead(JobRead):
+    """A job with everything the job screen shows; `version` changes on any write to it"""
+    version: int = 0
+    project: Optional[ProjectRead] = None
+    client: Optional[ClientRead] = None
+    contact: Optional[ContactRead] = None
+    billing: Optional[BillingRead] = None
+    staff: Optional[JobStaffRead] = None
+    job_status: Optional[JobStatusRead] = None
+    stage: Optional[ThroughputStageRead] = None
+    status_history: List[JobStatusHistoryRead] = []
+    quotes: List[JobQuoteRead] = []
+    tasks: List[ThroughputTaskRead] = []
+    stage_dates: List[ThroughputStageDateRead] = []
+    bookings: List[BookingDetailRead] = []
@@ -2,7 +2,7 @@
 Pydantic schemas for Product domain models
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 
 
 # ProductCategory Schemas
@@ -62,7 +62,8 @@ class ProductVariableBase(BaseModel):
 
 
 class ProductVariableCreate(ProductVariableBase):
-    pass
+    product_id: Optional[int] = None
+    display_order: Optional[int] = None
 
 
 class ProductVariableRead(ProductVariableBase):
@@ -72,6 +73,13 @@ class ProductVariableRead(ProductVariableBase):
         from_attributes = True
 
 
+class ProductVariableResponse(ProductVariableRead):
+    base_cost: float = 0.0
+    multiplier_cost: float = 0.0
+    product_ids: List[int] = []
+    options: List[dict] = []
+
+
 # VariableOption Schemas
 class VariableOptionBase(BaseModel):
     name: str
@@ -108,3 +116,9 @@ class ProductProductVariableRead(ProductProductVariableBase):
     class Config:
         from_attributes = True
 
+
+# Variable move - place a product's variable between two of its others
+class ProductVariableMove(BaseModel):
+    before_id: Optional[int] = None
+    after_id: Optional[int] = None
+
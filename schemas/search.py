@@ -0,0 +1,20 @@
+"""
+Pydantic schemas for search and typeahead responses
+"""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SearchResult(BaseModel):
+    entity: str  # client, contact, project, job or quote
+    id: int
+    title: Optional[str] = None
+    subtitle: Optional[str] = None
+    rank: float
+
+
+class TypeaheadItem(BaseModel):
+    id: int
+    label: str
+    detail: Optional[str] = None
+    score: float  # 1.0 for prefix matches, trigram similarity otherwise
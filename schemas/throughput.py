@@ -2,7 +2,7 @@
 Pydantic schemas for Throughput domain models
 """
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Dict
 from datetime import date, datetime
 
 
@@ -51,7 +51,7 @@ class ThroughputTaskBase(BaseModel):
 
 
 class ThroughputTaskCreate(ThroughputTaskBase):
-    pass
+    task_order: Optional[int] = None  # defaults to the end of the job's stage list
 
 
 class ThroughputTaskRead(ThroughputTaskBase):
@@ -61,6 +61,30 @@ class ThroughputTaskRead(ThroughputTaskBase):
         from_attributes = True
 
 
+# Bulk task update - only the fields that are set on a change are written
+class ThroughputTaskBulkChange(BaseModel):
+    task_id: int
+    task_order: Optional[int] = None
+    status_id: Optional[int] = None
+    stage_id: Optional[int] = None
+
+
+class ThroughputTaskBulkUpdate(BaseModel):
+    tasks: List[ThroughputTaskBulkChange]
+
+
+class ThroughputTaskBulkResult(BaseModel):
+    updated: int
+    task_ids: List[int]
+
+
+# Task move - place a task between neighbours, optionally in another stage
+class ThroughputTaskMove(BaseModel):
+    before_id: Optional[int] = None
+    after_id: Optional[int] = None
+    stage_id: Optional[int] = None
+
+
 # ThroughputStageDate Schemas
 class ThroughputStageDateBase(BaseModel):
     job_id: int
@@ -78,3 +102,64 @@ class ThroughputStageDateRead(ThroughputStageDateBase):
     class Config:
         from_attributes = True
 
+
+# Current stage due date (from the job_stage_due projection)
+class ThroughputDueJob(BaseModel):
+    job_id: int
+    reference: str
+    stage_id: int
+    stage: str
+    due_date: date
+    overdue: bool = False
+
+
+# Throughput Board Schemas
+class ThroughputBoardJob(BaseModel):
+    job_id: int
+    reference: str
+    client_id: int
+    client_name: Optional[str] = None
+    staff_id: int
+    staff_name: Optional[str] = None
+    job_status_id: Optional[int] = None
+    due_date: Optional[date] = None
+    task_count: int = 0
+    tasks_completed: int = 0
+    completion_percentage: float = 0.0
+
+
+class ThroughputBoardStage(ThroughputStageRead):
+    jobs: List[ThroughputBoardJob] = []
+
+
+# Throughput Schedule Schemas
+class ThroughputScheduleRequest(BaseModel):
+    start_date: Optional[date] = None
+    stage_capacities: Dict[int, int] = {}
+    default_capacity: Optional[int] = None
+
+
+class ThroughputScheduleStage(BaseModel):
+    stage_id: int
+    units: int
+    start_date: date
+    finish_date: date
+    due_date: Optional[date] = None
+    late: bool = False
+
+
+class ThroughputScheduleJob(BaseModel):
+    job_id: int
+    reference: Optional[str] = None
+    due_date: Optional[date] = None
+    projected_finish: date
+    slack_days: Optional[int] = None
+    at_risk: bool = False
+    stages: List[ThroughputScheduleStage] = []
+
+
+class ThroughputSchedule(BaseModel):
+    start_date: date
+    job_count: int
+    at_risk_count: int
+    jobs: List[ThroughputScheduleJob]
@@ -0,0 +1,325 @@
+"""
+Search service - ranked search across clients, contacts, projects, jobs and quotes
+
+Each searchable table is a SearchSource: the columns that are matched, the
+columns shown as the result title and subtitle. The query runs on the best
+backend the database offers:
+
+- Postgres: a to_tsvector('simple', ...) expression GIN index per table,
+  queried with prefix tsqueries and ranked with ts_rank. When the pg_trgm
+  extension is available a trigram GIN index on the same text also answers
+  substring matches (emails, part numbers) through ILIKE.
+- SQLite: one FTS5 table (search_fts) holding a row per source row, kept in
+  sync by triggers on the source tables and ranked with bm25.
+- Anything else, or before the indexes exist: ILIKE over the columns.
+
+ensure_search_index() creates the indexes/FTS table (run from the app
+lifespan when SEARCH_AUTO_INDEX is on) and the README lists the same DDL.
+"""
+import re
+from typing import List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import case, func, literal, or_, text
+from sqlalchemy.orm import Session
+
+from config import SEARCH_AUTO_INDEX
+from database import engine
+from models.client import Client, Contact
+from models.job import Job, Project, Quote
+
+
+class SearchSource(NamedTuple):
+    entity: str
+    code: int          # low bits of the FTS5 rowid (rowid = key * 8 + code)
+    model: type
+    key: str
+    title: tuple       # columns joined with spaces for the result title
+    subtitle: Optional[str]
+    fields: tuple      # columns that are searched
+
+
+SOURCES = (
+    SearchSource("client", 1, Client, "client_id", ("name",), "suburb", ("name",)),
+    SearchSource("contact", 2, Contact, "contact_id", ("first_name", "surname"), "email",
+                 ("first_name", "surname", "email")),
+    SearchSource("project", 3, Project, "project_id", ("name",), "suburb", ("name",)),
+    SearchSource("job", 4, Job, "job_id", ("reference",), "job_address", ("reference", "po", "job_address")),
+    SearchSource("quote", 5, Quote, "quote_id", ("quote_number",), None, ("quote_number",)),
+)
+ENTITIES = tuple(source.entity for source in SOURCES)
+
+FTS_TABLE = "search_fts"
+
+# Characters with meaning in tsquery syntax; stripped from user input
+_TSQUERY_SPECIAL = re.compile(r"[&|!():*<>'\\]")
+
+_backend: Optional[str] = None
+
+
+def _concat(columns: Sequence[str], prefix: str = "") -> str:
+    """SQL text joining columns with spaces (NULLs as empty); immutable, so usable in index expressions"""
+    return " || ' ' || ".join(f"coalesce({prefix}{column}, '')" for column in columns)
+
+
+def _tsvector(source: SearchSource) -> str:
+    return f"to_tsvector('simple'::regconfig, {_concat(source.fields)})"
+
+
+def _table(db_or_engine, source: SearchSource) -> str:
+    """Table name as the database sees it (SQLite has no schemas here)"""
+    table = source.model.__table__
+    return table.name if db_or_engine.dialect.name == "sqlite" else table.fullname
+
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# ============================================================================
+# INDEX SETUP
+# ============================================================================
+
+def _postgres_ddl(connection, with_trigram: bool) -> List[str]:
+    statements = []
+    for source in SOURCES:
+        table = _table(connection, source)
+        statements.append(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_search_{source.entity}_fts "
+            f"ON {table} USING gin ({_tsvector(source)})"
+        )
+        if with_trigram:
+            statements.append(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_search_{source.entity}_trgm "
+                f"ON {table} USING gin (({_concat(source.fields)}) gin_trgm_ops)"
+            )
+    return statements
+
+
+def _fts_row_sql(source: SearchSource, prefix: str) -> tuple:
+    """(rowid, title, subtitle, body) SQL expressions for one source row"""
+    subtitle = f"{prefix}{source.subtitle}" if source.subtitle else "NULL"
+    return (
+        f"{prefix}{source.key} * 8 + {source.code}",
+        _concat(source.title, prefix) if len(source.title) > 1 else f"{prefix}{source.title[0]}",
+        subtitle,
+        _concat(source.fields, prefix)
+    )
+
+
+def _sqlite_ddl(connection) -> List[str]:
+    statements = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"title, subtitle UNINDEXED, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    ]
+    for source in SOURCES:
+        table = _table(connection, source)
+        name = f"{FTS_TABLE}_{source.model.__table__.name}"
+        new_row = ", ".join(_fts_row_sql(source, "new."))
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {name}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, title, subtitle, body) VALUES ({new_row}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_au AFTER UPDATE ON {table} BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = old.{source.key} * 8 + {source.code}; "
+            f"INSERT INTO {FTS_TABLE}(rowid, title, subtitle, body) VALUES ({new_row}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {name}_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {FTS_TABLE} WHERE rowid = old.{source.key} * 8 + {source.code}; END"
+        ]
+    return statements
+
+
+def rebuild_search_index(connection) -> int:
+    """Refill the SQLite FTS table from the source tables; returns the row count"""
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    total = 0
+    for source in SOURCES:
+        rowid, title, subtitle, body = _fts_row_sql(source, "")
+        result = connection.execute(text(
+            f"INSERT INTO {FTS_TABLE}(rowid, title, subtitle, body) "
+            f"SELECT {rowid}, {title}, {subtitle}, {body} FROM {_table(connection, source)}"
+        ))
+        total += result.rowcount
+    return total
+
+
+def ensure_search_index() -> str:
+    """
+    Startup hook - create the search indexes for this database if missing
+
+    Postgres indexes are built CONCURRENTLY so writes carry on meanwhile; a
+    missing pg_trgm extension only drops the substring index. On SQLite the
+    FTS table is filled the first time it is created. Returns the backend.
+    """
+    global _backend
+    if not SEARCH_AUTO_INDEX:
+        _backend = None
+        return _detect_backend(engine)
+
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            try:
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            except Exception as e:
+                error = getattr(e, "orig", e)
+                print(f"⚠ Warning: pg_trgm unavailable, search will not match substrings: {str(error).strip()}")
+            with_trigram = _has_trigram(connection)
+            for statement in _postgres_ddl(connection, with_trigram):
+                connection.execute(text(statement))
+    elif dialect == "sqlite":
+        with engine.begin() as connection:
+            existed = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+            ).first() is not None
+            for statement in _sqlite_ddl(connection):
+                connection.execute(text(statement))
+            if not existed:
+                rebuild_search_index(connection)
+
+    _backend = None
+    return _detect_backend(engine)
+
+
+def _has_trigram(connection) -> bool:
+    return connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+
+
+def _detect_backend(bind) -> str:
+    """Search backend for this database: postgres_trgm, postgres, fts5 or like (cached)"""
+    global _backend
+    if _backend is None:
+        dialect = bind.dialect.name
+        if dialect == "postgresql":
+            with engine.connect() as connection:
+                _backend = "postgres_trgm" if _has_trigram(connection) else "postgres"
+        elif dialect == "sqlite":
+            with engine.connect() as connection:
+                exists = connection.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}
+                ).first()
+            _backend = "fts5" if exists else "like"
+        else:
+            _backend = "like"
+    return _backend
+
+
+# ============================================================================
+# QUERIES
+# ============================================================================
+
+def _title_boost(title_sql: str) -> str:
+    """Rank bonus for results whose title equals or starts with the query"""
+    return (
+        f"CASE WHEN lower({title_sql}) = :exact THEN 2.0 "
+        f"WHEN lower({title_sql}) LIKE :prefix ESCAPE '\\' THEN 1.0 ELSE 0.0 END"
+    )
+
+
+def _search_postgres(db: Session, query: str, sources: list, limit: int, with_trigram: bool) -> list:
+    tsquery = " & ".join(f"{word}:*" for word in _TSQUERY_SPECIAL.sub(" ", query).split())
+    if not tsquery:
+        return []
+
+    branches = []
+    for source in sources:
+        title = _concat(source.title) if len(source.title) > 1 else source.title[0]
+        document = _tsvector(source)
+        match = f"{document} @@ to_tsquery('simple', :tsquery)"
+        rank = f"ts_rank({document}, to_tsquery('simple', :tsquery)) + {_title_boost(title)}"
+        if with_trigram:
+            haystack = _concat(source.fields)
+            match = f"({match} OR ({haystack}) ILIKE :like ESCAPE '\\')"
+            rank += f" + similarity({haystack}, :query)"
+        branches.append(
+            f"(SELECT '{source.entity}' AS entity, {source.key} AS id, {title} AS title, "
+            f"{source.subtitle or 'NULL'} AS subtitle, {rank} AS rank "
+            f"FROM {_table(db.get_bind(), source)} WHERE {match} ORDER BY rank DESC LIMIT :limit)"
+        )
+    sql = " UNION ALL ".join(branches) + " ORDER BY rank DESC LIMIT :limit"
+    return db.execute(text(sql), {
+        "tsquery": tsquery,
+        "query": query,
+        "like": _like_pattern(query),
+        "exact": query.lower(),
+        "prefix": _like_pattern(query.lower())[1:],
+        "limit": limit
+    }).mappings().all()
+
+
+def _search_fts5(db: Session, query: str, sources: list, limit: int) -> list:
+    match = " ".join('"' + word.replace('"', '""') + '"*' for word in query.split())
+    if not match:
+        return []
+    codes = {source.code: source.entity for source in sources}
+    # bm25 (title weighted 10x) picks the candidates; the title bonus only
+    # reorders those, so it isn't evaluated for every match of a common word
+    rows = db.execute(text(
+        f"SELECT rowid, title, subtitle, score + {_title_boost('title')} AS rank FROM ("
+        f"SELECT rowid, title, subtitle, -bm25({FTS_TABLE}, 10.0, 0.0, 1.0) AS score "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+        f"AND rowid % 8 IN ({', '.join(str(code) for code in codes)}) "
+        f"ORDER BY score DESC LIMIT :candidates"
+        f") ORDER BY rank DESC LIMIT :limit"
+    ), {
+        "match": match,
+        "exact": query.lower(),
+        "prefix": _like_pattern(query.lower())[1:],
+        "candidates": limit * 5,
+        "limit": limit
+    }).all()
+    return [
+        {"entity": codes[row.rowid % 8], "id": row.rowid // 8, "title": row.title,
+         "subtitle": row.subtitle, "rank": row.rank}
+        for row in rows
+    ]
+
+
+def _search_like(db: Session, query: str, sources: list, limit: int) -> list:
+    pattern = _like_pattern(query)
+    results = []
+    for source in sources:
+        model = source.model
+        title = getattr(model, source.title[0])
+        for column in source.title[1:]:
+            title = title + " " + func.coalesce(getattr(model, column), "")
+        subtitle = getattr(model, source.subtitle) if source.subtitle else literal(None)
+        rank = case(
+            (func.lower(title) == query.lower(), 2.0),
+            (func.lower(title).like(_like_pattern(query.lower())[1:], escape="\\"), 1.0),
+            else_=0.0
+        )
+        rows = (
+            db.query(getattr(model, source.key), title, subtitle, rank)
+            .filter(or_(*[getattr(model, field).ilike(pattern, escape="\\") for field in source.fields]))
+            .order_by(rank.desc())
+            .limit(limit)
+            .all()
+        )
+        results += [
+            {"entity": source.entity, "id": row[0], "title": row[1], "subtitle": row[2], "rank": row[3]}
+            for row in rows
+        ]
+    results.sort(key=lambda result: result["rank"], reverse=True)
+    return results[:limit]
+
+
+def search(db: Session, query: str, entities: Optional[Sequence[str]] = None, limit: int = 20) -> list:
+    """
+    Ranked matches for `query` as [{entity, id, title, subtitle, rank}], best first
+
+    Every word of the query must match (as a word prefix on the full-text
+    backends). `entities` limits the search to some of ENTITIES.
+    """
+    query = query.strip()
+    sources = [source for source in SOURCES if not entities or source.entity in entities]
+    if not query or not sources:
+        return []
+
+    backend = _detect_backend(db.get_bind())
+    if backend in ("postgres", "postgres_trgm"):
+        rows = _search_postgres(db, query, sources, limit, backend == "postgres_trgm")
+    elif backend == "fts5":
+        rows = _search_fts5(db, query, sources, limit)
+    else:
+        rows = _search_like(db, query, sources, limit)
+    return [{**row, "rank": round(float(row["rank"]), 4)} for row in rows]
@@ -0,0 +1,60 @@
+"""
+Production server entrypoint
+Runs the API across several uvicorn worker processes (no auto-reload)
+
+Usage:
+    python serve.py [--workers N] [--host HOST] [--port PORT]
+
+Each worker has its own database pool. Set DB_CONNECTION_BUDGET to the total
+number of connections the database allows for this app and the per-worker
+pool size is derived from it (see config.py).
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Outcry Projects API in production mode")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--host", default=None, help="bind host (default: HOST)")
+    parser.add_argument("--port", type=int, default=None, help="bind port (default: PORT)")
+    args = parser.parse_args()
+
+    # Workers re-read config.py, so pass the worker count down through the
+    # environment before it is loaded - the pool split depends on it
+    if args.workers:
+        os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    os.environ.setdefault("DB_POOL_PREWARM", "true")
+
+    import uvicorn
+    from config import (
+        APP_NAME,
+        APP_VERSION,
+        HOST,
+        PORT,
+        WEB_CONCURRENCY,
+        DB_POOL_SIZE,
+        DB_MAX_OVERFLOW,
+        GRACEFUL_SHUTDOWN_TIMEOUT
+    )
+
+    host = args.host or HOST
+    port = args.port or PORT
+
+    print(f"Starting {APP_NAME} v{APP_VERSION} (production)")
+    print(f"Server running on http://{host}:{port} with {WEB_CONCURRENCY} workers")
+    print(f"Database pool per worker: {DB_POOL_SIZE} (+{DB_MAX_OVERFLOW} overflow)")
+
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=WEB_CONCURRENCY,
+        reload=False,
+        proxy_headers=True,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Storage Service Module
+Pluggable storage backends for uploaded files (Dropbox or local disk)
+"""
+import os
+import stat
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from starlette.responses import FileResponse, Response
+
+from config import (
+    STORAGE_BACKEND,
+    LOCAL_STORAGE_PATH,
+    LOCAL_STORAGE_URL,
+    LOCAL_STORAGE_ACCEL_REDIRECT
+)
+
+
+# Entity types files can be uploaded for; each is a top-level folder in storage
+ENTITY_TYPES = ("job", "booking", "general")
+
+
+def check_entity_type(entity_type: str) -> str:
+    """Return entity_type if it is one of ENTITY_TYPES, otherwise raise ValueError"""
+    if entity_type not in ENTITY_TYPES:
+        raise ValueError(f"entity_type must be one of: {', '.join(ENTITY_TYPES)}")
+    return entity_type
+
+
+class StorageBackend(ABC):
+    """
+    Base class for file storage backends
+
+    Results use the same keys as the Attachment model ('dropbox_path' and
+    'dropbox_shared_url') so upload handlers can store them unchanged.
+    """
+    name = "base"
+
+    @abstractmethod
+    def upload_multiple_files(
+        self,
+        files: List[Dict[str, bytes]],
+        entity_id: int,
+        entity_type: str = "general"
+    ) -> List[Dict[str, str]]:
+        """Store files under entity_type/entity_id and return their paths and URLs"""
+
+    @abstractmethod
+    def delete_file(self, path: str) -> bool:
+        """Delete a stored file; returns False if it could not be deleted"""
+
+    def local_path(self, path: str) -> Optional[str]:
+        """Return the on-disk path for a stored file, or None if not held locally"""
+        return None
+
+
+class DropboxStorageBackend(StorageBackend):
+    """Stores files in Dropbox via dropbox_service"""
+    name = "dropbox"
+
+    def upload_multiple_files(self, files, entity_id, entity_type="general"):
+        from dropbox_service import upload_multiple_files
+        return upload_multiple_files(files, entity_id, check_entity_type(entity_type))
+
+    def delete_file(self, path):
+        from dropbox_service import delete_file
+        return delete_file(path)
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores files on the local filesystem under LOCAL_STORAGE_PATH"""
+    name = "local"
+
+    def __init__(self, root: str = LOCAL_STORAGE_PATH, url_prefix: str = LOCAL_STORAGE_URL):
+        self.root = os.path.abspath(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    def upload_multiple_files(self, files, entity_id, entity_type="general"):
+        results = []
+        check_entity_type(entity_type)
+        base_path = f"/{entity_type}/{entity_id}"
+        target_dir = self.local_path(base_path)
+        if target_dir is None:
+            raise ValueError(f"Upload folder {base_path} is outside the storage root")
+        os.makedirs(target_dir, exist_ok=True)
+
+        for file_info in files:
+            filename = file_info.get("filename", "unnamed_file")
+            content = file_info.get("content")
+
+            if not content:
+                continue
+
+            # Microsecond timestamp so uploads in the same second don't overwrite each other
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            name, ext = os.path.splitext(os.path.basename(filename))
+            unique_filename = f"{name}_{timestamp}{ext}"
+            target = os.path.join(target_dir, unique_filename)
+
+            try:
+                # Write to a temp file first so readers never see a partial upload
+                tmp_target = f"{target}.part"
+                with open(tmp_target, "wb") as fh:
+                    fh.write(content)
+                os.replace(tmp_target, target)
+
+                results.append({
+                    "dropbox_path": f"{base_path}/{unique_filename}",
+                    "dropbox_shared_url": f"{self.url_prefix}{base_path}/{unique_filename}",
+                    "filename": filename
+                })
+            except OSError as e:
+                print(f"Error writing file {filename} to local storage: {str(e)}")
+                continue
+
+        return results
+
+    def delete_file(self, path):
+        full_path = self.local_path(path)
+        if full_path is None:
+            return False
+        try:
+            os.remove(full_path)
+            return True
+        except OSError as e:
+            print(f"Error deleting file {path} from local storage: {str(e)}")
+            return False
+
+    def local_path(self, path):
+        # Resolve inside the storage root only - rejects '..' traversal
+        full_path = os.path.abspath(os.path.join(self.root, path.lstrip("/")))
+        if os.path.commonpath([self.root, full_path]) != self.root:
+            return None
+        return full_path
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    FileResponse that hands the file descriptor to the server when it supports
+    the ASGI 'http.response.zerocopy' extension (sendfile), and falls back to
+    chunked reads otherwise.
+    """
+
+    async def __call__(self, scope, receive, send):
+        extensions = scope.get("extensions") or {}
+        if (
+            "http.response.zerocopy" not in extensions
+            or self.send_header_only
+            or self.stat_result is None
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        with open(self.path, "rb") as fh:
+            await send({
+                "type": "http.response.zerocopy",
+                "file": fh.fileno(),
+                "count": self.stat_result.st_size,
+            })
+        if self.background is not None:
+            await self.background()
+
+
+def serve_local_file(full_path: str, relative_path: str, method: str = "GET") -> Response:
+    """
+    Build a response for a locally stored file
+
+    Uses X-Accel-Redirect when a reverse proxy location is configured so the
+    proxy serves the bytes with sendfile; otherwise streams with zero-copy
+    where the server supports it.
+    """
+    stat_result = os.stat(full_path)
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise FileNotFoundError(full_path)
+
+    filename = os.path.basename(full_path)
+    if LOCAL_STORAGE_ACCEL_REDIRECT:
+        redirect = f"{LOCAL_STORAGE_ACCEL_REDIRECT.rstrip('/')}/{relative_path.lstrip('/')}"
+        return Response(
+            headers={
+                "X-Accel-Redirect": redirect,
+                "Content-Disposition": f'inline; filename="{filename}"'
+            }
+        )
+
+    return ZeroCopyFileResponse(
+        full_path,
+        filename=filename,
+        stat_result=stat_result,
+        method=method,
+        content_disposition_type="inline"
+    )
+
+
+# Global storage backend instance
+_storage_backend: Optional[StorageBackend] = None
+
+
+def get_storage_backend() -> StorageBackend:
+    """Get the configured storage backend, creating it on first use"""
+    global _storage_backend
+    if _storage_backend is None:
+        if STORAGE_BACKEND == "dropbox":
+            _storage_backend = DropboxStorageBackend()
+        else:
+            _storage_backend = LocalStorageBackend()
+    return _storage_backend
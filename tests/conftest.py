@@ -0,0 +1,68 @@
+"""
+Shared fixtures: the app against a throwaway SQLite database
+
+DATABASE_URL has to be set before config.py is imported, so it is set here at
+module level, ahead of any app import.
+"""
+import os
+import sys
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="outcry-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'outcry.db')}"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+from models import Base, Client, Contact, JobStatus, Project, Staff, ThroughputStage, ThroughputStatus
+
+
+@pytest.fixture()
+def db():
+    """A freshly created schema and a session on it, with the per-worker caches emptied"""
+    import job_detail_service
+    import quote_pdf_service
+
+    database.create_tables()
+    with database.engine.begin() as connection:
+        # The job/quote/booking foreign keys form a cycle, so clear without checking them
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        for table in Base.metadata.sorted_tables:
+            connection.execute(table.delete())
+        connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+    job_detail_service.clear_cache()
+    quote_pdf_service.clear_cache()
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture()
+def seeded(db):
+    """The reference rows a job needs: staff, client, contact, project, statuses and stages"""
+    db.add_all([
+        Staff(staff_id=1, first_name="Alex", surname="Smith"),
+        Client(client_id=1, name="Acme"),
+        Project(project_id=1, name="Harbour"),
+        JobStatus(job_status_id=1, job_status="Quoted"),
+        ThroughputStatus(status_id=1, status="To do"),
+        ThroughputStage(stage_id=1, stage="Print", stage_order=1),
+        ThroughputStage(stage_id=2, stage="Cut", stage_order=2),
+    ])
+    db.commit()
+    db.add(Contact(contact_id=1, client_id=1, first_name="Sam", surname="Lee"))
+    db.commit()
+    return db
+
+
+@pytest.fixture()
+def client(db):
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,44 @@
+"""find_or_create_address deduplication and transactions"""
+from delivery_service import find_or_create_address
+from models import Address
+
+STREET = {"street_number": "12", "street_name": "Harbour Street", "suburb": "Sydney", "postcode": "2000"}
+
+
+def test_address_is_rolled_back_with_the_callers_transaction(db):
+    address, created = find_or_create_address(db, {**STREET, "google_place_id": "place-a"})
+    assert created and address.address_id is not None
+
+    db.rollback()
+
+    assert db.query(Address).count() == 0
+
+
+def test_same_text_matches_by_key_when_place_id_is_missing_or_equal(db):
+    first, _ = find_or_create_address(db, {**STREET, "google_place_id": "place-a"})
+    db.commit()
+
+    assert find_or_create_address(db, dict(STREET)) == (first, False)
+    assert find_or_create_address(db, {**STREET, "google_place_id": "place-a"}) == (first, False)
+
+
+def test_same_text_with_another_place_id_is_a_new_address(db):
+    first, _ = find_or_create_address(db, {**STREET, "google_place_id": "place-a"})
+    db.commit()
+
+    second, created = find_or_create_address(db, {**STREET, "google_place_id": "place-b"})
+    db.commit()
+
+    assert created and second.address_id != first.address_id
+    assert second.google_place_id == "place-b" and second.address_key is None
+    assert find_or_create_address(db, {"google_place_id": "place-b"}) == (second, False)
+
+
+def test_keyless_row_gains_the_place_id(db):
+    first, _ = find_or_create_address(db, dict(STREET))
+    db.commit()
+
+    address, created = find_or_create_address(db, {**STREET, "google_place_id": "place-a"})
+
+    assert (address, created) == (first, False)
+    assert address.google_place_id == "place-a"
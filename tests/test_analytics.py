@@ -0,0 +1,30 @@
+"""Flow metric caching"""
+from datetime import date, timedelta
+
+import analytics_service
+from models import Job, JobStatusHistory
+
+
+def test_past_period_expires(seeded, monkeypatch):
+    db = seeded
+    analytics_service.clear_cache()
+    entered = date.today() - timedelta(days=30)
+    db.add(Job(job_id=1, reference="Open", project_id=1, client_id=1, contact_id=1, staff_id=1))
+    db.add(JobStatusHistory(job_id=1, job_status_id=1, date=entered))
+    db.commit()
+    period = (entered - timedelta(days=1), entered + timedelta(days=1))
+
+    clock = [1000.0]
+    monkeypatch.setattr(analytics_service.time, "monotonic", lambda: clock[0])
+    first = analytics_service.status_times(db, *period)
+    assert first[0]["still_open"] == 1
+
+    # The open status keeps ageing; a cached past period must not hide that forever
+    monkeypatch.setattr(analytics_service, "date", type("FakeDate", (date,), {
+        "today": classmethod(lambda cls: date.today() + timedelta(days=10))
+    }))
+    assert analytics_service.status_times(db, *period) == first
+
+    clock[0] += analytics_service.ANALYTICS_PAST_CACHE_TTL + 1
+    later = analytics_service.status_times(db, *period)
+    assert later[0]["max_days"] == first[0]["max_days"] + 10
@@ -0,0 +1,20 @@
+"""GET /api/events subscriptions"""
+import asyncio
+
+from events_service import broker
+from routers.events import stream_events
+
+
+def test_stream_subscribes_only_while_running():
+    async def scenario():
+        response = await stream_events(request=None, types=None)
+        assert broker.subscriber_count == 0  # nothing held before the body is sent
+
+        stream = response.body_iterator
+        assert await stream.__anext__() == ": connected\n\n"
+        assert broker.subscriber_count == 1
+
+        await stream.aclose()
+        assert broker.subscriber_count == 0
+
+    asyncio.run(scenario())
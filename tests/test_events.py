@@ -0,0 +1,35 @@
+"""Change event delivery to other workers"""
+import json
+
+from events_service import NOTIFY_MAX_BYTES, notify_payloads
+
+
+def _event(**data):
+    return {"type": "task.bulk_updated", "data": data, "at": "2024-07-01T09:00:00", "origin": "w1"}
+
+
+def test_small_event_is_one_payload():
+    payloads = notify_payloads(_event(tasks=[{"task_id": 1, "task_order": 1024}]))
+
+    assert len(payloads) == 1
+    assert json.loads(payloads[0])["data"]["tasks"] == [{"task_id": 1, "task_order": 1024}]
+
+
+def test_large_event_is_split_under_the_notify_limit():
+    tasks = [{"task_id": n, "task_order": n * 1024, "status_id": 2, "stage_id": 3} for n in range(2000)]
+
+    payloads = notify_payloads(_event(tasks=tasks))
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= NOTIFY_MAX_BYTES for payload in payloads)
+    parts = [json.loads(payload) for payload in payloads]
+    assert {part["type"] for part in parts} == {"task.bulk_updated"}
+    assert [task for part in parts for task in part["data"]["tasks"]] == tasks
+
+
+def test_oversized_scalar_event_keeps_its_ids():
+    payloads = notify_payloads(_event(task_id=7, notes="x" * 10000))
+
+    assert len(payloads) == 1
+    assert json.loads(payloads[0])["data"] == {"task_id": 7, "truncated": True}
+
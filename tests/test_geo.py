@@ -0,0 +1,62 @@
+"""GridIndex radius queries against a brute-force haversine scan"""
+import random
+
+import pytest
+
+from geo import GridIndex, haversine_km
+
+
+def _brute_force(points, lat, lng, radius_km):
+    return sorted(
+        key for key, (p_lat, p_lng) in points.items()
+        if haversine_km(lat, lng, p_lat, p_lng) <= radius_km
+    )
+
+
+@pytest.mark.parametrize("cell_km", [0.5, 1.0, 5.0])
+def test_within_matches_brute_force(cell_km):
+    rng = random.Random(cell_km)
+    index = GridIndex(cell_km)
+    points = {}
+    for key in range(2000):
+        points[key] = (rng.uniform(-34.5, -33.0), rng.uniform(150.5, 151.5))
+        index.add(key, *points[key])
+
+    for _ in range(300):
+        lat, lng = points[rng.randrange(len(points))]
+        radius_km = rng.uniform(0.5, 50.0)
+        found = index.within(lat, lng, radius_km)
+        assert sorted(key for key, _ in found) == _brute_force(points, lat, lng, radius_km)
+
+
+def test_points_just_inside_the_radius_due_north_and_south():
+    index = GridIndex(1.0)
+    lat, lng = -33.8688, 151.2093
+    radius_km = 14.2042
+    for key, direction in enumerate((1, -1)):
+        # Step out along the meridian until the point is as far as it can be and still inside
+        step = radius_km / 111.0 * direction
+        while haversine_km(lat, lng, lat + step, lng) > radius_km:
+            step *= 0.99999
+        index.add(key, lat + step, lng)
+
+    assert sorted(key for key, _ in index.within(lat, lng, radius_km)) == [0, 1]
+
+
+def test_within_near_the_pole():
+    index = GridIndex(1.0)
+    index.add("across", 89.95, 120.0)
+
+    assert [key for key, _ in index.within(89.95, -50.0, 15.0)] == ["across"]
+
+
+def test_large_radius_near_the_pole_only_walks_occupied_cells():
+    index = GridIndex(0.5)
+    index.add("pole", 89.0, 10.0)
+    index.add("sydney", -33.8688, 151.2093)
+
+    # The bounding box spans ~160 million cells; only the two occupied ones are checked
+    found = index.within(88.0, -170.0, 500.0)
+
+    assert [key for key, _ in found] == ["pole"]
+    assert found[0][1] == pytest.approx(haversine_km(88.0, -170.0, 89.0, 10.0))
@@ -0,0 +1,47 @@
+"""GET /api/jobs/{id}/full"""
+
+
+JOB = {
+    "reference": "Harbour fit-out",
+    "project_id": 1,
+    "client_id": 1,
+    "contact_id": 1,
+    "staff_id": 1,
+    "job_status_id": 1,
+    "date_created": "2024-07-01"
+}
+
+
+def _create_job(client):
+    response = client.post("/api/jobs", json=JOB)
+    assert response.status_code == 201, response.text
+    return response.json()["job_id"]
+
+
+def test_full_job_includes_status_history(seeded, client):
+    job_id = _create_job(client)
+
+    response = client.get(f"/api/jobs/{job_id}/full")
+
+    assert response.status_code == 200, response.text
+    history = response.json()["status_history"]
+    assert [(row["job_status_id"], row["date"]) for row in history] == [(1, "2024-07-01")]
+
+
+def test_full_job_etag_round_trip(seeded, client):
+    job_id = _create_job(client)
+    etag = client.get(f"/api/jobs/{job_id}/full").headers["etag"]
+
+    assert client.get(f"/api/jobs/{job_id}/full", headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.put(f"/api/jobs/{job_id}", json={**JOB, "reference": "Renamed"})
+    assert response.status_code == 200, response.text
+    response = client.get(f"/api/jobs/{job_id}/full", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["reference"] == "Renamed"
+
+
+def test_missing_job_is_404_even_with_matching_etag(seeded, client):
+    assert client.get("/api/jobs/999/full").status_code == 404
+    response = client.get("/api/jobs/999/full", headers={"If-None-Match": '"job-999-0"'})
+    assert response.status_code == 404
@@ -0,0 +1,48 @@
+"""GET /api/jobs fields= / include="""
+from models import Item, Job, Product, ProductCategory, Quote
+
+
+def _seed_job(db):
+    db.add(Job(job_id=1, reference="Harbour", project_id=1, client_id=1, contact_id=1, staff_id=1, po="PO-1"))
+    db.commit()
+    db.add_all([
+        Quote(quote_id=1, quote_number="1-001", job_id=1),
+        ProductCategory(product_category_id=1, name="Signs"),
+        Product(product_id=1, name="Panel", product_category_id=1)
+    ])
+    db.commit()
+    db.add(Item(quote_id=1, product_id=1, quantity=2))
+    db.commit()
+
+
+def test_default_list_returns_every_column(seeded, client):
+    _seed_job(seeded)
+
+    jobs = client.get("/api/jobs").json()
+
+    assert jobs[0]["reference"] == "Harbour"
+    assert jobs[0]["po"] == "PO-1"
+    assert "quotes" not in jobs[0]
+
+
+def test_fields_and_nested_include(seeded, client):
+    _seed_job(seeded)
+
+    response = client.get("/api/jobs", params={"fields": "reference", "include": "quotes.items"})
+
+    assert response.status_code == 200, response.text
+    job = response.json()[0]
+    assert set(job) == {"job_id", "reference", "quotes"}
+    assert job["quotes"][0]["quote_number"] == "1-001"
+    assert [item["quantity"] for item in job["quotes"][0]["items"]] == [2]
+
+
+def test_fields_combine_with_filters(seeded, client):
+    _seed_job(seeded)
+
+    assert client.get("/api/jobs", params={"fields": "reference", "staff_id": 2}).json() == []
+
+
+def test_unknown_include_or_field_is_400(seeded, client):
+    assert client.get("/api/jobs", params={"include": "bogus"}).status_code == 400
+    assert client.get("/api/jobs", params={"fields": "bogus"}).status_code == 400
@@ -0,0 +1,57 @@
+"""Quote PDF templates and pdf_writer markup"""
+import pdf_writer
+
+HOSTILE = "ok\n# X\n\f\n---\n## Y"
+
+
+def _context(text):
+    return {
+        "company": "Outcry",
+        "quote": {
+            "quote_number": "1-001",
+            "date_created": "01/07/2024",
+            "cost_excl_gst": 100.0,
+            "cost_incl_gst": 110.0,
+            "gst": 10.0,
+            "items": [{
+                "product": text,
+                "reference": text,
+                "notes": text,
+                "quantity": 1,
+                "length": None,
+                "height": None,
+                "measure": "",
+                "cost_excl_gst": 100.0,
+                "cost_incl_gst": 110.0,
+                "options": [text, "Colour: Red"]
+            }]
+        },
+        "job": {"job_id": 1, "reference": text, "po": text, "site": text},
+        "client": {"name": text},
+        "contact": {"first_name": text, "surname": text, "email": text, "phone": text},
+        "project": {"name": text}
+    }
+
+
+def _kinds(text):
+    rendered = pdf_writer.environment().get_template("quote.j2").render(**_context(text))
+    return [kind for kind, _ in pdf_writer._lines(rendered)]
+
+
+def test_free_text_cannot_add_markup():
+    plain = _kinds("plain")
+    hostile = _kinds(HOSTILE)
+
+    for kind in ("title", "heading", "rule", "page"):
+        assert hostile.count(kind) == plain.count(kind), kind
+
+
+def test_block_indents_every_line():
+    assert pdf_writer._block("ok\n# X\n\f\n---") == "    ok\n    # X\n    \n    ---"
+    assert [kind for kind, _ in pdf_writer._lines(pdf_writer._block(HOSTILE))] == ["body", "body", "blank", "body", "body"]
+
+
+def test_inline_keeps_text_on_one_line():
+    assert pdf_writer._inline(HOSTILE) == "ok # X --- ## Y"
+    assert pdf_writer._inline("# Title") == " # Title"
+    assert pdf_writer._inline(None) == ""
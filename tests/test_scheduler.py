@@ -0,0 +1,32 @@
+"""Production scheduler calendars"""
+from datetime import date
+
+import pytest
+
+from scheduler import StageCalendar, WorkingCalendar, schedule_jobs
+
+
+def test_working_calendar_skips_weekends():
+    calendar = WorkingCalendar(date(2024, 7, 5), [0, 1, 2, 3, 4])  # a Friday
+
+    assert [calendar.date_for(offset) for offset in range(3)] == [
+        date(2024, 7, 5), date(2024, 7, 8), date(2024, 7, 9)
+    ]
+
+
+@pytest.mark.parametrize("working_days", [[], [7, -1]])
+def test_working_calendar_needs_a_working_weekday(working_days):
+    with pytest.raises(ValueError):
+        WorkingCalendar(date(2024, 7, 5), working_days)
+
+
+def test_stage_calendar_needs_capacity():
+    with pytest.raises(ValueError):
+        StageCalendar(0)
+
+
+def test_schedule_without_working_days_fails_fast():
+    jobs = [{"job_id": 1, "reference": "A", "stages": [{"stage_id": 1, "units": 3, "due_date": None}]}]
+
+    with pytest.raises(ValueError):
+        schedule_jobs(jobs, date(2024, 7, 5), {}, 5, working_days=[])
@@ -0,0 +1,47 @@
+"""Local storage backend and POST /api/upload"""
+import os
+
+import pytest
+
+from storage_service import LocalStorageBackend
+
+
+def test_local_upload_stays_inside_root(tmp_path):
+    backend = LocalStorageBackend(root=str(tmp_path / "uploads"), url_prefix="/api/files")
+
+    results = backend.upload_multiple_files([{"filename": "a.txt", "content": b"x"}], 7, "job")
+
+    assert results[0]["dropbox_path"].startswith("/job/7/a_")
+    assert os.path.isfile(backend.local_path(results[0]["dropbox_path"]))
+
+
+@pytest.mark.parametrize("entity_type", ["../../etc", "job/../..", "/tmp", "other"])
+def test_local_upload_rejects_unknown_entity_type(tmp_path, entity_type):
+    backend = LocalStorageBackend(root=str(tmp_path / "uploads"), url_prefix="/api/files")
+
+    with pytest.raises(ValueError):
+        backend.upload_multiple_files([{"filename": "a.txt", "content": b"x"}], 7, entity_type)
+
+    assert os.listdir(tmp_path) == ["uploads"]
+    assert os.listdir(tmp_path / "uploads") == []
+
+
+def test_upload_endpoint_rejects_unknown_entity_type(db, client):
+    response = client.post(
+        "/api/upload",
+        data={"entity_id": "1", "entity_type": "../../etc"},
+        files={"files": ("a.txt", b"x", "text/plain")}
+    )
+
+    assert response.status_code == 400
+
+
+def test_backend_missing_a_method_fails_when_created():
+    from storage_service import StorageBackend
+
+    class UploadOnly(StorageBackend):
+        def upload_multiple_files(self, files, entity_id, entity_type="general"):
+            return []
+
+    with pytest.raises(TypeError):
+        UploadOnly()
@@ -0,0 +1,9 @@
+"""PATCH /api/throughput/tasks:bulk"""
+from routers.throughput import MAX_BULK_TASKS
+
+
+def test_bulk_update_size_is_capped(db, client):
+    changes = [{"task_id": n, "task_order": n} for n in range(1, MAX_BULK_TASKS + 2)]
+    response = client.patch("/api/throughput/tasks:bulk", json={"tasks": changes})
+
+    assert response.status_code == 400
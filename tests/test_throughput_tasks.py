@@ -0,0 +1,54 @@
+"""POST /api/throughput/tasks ordering"""
+from ordering import ORDER_GAP
+
+
+def _create(client, **fields):
+    task = {"task_name": "Print", "job_number": 1, "stage_id": 1, "status_id": 1, **fields}
+    response = client.post("/api/throughput/tasks", json=task)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_new_tasks_are_appended_with_gaps(seeded, client):
+    first = _create(client)
+    second = _create(client)
+    other_stage = _create(client, stage_id=2)
+    other_job = _create(client, job_number=2)
+
+    assert first["task_order"] == ORDER_GAP
+    assert second["task_order"] == 2 * ORDER_GAP
+    assert other_stage["task_order"] == ORDER_GAP
+    assert other_job["task_order"] == ORDER_GAP
+
+
+def test_explicit_task_order_is_kept(seeded, client):
+    assert _create(client, task_order=5)["task_order"] == 5
+    assert _create(client)["task_order"] == 5 + ORDER_GAP
+
+
+def test_new_task_can_be_moved_between_neighbours(seeded, client):
+    first, second, third = _create(client), _create(client), _create(client)
+
+    response = client.post(f"/api/throughput/tasks/{third['task_id']}/move", json={"after_id": first["task_id"]})
+
+    assert response.status_code == 200, response.text
+    assert first["task_order"] < response.json()["task_order"] < second["task_order"]
+
+
+def test_background_rebalance_moves_the_job_version(seeded, client):
+    from models import Job, ThroughputTask
+    from ordering import _rebalance_job
+
+    seeded.add(Job(job_id=1, reference="A", project_id=1, client_id=1, contact_id=1, staff_id=1))
+    seeded.commit()
+    tasks = [_create(client, task_order=order) for order in (1, 2, 3)]
+    before = client.get("/api/jobs/1/full")
+    assert [task["task_order"] for task in before.json()["tasks"]] == [1, 2, 3]
+
+    _rebalance_job(ThroughputTask.task_id, ThroughputTask.task_order, (ThroughputTask.job_number == 1,))
+
+    after = client.get("/api/jobs/1/full", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert [task["task_order"] for task in after.json()["tasks"]] == [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP]
+    assert [task["task_id"] for task in after.json()["tasks"]] == [task["task_id"] for task in tasks]
@@ -0,0 +1,60 @@
+"""Typeahead index lookups and background reloads"""
+import threading
+
+from models import Client
+from typeahead_service import Typeahead, TypeaheadIndex
+
+
+def _labels(results):
+    return [result["label"] for result in results]
+
+
+def test_typo_and_substring_fall_back_to_trigrams():
+    index = TypeaheadIndex()
+    index.extend([
+        (1, "Harbour Signs", None, None, ""),
+        (2, "Coastal Graphics", None, None, ""),
+        (3, "Metro Print", None, None, ""),
+    ])
+
+    assert _labels(index.lookup("hrabour")) == ["Harbour Signs"]
+    assert _labels(index.lookup("raphic")) == ["Coastal Graphics"]
+    assert _labels(index.lookup("hrabour sig")) == ["Harbour Signs"]
+    assert index.lookup("zzzz") == []
+
+
+def test_stale_index_reloads_in_the_background_and_keeps_changes(db, monkeypatch):
+    db.add(Client(client_id=1, name="Harbour Signs"))
+    db.commit()
+    typeahead = Typeahead(ttl=60)
+    typeahead.load_all(db)
+
+    # The reload reads the table, then waits while a client is added
+    built = threading.Event()
+    release = threading.Event()
+    build = typeahead._build
+
+    def slow_build(session, entity):
+        index = build(session, entity)
+        built.set()
+        release.wait(5)
+        return index
+
+    monkeypatch.setattr(typeahead, "_build", slow_build)
+    typeahead.ttl = 0
+
+    # A stale lookup answers from the current index without waiting for the reload
+    assert _labels(typeahead.lookup(db, "client", "harb")) == ["Harbour Signs"]
+    assert built.wait(5)
+    added = Client(client_id=2, name="Harbour Prints")
+    db.add(added)
+    db.commit()
+    typeahead.upsert("client", added)
+
+    typeahead.ttl = 60
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == "typeahead-client":
+            thread.join(5)
+
+    assert _labels(typeahead.lookup(db, "client", "harb")) == ["Harbour Prints", "Harbour Signs"]
@@ -0,0 +1,108 @@
+"""
+Throughput service - maintains the current-stage due date projection
+
+throughput.job_stage_due holds one row per job that is in a stage with a due
+date set for it. Every write path that changes Job.stage_id or a
+ThroughputStageDate calls sync_job_stage_due before committing, so the row is
+updated in the same transaction as the change.
+"""
+from typing import Iterable
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.job import Job
+from models.throughput import ThroughputStageDate, ThroughputJobStageDue
+
+
+def sync_job_stage_due(db: Session, job_ids: Iterable[int]) -> None:
+    """Recompute the current stage due date for the given jobs"""
+    job_ids = {job_id for job_id in job_ids if job_id is not None}
+    if not job_ids:
+        return
+
+    # The session is not autoflushing - make the caller's pending changes visible
+    db.flush()
+
+    current = dict(
+        db.query(Job.job_id, Job.stage_id)
+        .filter(Job.job_id.in_(job_ids), Job.stage_id.isnot(None))
+        .all()
+    )
+    due_dates = {}
+    if current:
+        for job_id, stage_id, due_date in (
+            db.query(
+                ThroughputStageDate.job_id,
+                ThroughputStageDate.status_id,
+                func.min(ThroughputStageDate.due_date)
+            )
+            .filter(ThroughputStageDate.job_id.in_(current.keys()))
+            .group_by(ThroughputStageDate.job_id, ThroughputStageDate.status_id)
+        ):
+            if current[job_id] == stage_id:
+                due_dates[job_id] = due_date
+
+    existing = {
+        row.job_id: row
+        for row in db.query(ThroughputJobStageDue).filter(ThroughputJobStageDue.job_id.in_(job_ids))
+    }
+    for job_id in job_ids:
+        row = existing.get(job_id)
+        if job_id not in due_dates:
+            if row is not None:
+                db.delete(row)
+        elif row is None:
+            db.add(ThroughputJobStageDue(
+                job_id=job_id,
+                stage_id=current[job_id],
+                due_date=due_dates[job_id]
+            ))
+        else:
+            row.stage_id = current[job_id]
+            row.due_date = due_dates[job_id]
+
+
+def rebuild_job_stage_due(db: Session) -> int:
+    """Repopulate the whole projection from jobs and stage dates; returns the row count"""
+    source = (
+        select(Job.job_id, Job.stage_id, func.min(ThroughputStageDate.due_date))
+        .join(
+            ThroughputStageDate,
+            (ThroughputStageDate.job_id == Job.job_id)
+            & (ThroughputStageDate.status_id == Job.stage_id)
+        )
+        .group_by(Job.job_id, Job.stage_id)
+    )
+    db.query(ThroughputJobStageDue).delete(synchronize_session=False)
+    db.execute(
+        insert(ThroughputJobStageDue).from_select(["job_id", "stage_id", "due_date"], source)
+    )
+    return db.query(func.count(ThroughputJobStageDue.job_id)).scalar()
+
+
+def ensure_job_stage_due(db: Session) -> int:
+    """
+    Build the projection if it is empty but stage dates exist (first start
+    after the table was added). Returns the number of rows built.
+    """
+    if db.query(ThroughputJobStageDue.job_id).first() is not None:
+        return 0
+    if db.query(ThroughputStageDate.stage_date_id).first() is None:
+        return 0
+    count = rebuild_job_stage_due(db)
+    db.commit()
+    return count
+
+
+def initialize_job_stage_due() -> int:
+    """Startup hook - run ensure_job_stage_due in its own session"""
+    db = SessionLocal()
+    try:
+        return ensure_job_stage_due(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,466 @@
+"""
+Typeahead service - in-memory prefix/trigram index for form pickers
+
+Each picker entity (clients, contacts, projects, products) is held per process
+as two sorted lists - normalized full labels and individual words - so a
+prefix lookup is a bisect plus a short forward scan. When prefixes find fewer
+than `limit` records, word trigrams fill in substring and typo matches.
+
+The index is built at startup and reloaded every TYPEAHEAD_TTL seconds (so
+other workers' writes show up). A reload runs in a background thread while
+lookups keep using the old index, which is swapped out once the new one is
+built. The create/update/delete routes of this worker update it as soon as
+they commit. Memory is bounded by TYPEAHEAD_MAX_RECORDS per entity and by
+truncating labels; an entity over the cap is answered from the database
+instead.
+"""
+import bisect
+import heapq
+import math
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import TYPEAHEAD_MAX_RECORDS, TYPEAHEAD_TTL
+from database import SessionLocal
+from models.client import Client, Contact
+from models.job import Project
+from models.product import Product
+
+MAX_LABEL_LENGTH = 80
+# Forward scan limit per lookup, so a one-letter query stays cheap
+MAX_SCAN = 2000
+# Candidate records visited per trigram lookup, so a short or common typo stays cheap
+MAX_FUZZY_SCAN = 200
+# Share of a query word's trigrams a word needs to count as a fuzzy match
+MIN_SIMILARITY = 0.5
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class TypeaheadSource(NamedTuple):
+    entity: str
+    model: type
+    key: str
+    label: Tuple[str, ...]  # columns joined with spaces
+    detail: Optional[str] = None  # shown under the label
+    parent: Optional[str] = None  # column the picker can filter on
+    extra: Tuple[str, ...] = ()  # also matched, not shown
+
+
+SOURCES = {
+    source.entity: source for source in (
+        TypeaheadSource("client", Client, "client_id", ("name",), detail="suburb"),
+        TypeaheadSource("contact", Contact, "contact_id", ("first_name", "surname"),
+                        detail="email", parent="client_id", extra=("email",)),
+        TypeaheadSource("project", Project, "project_id", ("name",), detail="suburb"),
+        TypeaheadSource("product", Product, "product_id", ("name",), parent="product_category_id"),
+    )
+}
+ENTITIES = tuple(SOURCES)
+
+
+def normalize(value: str) -> str:
+    """Lower case with accents stripped, for matching"""
+    value = value.casefold()
+    if value.isascii():
+        return value
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _words(value: str) -> List[str]:
+    return _WORD.findall(normalize(value))
+
+
+def _trigrams(word: str) -> set:
+    """Trigrams of a word padded like pg_trgm ("  ab", " ab", "ab ")"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _Record(NamedTuple):
+    label: str
+    detail: Optional[str]
+    parent: Optional[int]
+    label_key: str
+    words: Tuple[str, ...]
+
+
+class TypeaheadIndex:
+    """
+    Prefix and trigram lookups over one entity's labels
+
+    Trigrams are indexed per distinct word, not per record, so the trigram
+    table grows with the vocabulary rather than the number of records.
+    """
+
+    def __init__(self):
+        self._records: Dict[int, _Record] = {}
+        self._labels: List[tuple] = []  # (label words joined by spaces, key), sorted
+        self._words: List[tuple] = []  # (word, key), sorted
+        self._vocabulary: Dict[str, int] = {}  # word -> number of records using it
+        self._grams: Dict[str, set] = {}  # trigram -> words
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, key: int, label: str, detail: Optional[str] = None,
+            parent: Optional[int] = None, extra: str = ""):
+        """Insert or replace a record"""
+        self.remove(key)
+        record = self._store(key, label, detail, parent, extra)
+        bisect.insort(self._labels, (record.label_key, key))
+        for word in record.words:
+            bisect.insort(self._words, (word, key))
+
+    def extend(self, items):
+        """Bulk-load (key, label, detail, parent, extra) tuples for new keys, sorting once"""
+        for item in items:
+            record = self._store(*item)
+            self._labels.append((record.label_key, item[0]))
+            self._words.extend((word, item[0]) for word in record.words)
+        self._labels.sort()
+        self._words.sort()
+
+    def _store(self, key, label, detail, parent, extra) -> _Record:
+        label = (label or "")[:MAX_LABEL_LENGTH]
+        label_words = _words(label)
+        words = tuple(self._use(word) for word in dict.fromkeys(label_words + _words(extra or "")))
+        record = _Record(label, detail, parent, " ".join(label_words), words)
+        self._records[key] = record
+        return record
+
+    def _use(self, word: str) -> str:
+        word = sys.intern(word)
+        count = self._vocabulary.get(word, 0)
+        if not count:
+            for gram in _trigrams(word):
+                self._grams.setdefault(gram, set()).add(word)
+        self._vocabulary[word] = count + 1
+        return word
+
+    def _release(self, word: str):
+        count = self._vocabulary.pop(word) - 1
+        if count:
+            self._vocabulary[word] = count
+            return
+        for gram in _trigrams(word):
+            words = self._grams.get(gram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._grams[gram]
+
+    def remove(self, key: int):
+        record = self._records.pop(key, None)
+        if record is None:
+            return
+        self._discard(self._labels, (record.label_key, key))
+        for word in record.words:
+            self._discard(self._words, (word, key))
+            self._release(word)
+
+    @staticmethod
+    def _discard(entries: List[tuple], entry: tuple):
+        i = bisect.bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def lookup(self, query: str, limit: int = 10, parent: Optional[int] = None) -> List[dict]:
+        """
+        Records matching `query`, best first
+
+        Labels starting with the query come first (alphabetical), then records
+        where every query word starts one of their words (by the matched
+        word). Trigram matches (3+ characters) fill any remaining places, most
+        similar first.
+        """
+        words = _words(query)
+        if not words:
+            return []
+        found: Dict[int, None] = {}
+
+        def in_parent(key: int) -> bool:
+            return parent is None or self._records[key].parent == parent
+
+        def has_all_words(key: int) -> bool:
+            record = self._records[key]
+            return in_parent(key) and all(
+                any(word.startswith(q) for word in record.words) for q in words[1:]
+            )
+
+        # 1. whole label starts with the query
+        prefix = " ".join(words)
+        self._scan(self._labels, prefix, found, limit, in_parent)
+        # 2. every query word starts some word of the record
+        if len(found) < limit:
+            self._scan(self._words, words[0], found, limit, has_all_words)
+        results = [self._result(key, 1.0) for key in found]
+
+        # 3. trigram similarity for substrings and typos
+        if len(found) < limit and len(prefix) >= 3:
+            for key, score in self._similar(words, in_parent, found, limit - len(found)):
+                results.append(self._result(key, score))
+        return results
+
+    def _scan(self, entries: List[tuple], prefix: str, found: Dict[int, None], limit: int, accept):
+        i = bisect.bisect_left(entries, (prefix,))
+        end = min(len(entries), i + MAX_SCAN)
+        while i < end and len(found) < limit:
+            text, key = entries[i]
+            if not text.startswith(prefix):
+                break
+            if key not in found and accept(key):
+                found[key] = None
+            i += 1
+
+    def _similar_words(self, query_word: str) -> Dict[str, float]:
+        """
+        Vocabulary words containing most of query_word's trigrams, with that share
+
+        A word sharing `needed` trigrams is in at least one of the
+        len(grams) - needed + 1 rarest trigrams' word sets, so only those are
+        counted; candidates are then checked against the remaining sets.
+        """
+        grams = _trigrams(query_word)
+        needed = math.ceil(len(grams) * MIN_SIMILARITY)
+        postings = sorted((self._grams.get(gram, ()) for gram in grams), key=len)
+        cut = len(grams) - needed + 1
+        counts = Counter()
+        for words in postings[:cut]:
+            counts.update(words)
+        for words in postings[cut:]:
+            counts.update(counts.keys() & words)
+        return {word: shared / len(grams) for word, shared in counts.items() if shared >= needed}
+
+    def _similar(self, words: List[str], accept, exclude, limit: int) -> List[tuple]:
+        """
+        (key, score) of records with a similar word for every query word
+
+        A record's score is the mean over query words of its best word match
+        (1.0 for a prefix match). Candidates are the records of the longest
+        query word's similar words, best first, and at most MAX_FUZZY_SCAN of
+        them are visited; the other query words are only compared with those.
+        """
+        seed_word = max(words, key=len)
+        seed = self._similar_words(seed_word)
+        if not seed:
+            return []
+        # Other query words go first, as the seed always matches: a record
+        # missing one is dropped before its seed share is looked up
+        others = [(word, {}, _trigrams(word)) for word in dict.fromkeys(words) if word != seed_word]
+
+        # Stop once the rest can't beat the current top `limit` (a min-heap)
+        scores = {}
+        top = []
+        budget = MAX_FUZZY_SCAN
+        for vocabulary_word in sorted(seed, key=seed.get, reverse=True):
+            best_possible = (seed[vocabulary_word] + len(others)) / (len(others) + 1)
+            if budget <= 0 or (len(top) >= limit and best_possible <= top[0]):
+                break
+            i = bisect.bisect_left(self._words, (vocabulary_word,))
+            while i < len(self._words) and self._words[i][0] == vocabulary_word and budget > 0:
+                key = self._words[i][1]
+                i += 1
+                budget -= 1
+                if key in exclude or key in scores or not accept(key):
+                    continue
+                record_words = self._records[key].words
+                total = 0.0
+                for query_word, shares, grams in others:
+                    best = 0.0
+                    for word in record_words:
+                        if word.startswith(query_word):
+                            best = 1.0
+                            break
+                        share = shares.get(word)
+                        if share is None:
+                            share = len(grams & _trigrams(word)) / len(grams)
+                            share = shares[word] = share if share >= MIN_SIMILARITY else 0.0
+                        if share > best:
+                            best = share
+                    if not best:
+                        break
+                    total += best
+                else:
+                    total += max(
+                        1.0 if word.startswith(seed_word) else seed.get(word, 0.0) for word in record_words
+                    )
+                    score = scores[key] = total / (len(others) + 1)
+                    if len(top) < limit:
+                        heapq.heappush(top, score)
+                    elif score > top[0]:
+                        heapq.heapreplace(top, score)
+
+        ranked = sorted(scores, key=lambda key: (-scores[key], self._records[key].label))
+        return [(key, round(scores[key], 3)) for key in ranked[:limit]]
+
+    def _result(self, key: int, score: Optional[float]) -> dict:
+        record = self._records[key]
+        return {"id": key, "label": record.label, "detail": record.detail, "score": score}
+
+
+# ============================================================================
+# PER-ENTITY INDEXES
+# ============================================================================
+
+def _label(obj, columns) -> str:
+    return " ".join(str(value) for value in (getattr(obj, column) for column in columns) if value)
+
+
+class Typeahead:
+    """One TypeaheadIndex per entity, loaded from the database on a TTL"""
+
+    def __init__(self, max_records: int = TYPEAHEAD_MAX_RECORDS, ttl: int = TYPEAHEAD_TTL):
+        self.max_records = max_records
+        self.ttl = ttl
+        # entity -> (index, loaded_at); index is None when the table is over max_records
+        self._indexes: Dict[str, tuple] = {}
+        # entity -> changes committed while its background reload runs, replayed onto the new index
+        self._reloading: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _item(source: TypeaheadSource, obj) -> tuple:
+        return (
+            getattr(obj, source.key),
+            _label(obj, source.label),
+            getattr(obj, source.detail) if source.detail else None,
+            getattr(obj, source.parent) if source.parent else None,
+            _label(obj, source.extra)
+        )
+
+    def _build(self, db: Session, entity: str) -> Optional[TypeaheadIndex]:
+        """A new index of `entity` from the database, or None if it is over max_records"""
+        source = SOURCES[entity]
+        columns = {source.key, *source.label, *source.extra}
+        columns.update(column for column in (source.detail, source.parent) if column)
+        rows = db.query(*(getattr(source.model, column) for column in sorted(columns)))
+        rows = rows.limit(self.max_records + 1).all()
+        if len(rows) > self.max_records:
+            return None
+        index = TypeaheadIndex()
+        index.extend(self._item(source, row) for row in rows)
+        return index
+
+    def load_all(self, db: Session) -> dict:
+        """(Re)build every entity; returns {entity: record count, or None if over the cap}"""
+        with self._lock:
+            for entity in SOURCES:
+                self._indexes[entity] = (self._build(db, entity), time.monotonic())
+            return {entity: len(index) if index is not None else None
+                    for entity, (index, _) in self._indexes.items()}
+
+    def _reload(self, entity: str):
+        """Background thread: build `entity` in its own session, then swap it in"""
+        db = SessionLocal()
+        try:
+            index = self._build(db, entity)
+        except Exception as e:
+            print(f"⚠ Warning: Typeahead reload of {entity} failed: {str(e)}")
+            with self._lock:
+                del self._reloading[entity]
+                # Keep serving the current index; try again after another TTL
+                loaded = self._indexes.get(entity)
+                self._indexes[entity] = (loaded[0] if loaded else None, time.monotonic())
+            return
+        finally:
+            db.close()
+        with self._lock:
+            for key, item in self._reloading.pop(entity):
+                if index is None:
+                    break
+                if item is None:
+                    index.remove(key)
+                else:
+                    index.add(*item)
+            if index is not None and len(index) > self.max_records:
+                index = None
+            self._indexes[entity] = (index, time.monotonic())
+
+    def _current(self, entity: str) -> Optional[TypeaheadIndex]:
+        """The loaded index (None if there is none yet); starts a reload when it is stale"""
+        loaded = self._indexes.get(entity)
+        if (loaded is None or time.monotonic() - loaded[1] >= self.ttl) and entity not in self._reloading:
+            self._reloading[entity] = []
+            threading.Thread(target=self._reload, args=(entity,), daemon=True,
+                             name=f"typeahead-{entity}").start()
+        return loaded[0] if loaded is not None else None
+
+    def _record(self, entity: str, key: int, item: Optional[tuple]):
+        """Queue a change for the reload in progress (item None for a delete); call under the lock"""
+        changes = self._reloading.get(entity)
+        if changes is not None:
+            changes.append((key, item))
+
+    def upsert(self, entity: str, obj):
+        """Apply a committed create/update of `obj` (a SOURCES[entity].model instance)"""
+        item = self._item(SOURCES[entity], obj)
+        with self._lock:
+            self._record(entity, item[0], item)
+            loaded = self._indexes.get(entity)
+            if loaded is not None and loaded[0] is not None:
+                index = loaded[0]
+                index.add(*item)
+                if len(index) > self.max_records:
+                    self._indexes[entity] = (None, loaded[1])
+
+    def remove(self, entity: str, *keys: int):
+        """Apply committed deletes"""
+        with self._lock:
+            loaded = self._indexes.get(entity)
+            for key in keys:
+                self._record(entity, key, None)
+                if loaded is not None and loaded[0] is not None:
+                    loaded[0].remove(key)
+
+    def lookup(self, db: Session, entity: str, query: str, limit: int = 10,
+               parent: Optional[int] = None) -> List[dict]:
+        """Matches for `query` in `entity` (one of ENTITIES), best first"""
+        with self._lock:
+            index = self._current(entity)
+            if index is not None:
+                return index.lookup(query, limit, parent)
+        return _lookup_database(db, SOURCES[entity], query, limit, parent)
+
+
+def _lookup_database(db: Session, source: TypeaheadSource, query: str, limit: int,
+                     parent: Optional[int]) -> List[dict]:
+    """Prefix match in SQL, for entities too large to hold in memory"""
+    model = source.model
+    label = getattr(model, source.label[0])
+    for column in source.label[1:]:
+        label = label + " " + getattr(model, column)
+    escaped = query.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    rows = db.query(model).filter(label.ilike(f"{escaped}%", escape="\\"))
+    if parent is not None:
+        rows = rows.filter(getattr(model, source.parent) == parent)
+    rows = rows.order_by(label).limit(limit)
+    return [
+        {
+            "id": getattr(obj, source.key),
+            "label": _label(obj, source.label)[:MAX_LABEL_LENGTH],
+            "detail": getattr(obj, source.detail) if source.detail else None,
+            "score": 1.0
+        }
+        for obj in rows
+    ]
+
+
+typeahead = Typeahead()
+
+
+def build_typeahead() -> dict:
+    """Startup hook: load every entity in its own session"""
+    db = SessionLocal()
+    try:
+        return typeahead.load_all(db)
+    finally:
+        db.close()